@@ -134,33 +134,34 @@ class BaseAggregator(FinTick):
         return timestamps
 
     def source_has_data(self, document):
-        return self.firestore_source.has_data(document)
+        return self.get_firestore_cache("firestore_source").has_data(document)
 
     def destination_has_data(self, document):
-        return self.firestore_destination.has_data(document)
+        return self.get_firestore_cache("firestore_destination").has_data(document)
 
     def main(self):
         """Partitions are independent, so iterates backwards"""
         if self.period_from and self.period_to:
-            for partition in self.iter_partition():
-                self.partition_decorator = self.get_partition_decorator(partition)
-                document = self.get_document_name(partition)
-                if self.source_has_data(document):
-                    if not self.destination_has_data(document):
-                        data_frame = self.get_data_frame()
-                        # Are there any trades?
-                        if data_frame is not None:
-                            df = self.process_data_frame(data_frame)
-                            self.write(df)
-                        # No trades
-                        else:
-                            self.set_firebase(
-                                {}, attr="firestore_destination", is_complete=True
-                            )
-                    elif self.verbose:
-                        print(f"{self.log_prefix}: {document} OK")
-                else:
-                    print(f"{self.log_prefix}: {document} No data")
+            with self.prefetch():
+                for partition in self.iter_partition():
+                    self.partition_decorator = self.get_partition_decorator(partition)
+                    document = self.get_document_name(partition)
+                    if self.source_has_data(document):
+                        if not self.destination_has_data(document):
+                            data_frame = self.get_data_frame()
+                            # Are there any trades?
+                            if data_frame is not None:
+                                df = self.process_data_frame(data_frame)
+                                self.write(df)
+                            # No trades
+                            else:
+                                self.set_firebase(
+                                    {}, attr="firestore_destination", is_complete=True
+                                )
+                        elif self.verbose:
+                            print(f"{self.log_prefix}: {document} OK")
+                    else:
+                        print(f"{self.log_prefix}: {document} No data")
         else:
             print(f"{self.log_prefix}: No data")
 
@@ -257,7 +258,7 @@ class BaseCacheAggregator(BaseAggregator):
 
     def get_cache(self, data_frame):
         document = self.get_last_document_name(self.partition)
-        data = self.firestore_destination.get(document)
+        data = self.get_firestore_cache("firestore_destination").get(document)
         # Is cache required, and no data?
         if self.is_cache_required and not data:
             doc = self.get_document_name()
@@ -273,26 +274,27 @@ class BaseCacheAggregator(BaseAggregator):
     def main(self):
         """Partitions are dependent, so iterates forwards"""
         if self.period_from and self.period_to:
-            for partition in self.iter_partition():
-                self.partition_decorator = self.get_partition_decorator(partition)
-                document = self.get_document_name(partition)
-                if self.source_has_data(document):
-                    if not self.destination_has_data(document):
-                        data_frame = self.get_data_frame()
-                        data_frame, cache = self.get_cache(data_frame)
-                        # Are there any trades?
-                        if len(data_frame):
-                            data, cache = self.process_data_frame(data_frame, cache)
-                            self.write(data, cache)
-                        # No trades
-                        else:
-                            self.set_firebase(
-                                {}, attr="firestore_destination", is_complete=True
-                            )
-                    elif self.verbose:
-                        print(f"{self.log_prefix}: {document} OK")
-                else:
-                    print(f"{self.log_prefix}: {document} No data")
+            with self.prefetch():
+                for partition in self.iter_partition():
+                    self.partition_decorator = self.get_partition_decorator(partition)
+                    document = self.get_document_name(partition)
+                    if self.source_has_data(document):
+                        if not self.destination_has_data(document):
+                            data_frame = self.get_data_frame()
+                            data_frame, cache = self.get_cache(data_frame)
+                            # Are there any trades?
+                            if len(data_frame):
+                                data, cache = self.process_data_frame(data_frame, cache)
+                                self.write(data, cache)
+                            # No trades
+                            else:
+                                self.set_firebase(
+                                    {}, attr="firestore_destination", is_complete=True
+                                )
+                        elif self.verbose:
+                            print(f"{self.log_prefix}: {document} OK")
+                    else:
+                        print(f"{self.log_prefix}: {document} No data")
         else:
             print(f"{self.log_prefix}: No data")
 
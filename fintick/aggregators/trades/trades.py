@@ -27,26 +27,33 @@ class TradeAggregatorDailyPartitionFromHourly(
         document_name = timestamp.strftime("%Y-%m-%dT%H")
         return FirestoreCache(collection).get(document_name)
 
+    def get_hourly_documents(self, timestamps):
+        """Hourly documents, in bulk."""
+        collection = self.get_destination(sep="-")
+        document_names = [timestamp.strftime("%Y-%m-%dT%H") for timestamp in timestamps]
+        documents = FirestoreCache(collection).get_all(document_names)
+        return [documents[document_name] for document_name in document_names]
+
     def main(self):
-        for partition in self.iter_partition():
-            document = self.get_document_name(partition)
-            data = self.firestore_destination.get(document)
-            if not self.is_data_OK(data):
-                period = pendulum.period(
-                    self.timestamp_from,
-                    self.timestamp_to,
-                )
-                documents = [
-                    self.get_hourly_document(timestamp)
-                    for timestamp in period.range("hours")
-                ]
-                has_data = all([document and document["ok"] for document in documents])
-                if has_data:
-                    data_frame = self.load_data_frame()
-                    # Overwrite hourly partition indices with daily index
-                    data_frame["index"] = data_frame.index.values
-                    self.write(data_frame)
-                    self.clean_firestore()
+        with self.prefetch():
+            for partition in self.iter_partition():
+                document = self.get_document_name(partition)
+                data = self.get_firestore_cache("firestore_destination").get(document)
+                if not self.is_data_OK(data):
+                    period = pendulum.period(
+                        self.timestamp_from,
+                        self.timestamp_to,
+                    )
+                    documents = self.get_hourly_documents(period.range("hours"))
+                    has_data = all(
+                        [document and document["ok"] for document in documents]
+                    )
+                    if has_data:
+                        data_frame = self.load_data_frame()
+                        # Overwrite hourly partition indices with daily index
+                        data_frame["index"] = data_frame.index.values
+                        self.write(data_frame)
+                        self.clean_firestore()
 
     def load_data_frame(self):
         table_id = self.destination_table
@@ -1,5 +1,10 @@
 from .bqloader import BigQueryDaily, BigQueryHourly
-from .lib import get_schema_columns, get_table_id, stringify_datetime_types
+from .lib import (
+    get_arrow_schema,
+    get_schema_columns,
+    get_table_id,
+    stringify_datetime_types,
+)
 from .schema import (
     MULTIPLE_SYMBOL_AGGREGATE_SCHEMA,
     MULTIPLE_SYMBOL_BAR_SCHEMA,
@@ -26,6 +31,7 @@ __all__ = [
     "MULTIPLE_SYMBOL_ORDER_BY",
     "row_to_json",
     "get_schema_columns",
+    "get_arrow_schema",
     "get_table_id",
     "stringify_datetime_types",
     "BigQueryDaily",
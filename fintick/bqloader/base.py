@@ -105,6 +105,13 @@ class BaseBigQueryLoader:
                     self.bq.load_table_from_dataframe(
                         data, self.partition, job_config=job_config
                     ).result()
+            elif isinstance(data, str):
+                # If path, Parquet
+                job_config.source_format = bigquery.SourceFormat.PARQUET
+                with open(data, "rb") as f:
+                    self.bq.load_table_from_file(
+                        f, self.partition, job_config=job_config
+                    ).result()
             else:
                 # If json, assume correct
                 self.bq.load_table_from_json(
@@ -1,5 +1,7 @@
 import os
 
+import pyarrow as pa
+
 from ..constants import BIGQUERY_DATASET, BIGQUERY_TABLES
 from ..utils import set_env_list
 
@@ -18,6 +20,22 @@ def get_schema_columns(schema):
     return [field.name for field in schema]
 
 
+def get_arrow_schema(schema):
+    """Arrow types of BigQuery types, such as for loading from Parquet."""
+    types = {
+        "STRING": pa.string(),
+        "INTEGER": pa.int64(),
+        "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+        "BIGNUMERIC": pa.decimal256(76, 38),
+    }
+    return pa.schema(
+        [
+            pa.field(field.name, types[field.field_type], field.mode != "REQUIRED")
+            for field in schema
+        ]
+    )
+
+
 def stringify_datetime_types(data):
     for key in ("date", "timestamp"):
         if key in data:
@@ -27,6 +27,18 @@ GCP_APPLICATION_CREDENTIALS = (
 
 BINANCE_API_KEY = "BINANCE_API_KEY"
 
+DUMP_CACHE_DIR = "DUMP_CACHE_DIR"
+DUMP_CACHE_MAX_BYTES = "DUMP_CACHE_MAX_BYTES"
+
+HTTP2 = "HTTP2"
+HTTP_TIMEOUT = "HTTP_TIMEOUT"
+
+RATE_LIMIT_DIR = "RATE_LIMIT_DIR"
+
+CHECKPOINT_DIR = "CHECKPOINT_DIR"
+CHECKPOINT_BUCKET = "CHECKPOINT_BUCKET"
+INSTRUMENT_CACHE_DIR = "INSTRUMENT_CACHE_DIR"
+
 LOCAL_ENV_VARS = (
     AWS_PROJECT,
     AWS_REGION,
@@ -38,6 +50,14 @@ LOCAL_ENV_VARS = (
     BIGQUERY_LOCATION,
     BIGQUERY_DATASET,
     BINANCE_API_KEY,
+    DUMP_CACHE_DIR,
+    DUMP_CACHE_MAX_BYTES,
+    HTTP2,
+    HTTP_TIMEOUT,
+    RATE_LIMIT_DIR,
+    CHECKPOINT_DIR,
+    CHECKPOINT_BUCKET,
+    INSTRUMENT_CACHE_DIR,
 )
 
 
@@ -47,8 +67,44 @@ PRODUCTION_ENV_VARS = (
     BIGQUERY_DATASET,
     BINANCE_API_KEY,
     SENTRY_DSN,
+    CHECKPOINT_BUCKET,
 )
 
+# Cloud Functions, max 9 minutes
+FUNCTION_TIMEOUT = 540
+# Seconds before the timeout, to checkpoint and write partitions in progress
+CHECKPOINT_MARGIN = 90
+# Republished, after the deadline, at most
+CHECKPOINT_MAX_ATTEMPTS = 24
+
+# Requests, to seek the trade id at a timestamp
+SEEK_MAX_PROBES = 32
+
+# Pages per chunk, if trade ids of a partition are fetched concurrently
+RANGE_PAGES = 10
+# Seek probes are requests, so concurrently only if expected to be more pages
+RANGE_MIN_PAGES = 8
+
+# Pages per window, if a partition is fetched concurrently by time
+WINDOW_PAGES = 5
+MAX_WINDOWS = 32
+
+# Websocket, seconds after the end of a partition, for trades in flight
+WEBSOCKET_FLUSH_DELAY = 5
+# Seconds, either side of a gap, also repaired from the REST API
+WEBSOCKET_GAP_MARGIN = 5
+# Seconds without a message, until the connection is pinged
+WEBSOCKET_TIMEOUT = 10
+WEBSOCKET_RECONNECT_DELAY = 5
+# Trades, parsed together
+WEBSOCKET_CHUNK_SIZE = 1000
+
+# Documents per batched read, of Firestore
+FIRESTORE_BATCH_SIZE = 500
+
+# Seconds, until active instruments are listed again. Expired are never listed again
+INSTRUMENT_TTL = 3600
+
 BIGQUERY_HOT = pd.Timedelta("2d")
 BIGQUERY_MAX_HOT = pd.Timedelta("6d")
 
@@ -57,4 +113,5 @@ HTTPX_ERRORS = (
     httpx.ConnectTimeout,
     httpx.ReadError,
     httpx.ReadTimeout,
+    httpx.RemoteProtocolError,  # Maybe, pooled connection closed by server
 )
@@ -5,6 +5,7 @@ from .base import (
     FinTickNonSequentialIntegerMixin,
     FinTickREST,
     FinTickSequentialIntegerMixin,
+    FinTickTimePaginationMixin,
 )
 from .daily import (
     FinTickDailyHourlyMixin,
@@ -16,6 +17,8 @@ from .daily import (
     FinTickMultiSymbolDailyMixin,
 )
 from .hourly import FinTickHourlyMixin, FinTickMultiSymbolHourlyMixin
+from .stream import DeadlineExceeded, get_checkpoint_bucket
+from .websocket import FinTickWebsocketMixin
 
 __all__ = [
     "FinTick",
@@ -24,6 +27,7 @@ __all__ = [
     "FinTickNonSequentialIntegerMixin",
     "FinTickREST",
     "FinTickSequentialIntegerMixin",
+    "FinTickTimePaginationMixin",
     "FinTickDailyHourlyMixin",
     "FinTickDailyMixin",
     "FinTickDailyPartitionFromHourlyMixin",
@@ -33,4 +37,7 @@ __all__ = [
     "FinTickMultiSymbolDailyMixin",
     "FinTickHourlyMixin",
     "FinTickMultiSymbolHourlyMixin",
+    "DeadlineExceeded",
+    "get_checkpoint_bucket",
+    "FinTickWebsocketMixin",
 ]
@@ -1,6 +1,9 @@
 import datetime
+import threading
 import time
-from operator import eq
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import copy
 
 import pandas as pd
 from google.api_core.exceptions import ServiceUnavailable
@@ -11,24 +14,55 @@ from ..bqloader import (
     get_schema_columns,
     get_table_id,
 )
-from ..downloader import assert_type_decimal, row_to_json
-from ..fscache import FirestoreCache, firestore_data, get_collection_name
+from ..downloader import (
+    TradeBuffer,
+    assert_type_decimal,
+    concat_trades,
+    filter_trades,
+    get_decimal_data_frame,
+    parse_trades,
+    summarize_trades,
+)
+from ..fscache import (
+    FirestoreCache,
+    PrefetchCache,
+    firestore_data,
+    get_collection_name,
+)
 from ..utils import normalize_symbol
+from .pipeline import PendingDocuments, Pipeline
+from .stream import (
+    DeadlineExceeded,
+    TradeStream,
+    get_checkpoint_bucket,
+    get_checkpoint_dir,
+)
 
 
 class FinTick:
+    # Trades are summarized by
+    summary_by = None
+    # Status documents, by attr, prefetched while main is running
+    prefetched = None
+    prefetch_lock = None
+
     def __init__(
         self,
         api_symbol: str,
         period_from: str = None,
         period_to: str = None,
         futures: bool = False,
+        stream: bool = False,
+        deadline: float = None,
         verbose: bool = False,
     ):
         self.api_symbol = api_symbol
         self.period_from = period_from
         self.period_to = period_to
         self.futures = futures
+        # If deadline, pages are streamed, so they can be checkpointed
+        self.stream = stream or deadline is not None
+        self.deadline = deadline
         self.verbose = verbose
 
     @property
@@ -63,6 +97,41 @@ class FinTick:
         collection = get_collection_name(self.exchange, suffix=suffix)
         return FirestoreCache(collection)
 
+    def get_firestore_cache(self, attr="firestore_cache"):
+        prefetched = self.prefetched
+        if prefetched is None:
+            return getattr(self, attr)
+        # Loaded on first use, so only caches which are read
+        if attr not in prefetched:
+            cache = PrefetchCache(getattr(self, attr), self.prefetch_documents)
+            # Not locked while loading. Maybe, loaded by another thread already
+            with self.prefetch_lock:
+                prefetched.setdefault(attr, cache)
+        return prefetched[attr]
+
+    @contextmanager
+    def prefetch(self, partitions=None):
+        """
+        Status documents of partitions, and last partitions, are read in bulk,
+        rather than one or more round trips per partition. By default, all
+        partitions of the period.
+        """
+        if partitions is None:
+            partitions = self.iter_partition()
+        documents = set()
+        for partition in partitions:
+            documents.add(self.get_document_name(partition))
+            documents.add(self.get_last_document_name(partition))
+        self.prefetch_documents = sorted(documents)
+        # Per controller, and shared by copies of it
+        self.prefetch_lock = threading.Lock()
+        self.prefetched = {}
+        try:
+            yield
+        finally:
+            # After main, read from Firestore
+            self.prefetched = None
+
     def get_document_name(self, partition):
         raise NotImplementedError
 
@@ -71,11 +140,14 @@ class FinTick:
 
     def get_document(self, partition):
         document = self.get_document_name(partition)
-        return self.firestore_cache.get(document)
+        return self.get_firestore_document(document)
 
     def get_last_document(self, partition):
         document = self.get_last_document_name(partition)
-        return self.firestore_cache.get(document)
+        return self.get_firestore_document(document)
+
+    def get_firestore_document(self, document):
+        return self.get_firestore_cache().get(document)
 
     def is_data_OK(self, data):
         if data:
@@ -85,57 +157,36 @@ class FinTick:
                 print(f"{self.log_prefix}: {document} OK")
             return ok
 
-    def get_valid_trades(self, trades, operator=eq):
-        unique = set()
-        valid_trades = []
-        for trade in trades:
-            is_unique = trade["uid"] not in unique
-            is_within_partition = (
-                self.timestamp_from <= trade["timestamp"] <= self.timestamp_to
+    def get_valid_trades(self, trades):
+        valid_trades, outside, duplicates = filter_trades(
+            trades, self.timestamp_from, self.timestamp_to
+        )
+        if self.verbose and (outside or duplicates):
+            print(
+                f"{self.log_prefix}: Discarded {outside} trades outside partition, "
+                f"{duplicates} duplicates"
             )
-            if is_unique and is_within_partition:
-                valid_trades.append(trade)
-                unique.add(trade["uid"])
         return valid_trades
 
-    def get_firebase_data(self, df):
-        if len(df):
-            open_price = df.head(1).iloc[0]
-            # Can't use idxmin/idxmax with Decimal type
-            low_price = df.loc[df["price"].astype(float).idxmin()]
-            high_price = df.loc[df["price"].astype(float).idxmax()]
-            close_price = df.tail(1).iloc[0]
-            buy_side = df[df["tickRule"] == 1]
-            volume = df["volume"].sum()
-            buy_volume = buy_side["volume"].sum()
-            notional = df["notional"].sum()
-            buy_notional = buy_side["notional"].sum()
-            ticks = len(df)
-            buy_ticks = len(buy_side)
-            return firestore_data(
-                {
-                    "open": row_to_json(open_price),
-                    "low": row_to_json(low_price),
-                    "high": row_to_json(high_price),
-                    "close": row_to_json(close_price),
-                    "volume": volume,
-                    "buyVolume": buy_volume,
-                    "notional": notional,
-                    "buyNotional": buy_notional,
-                    "ticks": ticks,
-                    "buyTicks": buy_ticks,
-                }
-            )
+    def get_firebase_data(self, df, reverse=False):
+        summary = summarize_trades(df, by=self.summary_by, reverse=reverse)
+        return self.get_summary_data(summary)
+
+    def get_summary_data(self, summary):
+        if None in summary:
+            return firestore_data(summary[None])
         return {}
 
-    def set_firebase(self, data, attr="firestore_cache", is_complete=False, retry=5):
+    def set_firebase(
+        self, data, attr="firestore_cache", is_complete=False, reverse=False, retry=5
+    ):
         document = self.get_document_name(self.partition)
         # If dict, assume correct
         if isinstance(data, pd.DataFrame):
-            data = self.get_firebase_data(data)
+            data = self.get_firebase_data(data, reverse=reverse)
         data["ok"] = is_complete
         try:
-            getattr(self, attr).set(document, data)
+            self.get_firestore_cache(attr).set(document, data)
         except ServiceUnavailable as e:
             if retry > 0:
                 time.sleep(1)
@@ -160,68 +211,188 @@ class FinTick:
 
 
 class FinTickREST(FinTick):
+    # Validated, but maybe not written, while main is running
+    pending_documents = None
+    deadline_exceeded = None
+
     def get_pagination_id(self, data=None):
         raise NotImplementedError
 
     def main(self):
+        """
+        Fetch, parse, validate, and write are stages, which run concurrently for
+        consecutive partitions. Partitions are written in order.
+        """
+        pipeline = Pipeline()
+        self.pending_documents = PendingDocuments(pipeline)
+        with self.prefetch():
+            pipeline.run(
+                self.iter_fetch(),
+                self.parse_partition,
+                self.validate_partition,
+                self.write_partition,
+            )
+        # Partitions in progress were written, so continue later
+        if self.deadline_exceeded is not None:
+            raise self.deadline_exceeded
+
+    def get_firestore_document(self, document):
+        if self.pending_documents is not None:
+            data = self.pending_documents.get(document)
+            if data is not None:
+                return data
+        return super().get_firestore_document(document)
+
+    def get_one_document(self, where=None, order_by=None):
+        if self.pending_documents is not None:
+            if where:
+                key, _, value = where  # Only ==
+                data = self.pending_documents.find(key, value)
+                if data is not None:
+                    return data
+            else:
+                self.pending_documents.join()
+        return self.get_firestore_cache().get_one(where=where, order_by=order_by)
+
+    @property
+    def cursor_cache(self):
+        suffix = self.get_suffix(sep="-")
+        collection = get_collection_name(self.exchange, suffix=f"{suffix}-cursors")
+        return FirestoreCache(collection)
+
+    def assert_deadline(self):
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise DeadlineExceeded
+
+    def iter_fetch(self):
         for partition in self.iter_partition():
             data = self.get_document(partition)
             if not self.is_data_OK(data):
-                pagination_id = self.get_pagination_id(data)
-                trade_data, is_last_iteration = self.iter_api(
-                    self.api_symbol, pagination_id, self.log_prefix
-                )
-                trades = self.parse_data(trade_data)
-                valid_trades = self.get_valid_trades(trades)
-                # Are there any trades?
-                if len(valid_trades):
-                    data_frame = self.get_data_frame(valid_trades)
-                    is_complete = self.get_is_complete(valid_trades)
-                    self.write(data_frame, is_complete=is_complete)
-                # No trades
-                else:
-                    self.set_firebase({}, is_complete=True)
+                # Copy, so each stage has state for the partition
+                controller = copy(self)
+                try:
+                    self.assert_deadline()
+                    trade_data, is_last_iteration = controller.fetch_partition(data)
+                except DeadlineExceeded as e:
+                    self.deadline_exceeded = e
+                    break
+                self.pending_documents.add(self.get_document_name(partition))
+                yield controller, trade_data
                 # Complete
                 if is_last_iteration:
                     break
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        raise NotImplementedError
+    def fetch_partition(self, data=None):
+        if self.stream:
+            return self.stream_partition(data)
+        pagination_id = self.get_pagination_id(data)
+        return self.fetch_api(pagination_id)
 
-    def parse_data(self, data):
-        return [
-            {
-                "uid": self.get_uid(trade),
-                "timestamp": self.get_timestamp(trade),
-                "nanoseconds": self.get_nanoseconds(trade),
-                "price": self.get_price(trade),
-                "volume": self.get_volume(trade),
-                "notional": self.get_notional(trade),
-                "tickRule": self.get_tick_rule(trade),
-                "index": self.get_index(trade),
-            }
-            for trade in data
-        ]
-
-    def get_uid(self, trade):
-        raise NotImplementedError
-
-    def get_timestamp(self, trade):
-        raise NotImplementedError
+    def stream_partition(self, data=None):
+        trade_stream = TradeStream(self, get_checkpoint_dir(), get_checkpoint_bucket())
+        document = self.get_document_name(self.partition)
+        cursor = self.cursor_cache.get(document)
+        pagination_id = trade_stream.resume(cursor) if cursor else None
+        if pagination_id is None:
+            pagination_id = self.get_pagination_id(data)
+        else:
+            print(f"{self.log_prefix}: {document} resumed from {pagination_id}")
+        pages = self.fetch_api(pagination_id, stream=True)
+        try:
+            is_last_iteration = trade_stream.consume(
+                pages, self.parse_data, deadline=self.deadline
+            )
+        except DeadlineExceeded:
+            self.cursor_cache.set(document, trade_stream.checkpoint())
+            print(f"{self.log_prefix}: {document} checkpoint")
+            raise
+        if cursor:
+            self.cursor_cache.delete(document)
+        return trade_stream, is_last_iteration
+
+    def parse_partition(self, item):
+        controller, trade_data = item
+        # If stream, parsed already
+        if isinstance(trade_data, TradeStream):
+            return item
+        return controller, controller.parse_data(trade_data)
+
+    def validate_partition(self, item):
+        controller, trades = item
+        if isinstance(trades, TradeStream):
+            return self.validate_stream(controller, trades)
+        valid_trades = controller.get_valid_trades(trades)
+        data_frame = None
+        data = {}
+        # Are there any trades?
+        if len(valid_trades):
+            data_frame = controller.get_data_frame(valid_trades)
+            is_complete = controller.get_is_complete(valid_trades)
+            # Trades are in descending order
+            data = controller.get_firebase_data(data_frame, reverse=True)
+        # No trades
+        else:
+            is_complete = True
+        data["ok"] = is_complete
+        document = controller.get_document_name(controller.partition)
+        self.pending_documents.set(document, data)
+        return controller, data_frame, data
+
+    def validate_stream(self, controller, trade_stream):
+        """Pages were validated, as they arrived."""
+        trade_stream.buffer.close()
+        data_frame = None
+        # Are there any trades?
+        if trade_stream.buffer.num_rows:
+            data_frame = trade_stream.buffer
+            is_complete = controller.get_is_complete(trade_stream.first)
+        # No trades
+        else:
+            trade_stream.buffer.remove()
+            is_complete = True
+        data = controller.get_summary_data(trade_stream.summary)
+        data["ok"] = is_complete
+        document = controller.get_document_name(controller.partition)
+        self.pending_documents.set(document, data)
+        return controller, data_frame, data
 
-    def get_price(self, trade):
-        raise NotImplementedError
+    def write_partition(self, item):
+        controller, data_frame, data = item
+        try:
+            if data_frame is not None:
+                controller.write(data_frame, is_complete=data["ok"], data=data)
+            else:
+                controller.set_firebase(data, is_complete=True)
+        finally:
+            if isinstance(data_frame, TradeBuffer):
+                data_frame.remove()
+        document = controller.get_document_name(controller.partition)
+        self.pending_documents.remove(document)
+
+    def fetch_api(self, pagination_id, stream=False):
+        if stream:
+            return self.iter_api(
+                self.api_symbol, pagination_id, self.log_prefix, stream=True
+            )
+        return self.iter_api(self.api_symbol, pagination_id, self.log_prefix)
 
-    def get_volume(self, trade):
+    def iter_api(self, symbol, pagination_id, log_prefix):
         raise NotImplementedError
 
-    def get_notional(self, trade):
-        raise NotImplementedError
+    def get_expected_ticks(self):
+        """Ticks of the last partition, which was summarized already."""
+        data = self.get_last_document(self.partition)
+        if data:
+            return data.get("ticks", None)
 
-    def get_tick_rule(self, trade):
-        raise NotImplementedError
+    def parse_data(self, data):
+        return parse_trades(self.get_page_columns(data))
 
-    def get_index(self, trade):
+    def get_page_columns(self, data):
+        """
+        Columns of a page of trades, i.e. uid, timestamp as epoch nanoseconds,
+        price and volume or notional as strings, tickRule, and index.
+        """
         raise NotImplementedError
 
     def get_is_complete(self, trades):
@@ -251,23 +422,31 @@ class FinTickREST(FinTick):
 
     def get_data_frame(self, trades):
         columns = get_schema_columns(self.schema)
-        data_frame = pd.DataFrame(trades, columns=columns)
+        data_frame = trades.reindex(columns=columns).reset_index(drop=True)
         self.assert_data_frame(data_frame, trades)
         return data_frame
 
-    def write(self, data_frame, is_complete=False):
+    def write(self, data_frame, is_complete=False, data=None):
         # BigQuery
         suffix = self.get_suffix(sep="_")
         table_id = get_table_id(self.exchange, suffix=suffix)
         partition_decorator = self.get_partition_decorator(self.partition)
         bigquery_loader = self.get_bigquery_loader(table_id, partition_decorator)
-        bigquery_loader.write_table(self.schema, data_frame)
-        # Firebase
-        data_frame = data_frame.iloc[::-1]  # Reverse data frame
-        self.set_firebase(data_frame, is_complete=is_complete)
+        # If buffer, from Parquet
+        if isinstance(data_frame, TradeBuffer):
+            bigquery_loader.write_table(self.schema, data_frame.path)
+        else:
+            bigquery_loader.write_table(self.schema, get_decimal_data_frame(data_frame))
+        # Firebase, trades are in descending order. Maybe, summarized already
+        if data is None:
+            data = data_frame
+        self.set_firebase(data, is_complete=is_complete, reverse=True)
 
 
 class FinTickIntegerPaginationMixin:
+    # If the partition was sought
+    seek_id = None
+
     def get_pagination_id(self, data=None):
         pagination_id = None
         # Assert pagination_id, if not current partition
@@ -277,24 +456,85 @@ class FinTickIntegerPaginationMixin:
             last_partition = self.get_last_partition(self.partition)
             last_document = self.get_document_name(last_partition)
             last_data = self.get_document(last_partition)
-            assert last_data, f"No data for {last_document}"
             was_current_partition = last_partition == self.get_partition(now)
+            # Maybe seek, so partitions needn't be in order
+            is_last_ok = last_data and last_data.get("ok", False)
+            if not is_last_ok and not was_current_partition:
+                try:
+                    return self.seek_pagination_id()
+                except NotImplementedError:
+                    pass
+            assert last_data, f"No data for {last_document}"
             if not was_current_partition:
                 assert last_data["ok"] is True
             if "open" in last_data:
                 pagination_id = int(last_data["open"]["index"])
             else:
-                last = self.firestore_cache.get_one(order_by="open.index")
+                last = self.get_one_document(order_by="open.index")
                 if "open" in last:
                     pagination_id = int(last["open"]["index"])
             document = self.get_document_name(self.partition)
             assert pagination_id, f'No "pagination_id" for {document}'
         return pagination_id
 
+    def seek_pagination_id(self):
+        """First trade id after the partition, which is open of the last partition."""
+        timestamp = self.timestamp_to + datetime.timedelta(microseconds=1)
+        # Trades of the partition, and the last partition, bound the seek
+        low = self.get_seek_bound(self.get_document(self.partition), "close")
+        high = self.get_seek_bound(self.get_last_document(self.partition), "open")
+        self.seek_id = self.seek_api(
+            self.api_symbol, timestamp, self.log_prefix, low=low, high=high
+        )
+        return self.seek_id
+
+    def get_seek_bound(self, data, key):
+        """Trade, as id and timestamp, of a summary."""
+        if data and key in data:
+            trade = data[key]
+            return int(trade["index"]), trade["timestamp"]
+
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        raise NotImplementedError
+
+    def is_seek_complete(self, trades):
+        """If sought, trades are from the first trade after the partition."""
+        return self.seek_id is not None
+
+    def get_is_complete(self, trades):
+        return self.is_seek_complete(trades) or super().get_is_complete(trades)
+
 
 class FinTickSequentialIntegerMixin(FinTickIntegerPaginationMixin):
     """Binance, ByBit, and Coinbase REST API"""
 
+    def fetch_api(self, pagination_id, stream=False):
+        # Trade ids are sequential, so the range of the partition is fetched
+        # concurrently, if supported
+        if pagination_id is not None:
+            ticks = self.get_expected_ticks()
+            if ticks:
+                try:
+                    return self.iter_api_range(
+                        self.api_symbol,
+                        pagination_id,
+                        ticks,
+                        self.log_prefix,
+                        stream=stream,
+                    )
+                except NotImplementedError:
+                    pass
+        return super().fetch_api(pagination_id, stream=stream)
+
+    def iter_api_range(self, symbol, pagination_id, ticks, log_prefix, stream=False):
+        raise NotImplementedError
+
+    def is_seek_complete(self, trades):
+        # No missing trades, after the first
+        if self.seek_id is not None and len(trades):
+            return int(trades["index"].iloc[0]) + 1 == self.seek_id
+        return False
+
     def assert_data_frame(self, data_frame, trades):
         # Duplicates.
         assert len(data_frame["uid"].unique()) == len(trades)
@@ -304,6 +544,26 @@ class FinTickSequentialIntegerMixin(FinTickIntegerPaginationMixin):
         assert abs(diff.sum()) == expected
 
 
+class FinTickTimePaginationMixin:
+    """BitMEX, Bitfinex, and FTX REST API"""
+
+    def fetch_api(self, pagination_id, stream=False):
+        # If not resumed, windows of the partition are fetched concurrently
+        if pagination_id == self.get_pagination_id():
+            ticks = self.get_expected_ticks()
+            if ticks:
+                try:
+                    return self.iter_api_windows(
+                        self.api_symbol, ticks, self.log_prefix, stream=stream
+                    )
+                except NotImplementedError:
+                    pass
+        return super().fetch_api(pagination_id, stream=stream)
+
+    def iter_api_windows(self, symbol, ticks, log_prefix, stream=False):
+        raise NotImplementedError
+
+
 class FinTickNonSequentialIntegerMixin:
     """Bitfinex, Bitflyer, and FTX REST API"""
 
@@ -323,6 +583,8 @@ class FinTickNonSequentialIntegerMixin:
 
 
 class FinTickMultiSymbolREST(FinTickREST):
+    summary_by = "symbol"
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.symbols = self.get_symbols()
@@ -345,59 +607,89 @@ class FinTickMultiSymbolREST(FinTickREST):
         else:
             return super().is_data_OK(data)
 
+    @property
+    def max_workers(self):
+        """Symbols paginated concurrently, bounded by provider request limits."""
+        return 1
+
     def main(self):
-        for partition in self.iter_partition():
-            data = self.get_document(partition)
-            if not self.is_data_OK(data):
-                trades = []
-                is_last_iteration = []
-                # Iterate symbols
-                for active_symbol in self.active_symbols:
-                    pagination_id = self.get_pagination_id()
-                    symbol = active_symbol["symbol"]
-                    log_prefix = f"{self.exchange_display} {symbol}"
-                    t, is_last = self.iter_api(
-                        active_symbol["api_symbol"], pagination_id, log_prefix
-                    )
-                    trades += self.parse_data(
-                        t, active_symbol["symbol"], active_symbol["expiry"]
-                    )
-                    is_last_iteration.append(is_last)
-                valid_trades = self.get_valid_trades(trades)
-                # Are there any trades?
-                if len(valid_trades):
-                    data_frame = self.get_data_frame(valid_trades)
-                    is_complete = self.get_is_complete(valid_trades)
-                    self.write(data_frame, is_complete=is_complete)
-                # No trades
-                else:
-                    self.set_firebase({}, is_complete=True)
-                # Complete
-                if all(is_last_iteration):
-                    break
+        with ThreadPoolExecutor(max_workers=self.max_workers) as self.executor:
+            super().main()
+
+    def fetch_partition(self, data=None):
+        # Iterate symbols
+        active_symbols = self.active_symbols
+        if self.stream:
+            return self.stream_symbols(active_symbols)
+        futures = [
+            self.executor.submit(
+                self.iter_symbol, active_symbol, self.get_pagination_id()
+            )
+            for active_symbol in active_symbols
+        ]
+        # Same order as active symbols
+        trade_data = []
+        is_last_iteration = []
+        for active_symbol, future in zip(active_symbols, futures):
+            trades, is_last = future.result()
+            trade_data.append((active_symbol, trades))
+            is_last_iteration.append(is_last)
+        # Complete
+        return trade_data, all(is_last_iteration)
+
+    def stream_symbols(self, active_symbols):
+        # Symbols are spilled to the same buffer
+        trade_stream = TradeStream(self)
+        futures = [
+            self.executor.submit(
+                self.stream_symbol,
+                trade_stream,
+                active_symbol,
+                self.get_pagination_id(),
+            )
+            for active_symbol in active_symbols
+        ]
+        is_last_iteration = [future.result() for future in futures]
+        return trade_stream, all(is_last_iteration)
+
+    def stream_symbol(self, trade_stream, active_symbol, pagination_id):
+        pages = self.iter_symbol(active_symbol, pagination_id, stream=True)
+        return trade_stream.consume(
+            pages,
+            lambda data: self.parse_data(
+                data, active_symbol["symbol"], active_symbol["expiry"]
+            ),
+        )
 
-    def parse_data(self, data, symbol, expiry):
-        return [
-            {
-                "uid": self.get_uid(trade),
-                "symbol": symbol,
-                "expiry": expiry,
-                "timestamp": self.get_timestamp(trade),
-                "nanoseconds": self.get_nanoseconds(trade),
-                "price": self.get_price(trade),
-                "volume": self.get_volume(trade),
-                "notional": self.get_notional(trade),
-                "tickRule": self.get_tick_rule(trade),
-                "index": self.get_index(trade),
-            }
-            for trade in data
+    def iter_symbol(self, active_symbol, pagination_id, stream=False):
+        symbol = active_symbol["symbol"]
+        log_prefix = f"{self.exchange_display} {symbol}"
+        api_symbol = active_symbol["api_symbol"]
+        if stream:
+            return self.iter_api(api_symbol, pagination_id, log_prefix, stream=True)
+        return self.iter_api(api_symbol, pagination_id, log_prefix)
+
+    def parse_partition(self, item):
+        controller, trade_data = item
+        # If stream, parsed already
+        if isinstance(trade_data, TradeStream):
+            return item
+        data_frames = [
+            controller.parse_data(trades, s["symbol"], s["expiry"])
+            for s, trades in trade_data
         ]
+        return controller, concat_trades(data_frames)
+
+    def parse_data(self, data, symbol, expiry):
+        data_frame = super().parse_data(data)
+        data_frame["symbol"] = symbol
+        data_frame["expiry"] = pd.Timestamp(expiry)
+        return data_frame
 
-    def get_firebase_data(self, data_frame):
+    def get_summary_data(self, summary):
         data = {}
-        for symbol in data_frame.symbol.unique():
-            df = data_frame[data_frame.symbol == symbol]
-            data[symbol] = super().get_firebase_data(df)
+        for symbol, d in summary.items():
+            data[symbol] = firestore_data(d)
             for s in self.symbols:
                 if s["symbol"] == symbol:
                     for key in ("api_symbol", "expiry"):
@@ -1,4 +1,6 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 
 import pandas as pd
 import pendulum
@@ -12,14 +14,15 @@ from ..bqloader import (
 )
 from ..downloader import (
     HistoricalDownloader,
-    calculate_notional,
-    calculate_tick_rule,
+    get_decimal_data_frame,
+    get_dump_cache,
+    get_dump_index,
+    normalize_trades,
     set_dtypes,
-    strip_nanoseconds,
-    utc_timestamp,
 )
 from ..fscache import FirestoreCache
 from ..utils import parse_period_from_to
+from .pipeline import Pipeline
 
 
 class FinTickDailyMixin:
@@ -50,15 +53,18 @@ class FinTickDailyMixin:
 
     def iter_partition(self):
         for partition in self.partition_iterator:
-            self.timestamp_from = datetime.datetime.combine(
-                partition, datetime.datetime.min.time()
-            ).replace(microsecond=0, tzinfo=datetime.timezone.utc)
-            self.timestamp_to = datetime.datetime.combine(
-                partition, datetime.datetime.max.time()
-            ).replace(tzinfo=datetime.timezone.utc)
-            self.partition = partition
+            self.set_partition(partition)
             yield partition
 
+    def set_partition(self, partition):
+        self.timestamp_from = datetime.datetime.combine(
+            partition, datetime.datetime.min.time()
+        ).replace(microsecond=0, tzinfo=datetime.timezone.utc)
+        self.timestamp_to = datetime.datetime.combine(
+            partition, datetime.datetime.max.time()
+        ).replace(tzinfo=datetime.timezone.utc)
+        self.partition = partition
+
 
 class FinTickMultiSymbolDailyMixin(FinTickDailyMixin):
     @property
@@ -72,7 +78,16 @@ class FinTickMultiSymbolDailyMixin(FinTickDailyMixin):
 
 
 class FinTickDailyS3Mixin(FinTickDailyMixin):
-    """BitMEX and ByBit S3"""
+    """BitMEX and ByBit S3, and Binance archives"""
+
+    def __init__(self, *args, max_workers=1, fixed_point=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_workers = max_workers
+        # Price and volume as scaled int64, rather than Decimal
+        self.fixed_point = fixed_point
+        # Shared by all partitions, so hits and misses are counted per run
+        self.dump_cache = get_dump_cache()
+        self.dump_index = get_dump_index()
 
     def get_url(self, partition):
         raise NotImplementedError
@@ -82,28 +97,109 @@ class FinTickDailyS3Mixin(FinTickDailyMixin):
         raise NotImplementedError
 
     def main(self):
+        """
+        Partitions are downloaded and parsed by up to max_workers threads, while
+        the writer writes partitions one at a time, in order.
+        """
+        dumps = self.get_dumps()
+        if dumps is not None and self.verbose:
+            self.print_workload(dumps)
+        # Submitted, maybe not yet started
+        self.pending_futures = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Bounded, so few more than max_workers partitions are in memory
+            self.pipeline = Pipeline(maxsize=self.max_workers)
+            try:
+                # Only partitions which will be visited
+                with self.prefetch(self.iter_dump_partition(dumps)):
+                    self.pipeline.run(
+                        self.iter_fetch(executor, dumps), self.write_partition
+                    )
+            finally:
+                # Python 3.7, so no shutdown(cancel_futures=True)
+                for future in self.pending_futures:
+                    future.cancel()
+                executor.shutdown()
+        if self.dump_cache is not None and self.verbose:
+            print(f"{self.log_prefix}: cache {self.dump_cache.stats}")
+
+    def iter_dump_partition(self, dumps, verbose=False):
+        first_dump = min(dumps) if dumps else None
         for partition in self.iter_partition():
-            document = self.get_document_name(partition)
-            data = self.get_document(partition)
-            if not self.is_data_OK(data):
-                url = self.get_url(partition)
-                if self.verbose:
-                    print(f"{self.log_prefix}: downloading {document}")
-                data_frame = HistoricalDownloader(url, columns=self.get_columns).main()
-                if data_frame is not None:
-                    df = self.filter_dataframe(data_frame)
-                    if len(df):
-                        df = self.parse_dataframe(df)
-                        if len(df):
-                            self.write(df)
-                    else:
-                        if self.verbose:
-                            print(f"{self.log_prefix}: Done")
-                        break
-                else:
-                    if self.verbose:
+            if dumps is not None:
+                # Before first dump, so no need to probe
+                if not dumps or partition < first_dump:
+                    if verbose:
                         print(f"{self.log_prefix}: Done")
                     break
+                # Maybe, not yet published
+                if partition not in dumps:
+                    continue
+            yield partition
+
+    def iter_fetch(self, executor, dumps):
+        for partition in self.iter_dump_partition(dumps, verbose=self.verbose):
+            data = self.get_document(partition)
+            if not self.is_data_OK(data):
+                # Copy, so workers have state for the partition
+                controller = copy(self)
+                future = executor.submit(controller.fetch)
+                self.pending_futures.append(future)
+                yield controller, future
+
+    def write_partition(self, item):
+        if not self.commit(*item):
+            self.pipeline.stop()
+
+    def get_dumps(self):
+        """Available dumps as {date: size}, or None if not indexed."""
+        return None
+
+    def print_workload(self, dumps):
+        dates = [d for d in dumps if self.period_from <= d <= self.period_to]
+        sizes = [dumps[d] for d in dates if dumps[d] is not None]
+        workload = f"{len(dates)} dumps"
+        if sizes:
+            workload += f", {sum(sizes)} bytes"
+        print(f"{self.log_prefix}: {workload}")
+
+    def fetch(self):
+        url = self.get_url(self.partition)
+        if url is not None:
+            if self.verbose:
+                document = self.get_document_name(self.partition)
+                print(f"{self.log_prefix}: downloading {document}")
+            df = self.download(url)
+            if df is not None and len(df):
+                return self.parse_dataframe(df)
+
+    def commit(self, controller, future):
+        df = future.result()
+        if df is not None:
+            if len(df):
+                controller.write(df)
+            return True
+        else:
+            if self.verbose:
+                print(f"{self.log_prefix}: Done")
+            return False
+
+    def get_downloader(self, url):
+        return HistoricalDownloader(
+            url, columns=self.get_columns, cache=self.dump_cache
+        )
+
+    def download(self, url):
+        downloader = self.get_downloader(url)
+        # Maybe, not verifiable
+        if downloader is not None:
+            data_frames = downloader.stream()
+            if data_frames is not None:
+                # Filter each block, so only rows for the symbol are held in memory
+                filtered = [self.filter_dataframe(df) for df in data_frames]
+                if filtered:
+                    return pd.concat(filtered)
+                return pd.DataFrame(columns=self.get_columns)
 
     def filter_dataframe(self, data_frame):
         if "symbol" in data_frame.columns:
@@ -111,11 +207,11 @@ class FinTickDailyS3Mixin(FinTickDailyMixin):
         return data_frame
 
     def parse_dataframe(self, data_frame):
-        data_frame = set_dtypes(data_frame)
-        data_frame = utc_timestamp(data_frame)
-        data_frame = strip_nanoseconds(data_frame)
-        data_frame = calculate_notional(data_frame)
-        data_frame = calculate_tick_rule(data_frame)
+        data_frame = set_dtypes(data_frame, fixed_point=self.fixed_point)
+        data_frame = normalize_trades(data_frame)
+        return self.select_columns(data_frame)
+
+    def select_columns(self, data_frame):
         columns = get_schema_columns(self.schema)
         return data_frame[columns]
 
@@ -125,7 +221,7 @@ class FinTickDailyS3Mixin(FinTickDailyMixin):
         table_id = get_table_id(self.exchange, suffix=suffix)
         partition_decorator = self.get_partition_decorator(self.partition)
         bigquery_loader = self.get_bigquery_loader(table_id, partition_decorator)
-        bigquery_loader.write_table(self.schema, data_frame)
+        bigquery_loader.write_table(self.schema, get_decimal_data_frame(data_frame))
         # Firebase
         self.set_firebase(data_frame, is_complete=True)
 
@@ -136,6 +232,13 @@ class FinTickDailyHourlyMixin:
         collection = f"{self.firestore_cache.collection}-hot"
         return FirestoreCache(collection).get(document_name)
 
+    def get_hourly_documents(self, timestamps):
+        """Hourly documents, in bulk."""
+        document_names = [timestamp.strftime("%Y-%m-%dT%H") for timestamp in timestamps]
+        collection = f"{self.firestore_cache.collection}-hot"
+        documents = FirestoreCache(collection).get_all(document_names)
+        return [documents[document_name] for document_name in document_names]
+
 
 class FinTickDailySequentialIntegerPaginationMixin(FinTickDailyHourlyMixin):
     def get_pagination_id(self, data=None):
@@ -163,32 +266,30 @@ class FinTickDailySequentialIntegerMixin(FinTickDailySequentialIntegerPagination
     def get_is_complete(self, trades):
         now = datetime.datetime.utcnow()
         assert not self.partition == self.get_partition(now)
+        if self.is_seek_complete(trades):
+            return True
         if len(trades):
-            last_index = trades[0]["index"]
+            last_index = int(trades["index"].iloc[0])
             timestamp_from, _, _, date_to = parse_period_from_to()
             # Maybe hourly
             if self.partition == date_to:
                 data = self.get_hourly_document(timestamp_from)
             # Maybe no trades in last partition
             else:
-                data = self.firestore_cache.get_one(
-                    where=["open.index", "==", last_index + 1]
-                )
+                data = self.get_one_document(where=["open.index", "==", last_index + 1])
             assert data["open"]["index"] == last_index + 1
         return True
 
 
 class FinTickDailyPartitionFromHourlyMixin(FinTickDailyMixin, FinTickDailyHourlyMixin):
     def main(self):
+        # Only the first partition, so not prefetched
         for partition in self.iter_partition():
             data = self.get_document(partition)
             ok = self.is_data_OK(data)
             if not ok:
                 period = pendulum.period(self.timestamp_from, self.timestamp_to)
-                documents = [
-                    self.get_hourly_document(timestamp)
-                    for timestamp in period.range("hours")
-                ]
+                documents = self.get_hourly_documents(period.range("hours"))
                 has_data = all([document and document["ok"] for document in documents])
                 if has_data:
                     data_frame = self.load_data_frame()
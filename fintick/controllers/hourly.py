@@ -39,14 +39,17 @@ class FinTickHourlyMixin:
 
     def iter_partition(self):
         for dt in self.partition_iterator:
-            self.timestamp_from = self.partition = self.get_partition(dt)
-            self.timestamp_to = (
-                self.timestamp_from
-                + pd.Timedelta("1 hour")
-                - datetime.timedelta(microseconds=1)
-            )
+            self.set_partition(self.get_partition(dt))
             yield self.partition
 
+    def set_partition(self, partition):
+        self.timestamp_from = self.partition = partition
+        self.timestamp_to = (
+            self.timestamp_from
+            + pd.Timedelta("1 hour")
+            - datetime.timedelta(microseconds=1)
+        )
+
 
 class FinTickMultiSymbolHourlyMixin(FinTickHourlyMixin):
     @property
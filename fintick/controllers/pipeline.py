@@ -0,0 +1,138 @@
+import queue
+import threading
+
+# After the last item
+DONE = object()
+
+
+class Pipeline:
+    """
+    Stages run concurrently, each in a thread, connected by bounded queues. Each
+    stage processes items in order, so the last stage is ordered.
+
+    If a stage raises, or stop is called, all stages stop. Errors are raised by run.
+    """
+
+    def __init__(self, maxsize=1, timeout=0.1):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.stopped = threading.Event()
+        self.errors = []
+
+    def run(self, items, *stages):
+        queues = [queue.Queue(maxsize=self.maxsize) for _ in stages]
+        threads = [threading.Thread(target=self.produce, args=(items, queues[0]))]
+        for index, stage in enumerate(stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            thread = threading.Thread(target=self.work, args=(stage, inbox, outbox))
+            threads.append(thread)
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+    def stop(self):
+        self.stopped.set()
+
+    def fail(self, error):
+        self.errors.append(error)
+        self.stop()
+
+    def produce(self, items, outbox):
+        try:
+            for item in items:
+                if not self.put(outbox, item):
+                    break
+        except Exception as e:
+            self.fail(e)
+        self.put(outbox, DONE)
+
+    def work(self, stage, inbox, outbox):
+        while True:
+            item = self.get(inbox)
+            if item is DONE:
+                break
+            try:
+                result = stage(item)
+            except Exception as e:
+                self.fail(e)
+                break
+            if outbox is not None and not self.put(outbox, result):
+                break
+        if outbox is not None:
+            self.put(outbox, DONE)
+
+    def get(self, inbox):
+        while not self.stopped.is_set():
+            try:
+                return inbox.get(timeout=self.timeout)
+            except queue.Empty:
+                pass
+        return DONE
+
+    def put(self, outbox, item):
+        while not self.stopped.is_set():
+            try:
+                outbox.put(item, timeout=self.timeout)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+class PendingDocuments:
+    """
+    Firestore documents, after they are validated, until they are written. So, the
+    next partition needn't wait for the writer, i.e. for its pagination_id.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.documents = {}
+        self.condition = threading.Condition()
+
+    def add(self, document):
+        with self.condition:
+            self.documents[document] = None  # Not yet validated
+
+    def set(self, document, data):
+        with self.condition:
+            self.documents[document] = data
+            self.condition.notify_all()
+
+    def remove(self, document):
+        with self.condition:
+            self.documents.pop(document, None)
+            self.condition.notify_all()
+
+    def find(self, key, value):
+        """Validated document, where key, such as open.index, is value."""
+        with self.condition:
+            for data in self.documents.values():
+                if data is not None and get_value(data, key) == value:
+                    return data
+
+    def join(self):
+        """Until all documents are written."""
+        with self.condition:
+            while self.documents and not self.pipeline.stopped.is_set():
+                self.condition.wait(self.pipeline.timeout)
+
+    def get(self, document):
+        with self.condition:
+            while document in self.documents and self.documents[document] is None:
+                if self.pipeline.stopped.is_set():
+                    return
+                self.condition.wait(self.pipeline.timeout)
+            return self.documents.get(document)
+
+
+def get_value(data, key):
+    for k in key.split("."):
+        if not isinstance(data, dict) or k not in data:
+            return
+        data = data[k]
+    return data
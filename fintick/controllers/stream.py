@@ -0,0 +1,180 @@
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+from pyarrow import parquet as pq
+
+from ..bqloader import get_arrow_schema
+from ..constants import CHECKPOINT_BUCKET, CHECKPOINT_DIR
+from ..downloader import TradeBuffer, concat_trades, merge_summaries, summarize_trades
+from ..fscache import firestore_data
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def get_checkpoint_dir():
+    """If CHECKPOINT_DIR is set, checkpoints are spilled there."""
+    directory = os.environ.get(CHECKPOINT_DIR, None)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def get_checkpoint_bucket():
+    """
+    If CHECKPOINT_BUCKET is set, checkpoints are uploaded to GCS. So, a checkpoint is
+    resumed by any instance, rather than only the instance with the spill.
+    """
+    return os.environ.get(CHECKPOINT_BUCKET, None)
+
+
+def get_storage_bucket(bucket):
+    return storage.Client().bucket(bucket)
+
+
+def upload_checkpoint(bucket, path):
+    name = os.path.basename(path)
+    get_storage_bucket(bucket).blob(name).upload_from_filename(path)
+    return f"gs://{bucket}/{name}"
+
+
+def download_checkpoint(uri, directory=None):
+    """Local copy of a checkpoint on GCS, or None if not found."""
+    bucket, name = uri[len("gs://") :].split("/", 1)
+    fd, path = tempfile.mkstemp(suffix=".parquet", dir=directory)
+    os.close(fd)
+    try:
+        get_storage_bucket(bucket).blob(name).download_to_filename(path)
+    except NotFound:
+        os.remove(path)
+        return
+    return path
+
+
+def delete_checkpoint(uri):
+    bucket, name = uri[len("gs://") :].split("/", 1)
+    try:
+        get_storage_bucket(bucket).blob(name).delete()
+    except NotFound:
+        pass
+
+
+class TradeStream:
+    """
+    Pages of trades are validated, summarized, and spilled to a buffer as they
+    arrive. So, memory depends on the page size, not the partition size.
+
+    If the deadline is exceeded, the buffer and the next pagination_id are a
+    checkpoint, from which a later stream resumes.
+    """
+
+    def __init__(self, controller, directory=None, bucket=None):
+        self.controller = controller
+        self.directory = directory
+        self.bucket = bucket
+        self.buffer = TradeBuffer(get_arrow_schema(controller.schema), directory)
+        self.summary = {}
+        self.first = None  # Valid trades of the first page
+        self.last = None  # Last valid trade
+        self.uids = None  # Of the last page
+        self.pagination_id = None
+        self.lock = threading.Lock()
+
+    def consume(self, pages, parse, deadline=None):
+        last, uids = self.last, self.uids
+        is_last_iteration = True
+        for data, is_last_iteration, pagination_id in pages:
+            if len(data):
+                last, uids = self.append(parse(data), last, uids)
+            if not is_last_iteration and deadline and time.time() >= deadline:
+                self.last, self.uids = last, uids
+                self.pagination_id = pagination_id
+                raise DeadlineExceeded(pagination_id)
+        return is_last_iteration
+
+    def append(self, trades, last=None, uids=None):
+        controller = self.controller
+        trades = controller.get_valid_trades(trades)
+        # Pages may overlap
+        if uids is not None:
+            trades = trades[~np.isin(trades["uid"].values, uids)]
+        if not len(trades):
+            return last, uids
+        # With the last trade of the previous page, so assertions span pages
+        data_frame = controller.get_data_frame(concat_trades([last, trades]))
+        # By uid, as the last trade may be sorted, i.e. Bitfinex
+        if last is not None:
+            is_last = data_frame["uid"].values == last["uid"].values[0]
+            data_frame = data_frame[~is_last]
+        summary = summarize_trades(data_frame, by=controller.summary_by, reverse=True)
+        with self.lock:
+            self.buffer.append(data_frame)
+            # Pages are in descending order
+            self.summary = merge_summaries(summary, self.summary)
+            if self.first is None:
+                self.first = data_frame
+        return data_frame.iloc[-1:], data_frame["uid"].values
+
+    def checkpoint(self):
+        """Cursor, from which to resume."""
+        self.buffer.close()
+        path = self.buffer.path
+        if self.bucket:
+            path = upload_checkpoint(self.bucket, path)
+            self.buffer.remove()
+        cursor = {
+            "paginationId": self.pagination_id,
+            "path": path,
+            "rows": self.buffer.num_rows,
+        }
+        # Summary is not recalculated, so Decimal totals are the same
+        if None in self.summary:
+            cursor["summary"] = firestore_data(self.summary[None])
+        return cursor
+
+    def resume(self, cursor):
+        """Pagination_id, if the buffer of the checkpoint exists."""
+        path = uri = cursor["path"]
+        is_remote = uri.startswith("gs://")
+        if is_remote:
+            path = download_checkpoint(uri, self.directory)
+            if path is None:
+                return
+        try:
+            parquet_file = pq.ParquetFile(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return
+        if parquet_file.metadata.num_rows != cursor["rows"]:
+            if is_remote:
+                os.remove(path)
+            return
+        if "summary" in cursor:
+            self.summary = {None: read_summary(cursor["summary"])}
+        if parquet_file.num_row_groups:
+            self.first = read_row_group(parquet_file, 0)
+            page = read_row_group(parquet_file, -1)
+            self.last, self.uids = page.iloc[-1:], page["uid"].values
+        self.buffer.extend(path)
+        os.remove(path)
+        if is_remote:
+            delete_checkpoint(uri)
+        return cursor["paginationId"]
+
+
+def read_row_group(parquet_file, index):
+    index %= parquet_file.num_row_groups
+    return parquet_file.read_row_group(index).to_pandas()
+
+
+def read_summary(data):
+    summary = firestore_data(data, deserialize=True)
+    for key in ("open", "low", "high", "close"):
+        summary[key] = firestore_data(summary[key], deserialize=True)
+    return summary
@@ -0,0 +1,198 @@
+import datetime
+import json
+import time
+from copy import copy
+
+import pandas as pd
+
+try:
+    from websockets.exceptions import WebSocketException
+    from websockets.sync.client import connect
+except ImportError:
+    connect = None  # Optional, pip install websockets
+    WebSocketException = OSError
+
+from ..constants import (
+    WEBSOCKET_CHUNK_SIZE,
+    WEBSOCKET_FLUSH_DELAY,
+    WEBSOCKET_GAP_MARGIN,
+    WEBSOCKET_RECONNECT_DELAY,
+    WEBSOCKET_TIMEOUT,
+)
+from ..downloader import concat_trades
+
+
+class FinTickWebsocketMixin:
+    """
+    Long running. Trades from the websocket are buffered by hourly partition, then
+    written once the partition is complete. Gaps, i.e. before the first connection,
+    or while reconnecting, are repaired from the REST API.
+    """
+
+    def __init__(self, *args, max_partitions=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_partitions = max_partitions
+        self.pending = []  # Not yet parsed
+        self.buffers = {}  # Data frames, by partition
+        self.connected = []  # Intervals, as [from, to]
+        self.next_partition = None
+        self.written = 0
+
+    @property
+    def websocket_url(self):
+        raise NotImplementedError
+
+    def get_subscribe_messages(self):
+        raise NotImplementedError
+
+    def parse_message(self, message):
+        """Trades of a message, as from the REST API."""
+        raise NotImplementedError
+
+    def get_gap_pagination_id(self):
+        """REST API pagination_id, at the end of a gap."""
+        return self.get_pagination_id()
+
+    def get_now(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    @property
+    def is_done(self):
+        if self.max_partitions is not None and self.written >= self.max_partitions:
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def main(self):
+        assert connect is not None, 'Required package "websockets" not installed'
+        while not self.is_done:
+            try:
+                self.receive()
+            except (WebSocketException, OSError) as e:
+                print(f"{self.log_prefix}: Disconnected, {e}")
+                time.sleep(WEBSOCKET_RECONNECT_DELAY)
+                # Maybe, complete while disconnected
+                self.flush()
+
+    def receive(self):
+        with connect(self.websocket_url) as websocket:
+            for message in self.get_subscribe_messages():
+                websocket.send(json.dumps(message))
+            now = self.get_now()
+            self.connected.append([now, now])
+            if self.next_partition is None:
+                self.next_partition = self.get_partition(now)
+            if self.verbose:
+                print(f"{self.log_prefix}: Connected")
+            while not self.is_done:
+                try:
+                    message = websocket.recv(timeout=WEBSOCKET_TIMEOUT)
+                except TimeoutError:
+                    # No trades, but is the connection alive?
+                    if not websocket.ping().wait(WEBSOCKET_TIMEOUT):
+                        raise TimeoutError("No pong")
+                    self.connected[-1][1] = self.get_now()
+                else:
+                    data = json.loads(message, parse_float=str)
+                    self.pending += self.parse_message(data)
+                    self.connected[-1][1] = self.get_now()
+                    if len(self.pending) >= WEBSOCKET_CHUNK_SIZE:
+                        self.buffer()
+                self.flush()
+
+    def buffer(self):
+        if self.pending:
+            trades = self.parse_data(self.pending)
+            self.pending = []
+            partitions = trades["timestamp"].dt.floor("1h")
+            for partition, data_frame in trades.groupby(partitions, sort=False):
+                partition = partition.to_pydatetime()
+                # Too late, or before the first connection
+                if partition < self.next_partition:
+                    if self.verbose:
+                        print(f"{self.log_prefix}: Discarded {len(data_frame)} trades")
+                else:
+                    data_frame.attrs = trades.attrs  # Groupby drops attrs
+                    self.buffers.setdefault(partition, []).append(data_frame)
+
+    def flush(self):
+        if self.next_partition is None:
+            return
+        delay = pd.Timedelta(f"{WEBSOCKET_FLUSH_DELAY}s")
+        while not self.is_done:
+            timestamp_to = self.next_partition + pd.Timedelta("1h")
+            if self.get_now() < timestamp_to + delay:
+                break
+            self.buffer()
+            self.flush_partition(self.next_partition)
+            self.next_partition = timestamp_to
+            self.written += 1
+            # Not needed, by the next partition
+            self.connected = [c for c in self.connected if c[1] > timestamp_to]
+
+    def flush_partition(self, partition):
+        # Copy, with state for the partition
+        controller = copy(self)
+        controller.set_partition(partition)
+        data_frames = self.buffers.pop(partition, [])
+        data = controller.get_document(partition)
+        if controller.is_data_OK(data):
+            return
+        for timestamp_from, timestamp_to in self.get_gaps(
+            controller.timestamp_from, controller.timestamp_to
+        ):
+            data_frames.append(controller.repair(timestamp_from, timestamp_to))
+        try:
+            controller.write_trades(concat_trades(data_frames))
+        except AssertionError:
+            # Maybe, a message was missed. So, the partition is repaired
+            print(f"{self.log_prefix}: {controller.get_document_name(partition)} gap")
+            data_frame = controller.repair(
+                controller.timestamp_from, controller.timestamp_to
+            )
+            controller.write_trades(concat_trades([data_frame]))
+
+    def get_gaps(self, timestamp_from, timestamp_to):
+        """Intervals of the partition, while not connected, with a margin."""
+        margin = pd.Timedelta(f"{WEBSOCKET_GAP_MARGIN}s")
+        gaps = []
+        start = timestamp_from
+        for connected_from, connected_to in self.connected:
+            connected_from += margin
+            connected_to -= margin
+            if connected_from < connected_to:
+                if start < connected_from:
+                    gaps.append((start, min(connected_from, timestamp_to)))
+                start = max(start, connected_to)
+                if start >= timestamp_to:
+                    break
+        if start < timestamp_to:
+            gaps.append((start, timestamp_to))
+        return gaps
+
+    def repair(self, timestamp_from, timestamp_to):
+        """Trades of a gap, from the REST API, in order."""
+        self.timestamp_from = timestamp_from
+        self.timestamp_to = timestamp_to
+        pagination_id = self.get_gap_pagination_id()
+        trades, _ = self.iter_api(self.api_symbol, pagination_id, self.log_prefix)
+        if self.verbose:
+            print(f"{self.log_prefix}: Repaired {timestamp_from} to {timestamp_to}")
+        self.set_partition(self.partition)
+        if trades:
+            data_frame = self.parse_data(trades)
+            # REST API trades are in descending order
+            return data_frame.iloc[::-1]
+
+    def write_trades(self, trades):
+        valid_trades = self.get_valid_trades(trades) if len(trades) else trades
+        # Are there any trades?
+        if len(valid_trades):
+            # In descending order, like the REST API
+            valid_trades = valid_trades.iloc[::-1].sort_values(
+                ["timestamp", "nanoseconds"], ascending=False, kind="stable"
+            )
+            data_frame = self.get_data_frame(valid_trades)
+            self.write(data_frame, is_complete=True)
+        # No trades
+        else:
+            self.set_firebase({}, is_complete=True)
@@ -0,0 +1,99 @@
+import datetime
+import threading
+
+
+class Cursor:
+    """
+    Next pagination_id, from the last trade of a page. If no trades of a page are
+    new, pagination is stalled, i.e. more trades at a timestamp than a page.
+
+    Requests, and wasted requests without new trades, are counted. Copies, such as
+    for concurrent windows, share counts.
+    """
+
+    def __init__(self, get_api_pagination_id, get_api_uid=None):
+        self.get_api_pagination_id = get_api_pagination_id
+        self.get_api_uid = get_api_uid
+        self.counts = {"requests": 0, "wasted": 0}
+        self.lock = threading.Lock()
+
+    def __call__(self, timestamp, last_data=[], data=[]):
+        is_stalled = self.is_stalled(last_data, data)
+        with self.lock:
+            self.counts["requests"] += 1
+            if is_stalled:
+                self.counts["wasted"] += 1
+        return self.get_pagination_id(timestamp, last_data, data, is_stalled)
+
+    @property
+    def requests(self):
+        return self.counts["requests"]
+
+    @property
+    def wasted(self):
+        return self.counts["wasted"]
+
+    def is_stalled(self, last_data, data):
+        if self.get_api_uid is None or not len(data):
+            return False
+        uids = {self.get_api_uid(trade) for trade in last_data}
+        return all(self.get_api_uid(trade) in uids for trade in data)
+
+    def get_pagination_id(self, timestamp, last_data, data, is_stalled):
+        return self.get_api_pagination_id(timestamp, last_data=last_data, data=data)
+
+    def report(self, log_prefix):
+        print(f"{log_prefix}: {self.requests} requests, {self.wasted} wasted")
+
+
+class NudgeCursor(Cursor):
+    """
+    FTX, and Bitfinex, have no offset. So, if a page is at one timestamp, the next
+    page is before the timestamp, rather than stalling. Trades at the timestamp,
+    after the page, are not paginated.
+    """
+
+    def __init__(
+        self,
+        get_api_pagination_id,
+        get_api_uid,
+        get_api_timestamp,
+        max_results,
+        resolution=datetime.timedelta(microseconds=1),
+    ):
+        super().__init__(get_api_pagination_id, get_api_uid=get_api_uid)
+        self.get_api_timestamp = get_api_timestamp
+        self.max_results = max_results
+        self.resolution = resolution
+
+    def get_pagination_id(self, timestamp, last_data, data, is_stalled):
+        is_full = len(data) == self.max_results
+        if is_stalled or (is_full and self.get_api_timestamp(data[0]) == timestamp):
+            timestamp -= self.resolution
+        return super().get_pagination_id(timestamp, last_data, data, is_stalled)
+
+
+class OffsetCursor(Cursor):
+    """
+    BitMEX pagination by endTime is inclusive. If stalled, trades at the timestamp
+    are paginated by offset, as (pagination_id, offset).
+    """
+
+    offset = 0
+    timestamp = None
+
+    def get_pagination_id(self, timestamp, last_data, data, is_stalled):
+        # Still at the timestamp
+        if self.offset and timestamp == self.timestamp:
+            self.offset += len(data)
+        elif is_stalled:
+            self.offset = len(data)
+        else:
+            self.offset = 0
+        self.timestamp = timestamp
+        pagination_id = super().get_pagination_id(
+            timestamp, last_data, data, is_stalled
+        )
+        if self.offset:
+            return pagination_id, self.offset
+        return pagination_id
@@ -1,11 +1,24 @@
+from .buffer import TradeBuffer
+from .cache import DumpCache, get_dump_cache
 from .downloader import HistoricalDownloader
+from .index import DumpIndex, get_dump_index
 from .lib import (
     assert_type_decimal,
     calculate_notional,
     calculate_tick_rule,
+    concat_trades,
+    filter_trades,
+    get_decimal_data_frame,
+    get_scales,
+    get_sortable,
+    merge_summaries,
+    normalize_trades,
+    parse_trades,
     row_to_json,
     set_dtypes,
     strip_nanoseconds,
+    sum_decimal,
+    summarize_trades,
     utc_timestamp,
 )
 
@@ -14,8 +27,23 @@ __all__ = [
     "strip_nanoseconds",
     "calculate_notional",
     "calculate_tick_rule",
+    "normalize_trades",
+    "parse_trades",
+    "concat_trades",
+    "filter_trades",
     "set_dtypes",
     "assert_type_decimal",
+    "get_decimal_data_frame",
+    "get_scales",
+    "get_sortable",
+    "sum_decimal",
+    "summarize_trades",
+    "merge_summaries",
     "row_to_json",
     "HistoricalDownloader",
+    "TradeBuffer",
+    "DumpCache",
+    "get_dump_cache",
+    "DumpIndex",
+    "get_dump_index",
 ]
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+import pyarrow as pa
+from pyarrow import parquet as pq
+
+from .lib import fixed_point_to_arrow, get_scales
+
+
+class TradeBuffer:
+    """
+    Trades spilled to a local Parquet file, a row group per append. So, memory
+    depends on the size of each append, not the total.
+    """
+
+    def __init__(self, schema, directory=None):
+        self.schema = schema
+        fd, self.path = tempfile.mkstemp(suffix=".parquet", dir=directory)
+        os.close(fd)
+        self.writer = pq.ParquetWriter(self.path, schema)
+        self.num_rows = 0
+
+    def append(self, data_frame):
+        scales = get_scales(data_frame)
+        arrays = []
+        for field in self.schema:
+            values = data_frame[field.name]
+            if field.name in scales:
+                values = fixed_point_to_arrow(values.values, scales[field.name])
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.num_rows += len(data_frame)
+
+    def extend(self, path):
+        """Row groups of a Parquet file, such as a checkpoint."""
+        parquet_file = pq.ParquetFile(path)
+        for index in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(index)
+            self.writer.write_table(table.cast(self.schema))
+            self.num_rows += table.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def read(self):
+        self.close()
+        return pq.read_table(self.path).to_pandas()
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
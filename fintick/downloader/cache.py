@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from ..constants import DUMP_CACHE_DIR, DUMP_CACHE_MAX_BYTES
+from .constants import MAX_BYTES
+
+
+def get_dump_cache():
+    """If DUMP_CACHE_DIR is set, dumps are cached on disk."""
+    directory = os.environ.get(DUMP_CACHE_DIR, None)
+    if directory:
+        max_bytes = int(os.environ.get(DUMP_CACHE_MAX_BYTES, MAX_BYTES))
+        return DumpCache(directory, max_bytes=max_bytes)
+
+
+class DumpCache:
+    """
+    Dumps are keyed by URL, and validated by size and ETag. If the byte budget is
+    exceeded, the least recently used dumps are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0
+        self.miss_bytes = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get_path(self, url):
+        return os.path.join(self.directory, self.get_key(url))
+
+    def get_meta(self, path):
+        try:
+            with open(f"{path}.json", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, url, size=None, etag=None):
+        path = self.get_path(url)
+        meta = self.get_meta(path)
+        if meta and self.is_valid(path, meta, size=size, etag=etag):
+            # Most recently used
+            os.utime(path)
+            with self.lock:
+                self.hits += 1
+                self.hit_bytes += meta["size"]
+            return path
+        with self.lock:
+            self.misses += 1
+
+    def is_valid(self, path, meta, size=None, etag=None):
+        try:
+            cached_size = os.path.getsize(path)
+        except FileNotFoundError:
+            return False
+        if cached_size != meta["size"]:
+            return False
+        if size is not None and size != cached_size:
+            return False
+        if etag is not None and etag != meta["etag"]:
+            return False
+        return True
+
+    def put(self, url, filename, etag=None):
+        path = self.get_path(url)
+        size = os.path.getsize(filename)
+        # Meta is the commit marker. So, removed until the dump is replaced
+        try:
+            os.remove(f"{path}.json")
+        except FileNotFoundError:
+            pass
+        # Atomic, so a partial dump is never read
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(filename, temp_path)
+        os.replace(temp_path, path)
+        with open(temp_path, "w") as f:
+            json.dump({"url": url, "etag": etag, "size": size}, f)
+        os.replace(temp_path, f"{path}.json")
+        with self.lock:
+            self.miss_bytes += size
+        self.evict()
+        return path
+
+    def evict(self):
+        with self.lock:
+            paths = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if "." not in name
+            ]
+            entries = []
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes = sum([size for _, size, _ in entries])
+            # Least recently used first
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                for p in (path, f"{path}.json"):
+                    try:
+                        os.remove(p)
+                    except FileNotFoundError:
+                        pass
+                total_bytes -= size
+
+    @property
+    def stats(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.hit_bytes} bytes saved, {self.miss_bytes} bytes downloaded"
+        )
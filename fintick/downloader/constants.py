@@ -0,0 +1,33 @@
+import numpy as np
+
+# Bytes of uncompressed CSV parsed per block, when streaming
+BLOCK_SIZE = 16 * 1024 * 1024  # 16MB
+
+# Retries per chunk, before giving up
+MAX_RETRIES = 5
+RETRY_DELAY = 1  # Seconds, multiplied by retry
+TIMEOUT = 30  # Seconds
+
+# Default byte budget for cached dumps
+MAX_BYTES = 10 * 1024 * 1024 * 1024  # 10GB
+# If not listed until the requested date, seconds until dumps are listed again
+INDEX_MAX_AGE = 60 * 60  # 1 hour
+
+TICK_DIRECTIONS = ("PlusTick", "ZeroPlusTick", "MinusTick", "ZeroMinusTick")
+# Tick rule per tick direction, then -1 for unknown
+TICK_RULES = np.array([1, 1, -1, -1, -1], dtype="int64")
+
+# Fixed point, as scaled int64
+PRECISION = 38  # Max precision of decimal128
+MAX_SCALE = 18
+MAX_INT64 = np.iinfo(np.int64).max
+
+# Summed, when summaries are merged
+SUMMARY_TOTALS = (
+    "volume",
+    "buyVolume",
+    "notional",
+    "buyNotional",
+    "ticks",
+    "buyTicks",
+)
@@ -1,38 +1,201 @@
+import hashlib
 import os
+import time
+import zipfile
+from contextlib import contextmanager
 from tempfile import NamedTemporaryFile
 
 import httpx
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv
+
+from .constants import BLOCK_SIZE, MAX_RETRIES, RETRY_DELAY, TIMEOUT
 
 
 class HistoricalDownloader:
-    def __init__(self, url, columns):
+    def __init__(
+        self,
+        url,
+        columns,
+        block_size=BLOCK_SIZE,
+        cache=None,
+        column_names=None,
+        compression="gzip",
+        checksum=None,
+    ):
         self.url = url
         self.columns = columns
+        self.block_size = block_size
+        self.cache = cache
+        # If no header, names of all columns
+        self.column_names = column_names
+        # Either gzip, or zip with one CSV
+        self.compression = compression
+        # SHA-256, as hex
+        self.checksum = checksum
 
     def main(self):
-        # Streaming downloads with boto3 and httpx gave many EOFErrors
-        # Not a problem with regular downloads
-        response = httpx.get(self.url)
-        if response.status_code == 200:
-            temp_file = NamedTemporaryFile()
-            filename = temp_file.name
-            with open(filename, "wb+") as temp:
-                temp.write(response.content)
-                size = os.path.getsize(filename)
-                if size > 0:
-                    # Extract
-                    return self._extract(filename)
-                else:
-                    print(f"No data: {self.url}")
+        temp_file = self.download()
+        if temp_file is not None:
+            with temp_file:
+                # Extract
+                return self._extract(temp_file.name)
+
+    def stream(self):
+        """
+        Like main, but parses the gzipped CSV in blocks. Returns a generator of data
+        frames, so peak memory depends on block_size, rather than file size.
+        """
+        temp_file = self.download()
+        if temp_file is not None:
+            return self._iter_data_frames(temp_file)
+
+    def download(self):
+        if self.cache is not None:
+            return self._download_with_cache()
+        return self._download()
+
+    def _download(self):
+        """
+        Downloads in chunks, to disk. If the connection drops, resumes with an HTTP
+        Range request. The file is returned only if the size, and maybe checksum, is
+        verified.
+        """
+        temp_file = NamedTemporaryFile()
+        size = None
+        etag = None
+        retries = 0
+        while True:
+            offset = temp_file.tell()
+            headers = {}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                # If the dump changed, the server returns all of it
+                if etag:
+                    headers["If-Range"] = etag
+            try:
+                with httpx.stream(
+                    "GET", self.url, headers=headers, timeout=TIMEOUT
+                ) as response:
+                    if response.status_code == 200:
+                        # Range not supported, or changed, so restart
+                        temp_file.seek(0)
+                        temp_file.truncate()
+                        size = get_content_length(response)
+                        etag = response.headers.get("etag", None)
+                    elif response.status_code != 206 or not offset:
+                        temp_file.close()
+                        print(f"Error {response.status_code}: {self.url}")
+                        return
+                    # As received, so bytes are not lost if the connection drops
+                    for chunk in response.iter_raw():
+                        temp_file.write(chunk)
+                break
+            except httpx.TransportError as exception:
+                # Retries are per chunk, so reset if there was progress
+                retries = 1 if temp_file.tell() > offset else retries + 1
+                if retries > MAX_RETRIES:
+                    temp_file.close()
+                    print(f"Error {exception}: {self.url}")
+                    return
+                print(f"Retry {retries}: {self.url}, from byte {temp_file.tell()}")
+                time.sleep(RETRY_DELAY * retries)
+        temp_file.flush()
+        total_bytes = os.path.getsize(temp_file.name)
+        if size is not None and total_bytes != size:
+            temp_file.close()
+            print(f"Incomplete {total_bytes}/{size} bytes: {self.url}")
+        elif self.checksum and get_sha256(temp_file.name) != self.checksum.lower():
+            temp_file.close()
+            print(f"Checksum mismatch: {self.url}")
+        elif total_bytes > 0:
+            return temp_file
         else:
-            print(f"Error {response.status_code}: {self.url}")
+            temp_file.close()
+            print(f"No data: {self.url}")
+
+    def _download_with_cache(self):
+        try:
+            response = httpx.head(self.url, timeout=TIMEOUT)
+        except httpx.TransportError as exception:
+            print(f"Error {exception}: {self.url}")
+            response = None
+        if response is not None and response.status_code == 200:
+            size = response.headers.get("content-length", None)
+            size = int(size) if size is not None else None
+            etag = response.headers.get("etag", None)
+            path = self.cache.get(self.url, size=size, etag=etag)
+            if path:
+                return open(path, "rb")
+            temp_file = self._download()
+            if temp_file is not None:
+                self.cache.put(self.url, temp_file.name, etag=etag)
+            return temp_file
+        else:
+            if response is not None:
+                print(f"Error {response.status_code}: {self.url}")
+            # Not validated, so not cached
+            return self._download()
 
     def _extract(self, filename):
         return pd.read_csv(
             filename,
             usecols=self.columns,
             engine="python",
-            compression="gzip",
+            compression=self.compression,
+            header=None if self.column_names else "infer",
+            names=self.column_names,
             dtype={col: "str" for col in self.columns},
         )
+
+    def _iter_data_frames(self, temp_file):
+        with temp_file:
+            offset = 0
+            for batch in self._iter_batches(temp_file.name):
+                data_frame = batch.to_pandas()
+                # Index is row number within file, as with _extract
+                data_frame.index = pd.RangeIndex(offset, offset + len(data_frame))
+                offset += len(data_frame)
+                yield data_frame
+
+    def _iter_batches(self, filename):
+        read_options = csv.ReadOptions(
+            block_size=self.block_size, column_names=self.column_names
+        )
+        convert_options = csv.ConvertOptions(
+            include_columns=list(self.columns),
+            column_types={col: pa.string() for col in self.columns},
+            strings_can_be_null=True,
+        )
+        with self._open(filename) as stream:
+            reader = csv.open_csv(
+                stream, read_options=read_options, convert_options=convert_options
+            )
+            for batch in reader:
+                yield batch
+
+    @contextmanager
+    def _open(self, filename):
+        if self.compression == "zip":
+            with zipfile.ZipFile(filename) as zip_file:
+                with zip_file.open(zip_file.namelist()[0]) as stream:
+                    yield stream
+        else:
+            with pa.input_stream(filename, compression=self.compression) as stream:
+                yield stream
+
+
+def get_content_length(response):
+    # Raw bytes, so same as content-length even if content-encoding
+    content_length = response.headers.get("content-length", None)
+    if content_length is not None:
+        return int(content_length)
+
+
+def get_sha256(filename):
+    sha256 = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
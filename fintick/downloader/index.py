@@ -0,0 +1,87 @@
+import datetime
+import json
+import os
+import threading
+
+from ..constants import DUMP_CACHE_DIR
+from .constants import INDEX_MAX_AGE
+
+
+def get_dump_index():
+    """If DUMP_CACHE_DIR is set, the index is also saved on disk."""
+    return DumpIndex(os.environ.get(DUMP_CACHE_DIR, None))
+
+
+class DumpIndex:
+    """
+    Dumps available per provider and symbol, as {date: size}. Size is None if not
+    listed. Refreshed on demand, or if not listed until the requested date.
+    """
+
+    # Shared, so each provider and symbol is listed once per process
+    indexes = {}
+    lock = threading.Lock()
+
+    def __init__(self, directory=None, max_age=INDEX_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key):
+        # Not evicted by DumpCache, which ignores names with "."
+        return os.path.join(self.directory, f"{key}.index.json")
+
+    def get(self, key, list_dumps, date_to=None, refresh=False):
+        with self.lock:
+            index = self.indexes.get(key, None) or self.load(key)
+            if refresh or self.is_stale(index, date_to):
+                dumps = list_dumps()
+                # If error, maybe use stale index
+                if dumps is not None:
+                    index = {"updated": datetime.datetime.utcnow(), "dumps": dumps}
+                    self.save(key, index)
+            if index is not None:
+                self.indexes[key] = index
+                return index["dumps"]
+
+    def is_stale(self, index, date_to=None):
+        if index is None:
+            return True
+        if date_to is not None:
+            dumps = index["dumps"]
+            if not dumps or max(dumps) < date_to:
+                age = datetime.datetime.utcnow() - index["updated"]
+                return age.total_seconds() > self.max_age
+        return False
+
+    def load(self, key):
+        if self.directory:
+            try:
+                with open(self.get_path(key), "r") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+            else:
+                return {
+                    "updated": datetime.datetime.fromisoformat(data["updated"]),
+                    "dumps": {
+                        datetime.date.fromisoformat(date): size
+                        for date, size in data["dumps"].items()
+                    },
+                }
+
+    def save(self, key, index):
+        if self.directory:
+            data = {
+                "updated": index["updated"].isoformat(),
+                "dumps": {
+                    date.isoformat(): size for date, size in index["dumps"].items()
+                },
+            }
+            path = self.get_path(key)
+            # Atomic, so a partial index is never read
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, path)
@@ -1,6 +1,20 @@
 from datetime import timezone
 from decimal import Decimal
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import compute as pc
+
+from .constants import (
+    MAX_INT64,
+    MAX_SCALE,
+    PRECISION,
+    SUMMARY_TOTALS,
+    TICK_DIRECTIONS,
+    TICK_RULES,
+)
+
 
 def utc_timestamp(data_frame):
     # Because pyarrow.lib.ArrowInvalid: Casting from timestamp[ns]
@@ -18,9 +32,9 @@ def strip_nanoseconds(data_frame):
         lambda x: x.timestamp.nanosecond, axis=1
     )
     data_frame.timestamp = data_frame.apply(
-        lambda x: x.timestamp.replace(nanosecond=0)
-        if x.nanoseconds > 0
-        else x.timestamp,
+        lambda x: (
+            x.timestamp.replace(nanosecond=0) if x.nanoseconds > 0 else x.timestamp
+        ),
         axis=1,
     )
     return data_frame
@@ -39,10 +53,161 @@ def calculate_tick_rule(data_frame):
     return data_frame
 
 
-def set_dtypes(data_frame):
+def normalize_trades(data_frame):
+    """
+    Columnar equivalent of utc_timestamp, strip_nanoseconds, calculate_notional,
+    and calculate_tick_rule.
+    """
+    timestamp = data_frame["timestamp"]
+    if timestamp.dt.tz is None:
+        timestamp = timestamp.dt.tz_localize(timezone.utc)
+    # Nanoseconds since epoch, split with integer arithmetic
+    epoch = timestamp.values.view("int64")
+    nanoseconds = epoch % 1000
+    data_frame["timestamp"] = pd.to_datetime(epoch - nanoseconds, utc=True)
+    data_frame["nanoseconds"] = nanoseconds
+    # Notional is a quotient, so is Decimal
+    data_frame["notional"] = get_decimal(data_frame, "volume") / get_decimal(
+        data_frame, "price"
+    )
+    # Unknown tick directions have code -1, which is the last tick rule
+    codes = pd.Categorical(
+        data_frame["tickDirection"], categories=TICK_DIRECTIONS
+    ).codes
+    data_frame["tickRule"] = TICK_RULES[codes]
+    return data_frame
+
+
+def parse_trades(columns):
+    """
+    Data frame from the columns of a page of trades, i.e. uid, timestamp as epoch
+    nanoseconds, price, either volume or notional, tickRule, and index.
+    """
+    data_frame = pd.DataFrame(columns)
+    # Without price, or volume, not a trade. Also, astype(str) would be "None"
+    numeric = [c for c in ("price", "volume", "notional") if c in data_frame.columns]
+    is_null = data_frame[numeric].isna().any(axis=1).values
+    if is_null.any():
+        print(f"Discarded {int(is_null.sum())} trades without price, or volume")
+        data_frame = data_frame[~is_null].reset_index(drop=True)
+    epoch = data_frame["timestamp"].values.astype("int64")
+    nanoseconds = epoch % 1000
+    data_frame["timestamp"] = pd.to_datetime(epoch - nanoseconds, utc=True)
+    data_frame["nanoseconds"] = nanoseconds
+    for column in ("price", "volume", "notional"):
+        if column in data_frame.columns:
+            data_frame[column] = data_frame[column].astype(str)
+            data_frame = set_type_fixed_point(data_frame, column)
+    # Either volume is a product, or notional is a quotient
+    if "notional" in data_frame.columns:
+        set_fixed_point(
+            data_frame, "volume", *multiply(data_frame, "price", "notional")
+        )
+    else:
+        data_frame["notional"] = get_decimal(data_frame, "volume") / get_decimal(
+            data_frame, "price"
+        )
+    data_frame["tickRule"] = data_frame["tickRule"].values.astype("int8")
+    return data_frame
+
+
+def filter_trades(data_frame, timestamp_from, timestamp_to):
+    """
+    Trades within timestamp bounds, with the first seen of each uid. Also, the
+    number of trades outside bounds, and duplicates.
+    """
+    epoch = data_frame["timestamp"].values.view("int64")
+    is_valid = (epoch >= pd.Timestamp(timestamp_from).value) & (
+        epoch <= pd.Timestamp(timestamp_to).value
+    )
+    within = np.flatnonzero(is_valid)
+    is_duplicate = ~get_first_seen(data_frame["uid"].values[within])
+    is_valid[within[is_duplicate]] = False
+    outside = len(epoch) - len(within)
+    duplicates = int(is_duplicate.sum())
+    if outside or duplicates:
+        data_frame = data_frame[is_valid]
+    return data_frame, outside, duplicates
+
+
+def get_first_seen(values):
+    # Codes are in order of first appearance, so first seen if greater than all
+    # previous codes
+    codes, _ = pd.factorize(values)
+    if not len(codes):
+        return np.ones(0, dtype=bool)
+    previous = np.maximum.accumulate(codes)[:-1]
+    return codes > np.concatenate([[-1], previous])
+
+
+def multiply(data_frame, x, y):
+    """Fixed point, with the sum of scales, if int64. Otherwise, Decimal."""
+    scales = get_scales(data_frame)
+    if x in scales and y in scales:
+        values_x = data_frame[x].values
+        values_y = data_frame[y].values
+        max_x = int(np.abs(values_x).max()) if len(values_x) else 0
+        max_y = int(np.abs(values_y).max()) if len(values_y) else 0
+        if max_x * max_y <= MAX_INT64 and scales[x] + scales[y] <= PRECISION:
+            return values_x * values_y, scales[x] + scales[y]
+    return get_decimal(data_frame, x) * get_decimal(data_frame, y), None
+
+
+def set_fixed_point(data_frame, column, values, scale):
+    """If no scale, values are Decimal."""
+    data_frame[column] = values
+    scales = dict(get_scales(data_frame))
+    if scale is None:
+        scales.pop(column, None)
+    else:
+        scales[column] = scale
+    data_frame.attrs["scales"] = scales
+    return data_frame
+
+
+def concat_trades(data_frames):
+    """
+    Concatenate data frames, with fixed point columns at the greatest scale. If not
+    int64 at the greatest scale, Decimal.
+    """
+    data_frames = [df for df in data_frames if df is not None]
+    if not data_frames:
+        return pd.DataFrame()
+    all_scales = [get_scales(df) for df in data_frames]
+    scales = {}
+    for column in set().union(*all_scales):
+        if all([column in s for s in all_scales]):
+            scale = max([s[column] for s in all_scales])
+            if all([can_rescale(df, column, scale) for df in data_frames]):
+                scales[column] = scale
+    dfs = []
+    for df in data_frames:
+        df = df.copy()
+        for column, scale in get_scales(df).items():
+            if column in scales:
+                factor = 10 ** (scales[column] - scale)
+                df[column] = df[column].values * factor
+            else:
+                df[column] = get_decimal(df, column)
+        dfs.append(df)
+    data_frame = pd.concat(dfs, ignore_index=True)
+    data_frame.attrs["scales"] = scales
+    return data_frame
+
+
+def can_rescale(data_frame, column, scale):
+    values = data_frame[column].values
+    factor = 10 ** (scale - get_scales(data_frame)[column])
+    return not len(values) or int(np.abs(values).max()) <= MAX_INT64 // factor
+
+
+def set_dtypes(data_frame, fixed_point=False):
     df = data_frame.astype({"index": "int64"})
     for column in ("price", "volume"):
-        df = set_type_decimal(df, column)
+        if fixed_point:
+            df = set_type_fixed_point(df, column)
+        else:
+            df = set_type_decimal(df, column)
     return df
 
 
@@ -51,17 +216,232 @@ def set_type_decimal(data_frame, column):
     return data_frame
 
 
+def set_type_fixed_point(data_frame, column):
+    """
+    Scaled int64, with the least scale that is exact. Scales are stored in
+    data_frame.attrs. If not exact, Decimal.
+    """
+    array = pa.array(data_frame[column].values, type=pa.string(), from_pandas=True)
+    fixed_point = to_fixed_point(array)
+    if fixed_point is None:
+        return set_type_decimal(data_frame, column)
+    values, scale = fixed_point
+    data_frame[column] = values
+    data_frame.attrs["scales"] = {**get_scales(data_frame), column: scale}
+    return data_frame
+
+
+def get_scales(data_frame):
+    return data_frame.attrs.get("scales", {})
+
+
+def to_fixed_point(array):
+    if array.null_count:
+        return
+    if not len(array):
+        return np.array([], dtype=np.int64), 0
+    decimals = cast_decimal(array, MAX_SCALE)
+    if decimals is not None:
+        # Least scale, by binary search
+        low, high = 0, MAX_SCALE
+        while low < high:
+            scale = (low + high) // 2
+            if cast_decimal(decimals, scale) is None:
+                low = scale + 1
+            else:
+                high = scale
+        decimals = cast_decimal(decimals, low)
+        # Decimal128 is little endian, low then high int64 words
+        words = np.frombuffer(
+            decimals.buffers()[1],
+            dtype=np.int64,
+            count=len(decimals) * 2,
+            offset=decimals.offset * 16,
+        )
+        values = words[0::2]
+        # Does it fit in int64?
+        if np.array_equal(words[1::2], values >> 63):
+            return values.copy(), low
+
+
+def cast_decimal(array, scale):
+    try:
+        return pc.cast(array, pa.decimal128(PRECISION, scale))
+    except pa.ArrowInvalid:
+        pass  # Not exact
+
+
+def fixed_point_to_decimal(values, scale):
+    return fixed_point_to_arrow(values, scale).to_numpy(zero_copy_only=False)
+
+
+def fixed_point_to_arrow(values, scale):
+    values = np.ascontiguousarray(values, dtype=np.int64)
+    words = np.empty(len(values) * 2, dtype=np.int64)
+    words[0::2] = values
+    words[1::2] = values >> 63  # Sign extension
+    return pa.Array.from_buffers(
+        pa.decimal128(PRECISION, scale), len(values), [None, pa.py_buffer(words)]
+    )
+
+
+def int_to_decimal(value, scale):
+    return Decimal(f"{int(value)}E-{scale}")
+
+
+def get_decimal(data_frame, column):
+    scale = get_scales(data_frame).get(column, None)
+    if scale is None:
+        return data_frame[column]
+    values = fixed_point_to_decimal(data_frame[column].values, scale)
+    return pd.Series(values, index=data_frame.index, name=column)
+
+
+def get_decimal_data_frame(data_frame):
+    """Fixed point columns to Decimal, such as for BigQuery BIGNUMERIC."""
+    scales = get_scales(data_frame)
+    if scales:
+        df = data_frame.copy()
+        for column in scales:
+            if column in df.columns:
+                df[column] = get_decimal(data_frame, column)
+        df.attrs["scales"] = {}
+        return df
+    return data_frame
+
+
+def get_sortable(data_frame, column):
+    # Can't use idxmin/idxmax with Decimal type
+    if column in get_scales(data_frame):
+        return data_frame[column]
+    return data_frame[column].astype(float)
+
+
+def sum_decimal(data_frame, column):
+    scale = get_scales(data_frame).get(column, None)
+    if scale is None:
+        return data_frame[column].sum()
+    values = data_frame[column].values
+    # Python int, if int64 may overflow
+    if len(values) and np.abs(values).max() > MAX_INT64 // len(values):
+        total = sum(values.tolist())
+    else:
+        total = values.sum()
+    return int_to_decimal(total, scale)
+
+
+def summarize_trades(data_frame, by=None, reverse=False):
+    """
+    Open, low, high, and close, with volume, notional, and ticks, and their buy side
+    totals, for each group in one pass. If reverse, trades are in descending order.
+    """
+    total_rows = len(data_frame)
+    if not total_rows:
+        return {}
+    # Positions in ascending order, so open is first, and close is last
+    order = np.arange(total_rows)
+    if reverse:
+        order = order[::-1]
+    if by is None:
+        keys = [None]
+        starts = np.array([0])
+        # Views, in ascending order, as Decimal sums are rounded
+        index = slice(None, None, -1) if reverse else slice(None)
+    else:
+        codes, keys = pd.factorize(data_frame[by])
+        # By group, then position. Stable, so linear time for integers
+        order = order[np.argsort(codes[order], kind="stable")]
+        starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+        keys = keys[codes[order[starts]]]
+        index = order
+    ends = np.append(starts[1:], total_rows)
+    # Ties are the first, in ascending order
+    price = get_sortable(data_frame, "price").values[order]
+    lows = order[get_first(price, np.minimum.reduceat(price, starts), starts, ends)]
+    highs = order[get_first(price, np.maximum.reduceat(price, starts), starts, ends)]
+    is_buy = data_frame["tickRule"].values[index] == 1
+    scales = get_scales(data_frame)
+    totals = {}
+    for column in ("volume", "notional"):
+        values = data_frame[column].values[index]
+        buy_values = np.where(is_buy, values, 0)
+        scale = scales.get(column, None)
+        totals[column] = sum_groups(values, starts, scale)
+        totals[f"buy{column.capitalize()}"] = sum_groups(buy_values, starts, scale)
+    buy_ticks = np.add.reduceat(is_buy.astype(np.int64), starts)
+    summary = {}
+    for group, key in enumerate(keys):
+        summary[key] = {
+            "open": row_to_json(data_frame.iloc[order[starts[group]]], scales),
+            "low": row_to_json(data_frame.iloc[lows[group]], scales),
+            "high": row_to_json(data_frame.iloc[highs[group]], scales),
+            "close": row_to_json(data_frame.iloc[order[ends[group] - 1]], scales),
+            "volume": totals["volume"][group],
+            "buyVolume": totals["buyVolume"][group],
+            "notional": totals["notional"][group],
+            "buyNotional": totals["buyNotional"][group],
+            "ticks": int(ends[group] - starts[group]),
+            "buyTicks": int(buy_ticks[group]),
+        }
+    return summary
+
+
+def merge_summaries(before, after):
+    """
+    Summaries, such as from summarize_trades, of consecutive trades. If a key is in
+    both, open is before, and close is after.
+    """
+    summary = {**before, **after}
+    for key in set(before).intersection(after):
+        b, a = before[key], after[key]
+        summary[key] = {
+            "open": b["open"],
+            # Ties are the first
+            "low": b["low"] if b["low"]["price"] <= a["low"]["price"] else a["low"],
+            "high": (
+                b["high"] if b["high"]["price"] >= a["high"]["price"] else a["high"]
+            ),
+            "close": a["close"],
+        }
+        for total in SUMMARY_TOTALS:
+            summary[key][total] = b[total] + a[total]
+    return summary
+
+
+def get_first(values, targets, starts, ends):
+    """First position of the target of each contiguous group."""
+    matches = np.flatnonzero(values == np.repeat(targets, ends - starts))
+    return matches[np.searchsorted(matches, starts)]
+
+
+def sum_groups(values, starts, scale=None):
+    """Sum of contiguous groups. If fixed point, as Decimal."""
+    if scale is None:
+        return list(np.add.reduceat(values, starts))
+    ends = np.append(starts[1:], len(values))
+    # Python int, if int64 may overflow
+    if np.abs(values).max() > MAX_INT64 // (ends - starts).max():
+        totals = [sum(values[start:end].tolist()) for start, end in zip(starts, ends)]
+    else:
+        totals = np.add.reduceat(values, starts)
+    return [int_to_decimal(total, scale) for total in totals]
+
+
 def assert_type_decimal(data_frame, columns):
+    scales = get_scales(data_frame)
     for column in columns:
-        data_frame[column].apply(lambda x: assert_decimal(x))
+        if column in scales:
+            assert data_frame[column].dtype == np.int64
+        else:
+            data_frame[column].apply(lambda x: assert_decimal(x))
 
 
 def assert_decimal(x):
     assert isinstance(x, Decimal)
 
 
-def row_to_json(row):
-    return {
+def row_to_json(row, scales={}):
+    data = {
         "timestamp": row.timestamp.to_pydatetime(),
         "nanoseconds": row.nanoseconds,
         "price": row.price,
@@ -70,3 +450,7 @@ def row_to_json(row):
         "tickRule": row.tickRule,
         "index": row["index"],  # B/C pandas index
     }
+    for key, scale in scales.items():
+        if key in data:
+            data[key] = int_to_decimal(data[key], scale)
+    return data
@@ -1,4 +1,5 @@
 from .fscache import FirestoreCache
 from .lib import firestore_data, get_collection_name
+from .prefetch import PrefetchCache
 
-__all__ = ["firestore_data", "get_collection_name", "FirestoreCache"]
+__all__ = ["firestore_data", "get_collection_name", "FirestoreCache", "PrefetchCache"]
@@ -4,7 +4,7 @@ import firebase_admin
 from firebase_admin import firestore
 from firebase_admin.credentials import Certificate
 
-from ..constants import FIREBASE_ADMIN_CREDENTIALS, PROJECT_ID
+from ..constants import FIREBASE_ADMIN_CREDENTIALS, FIRESTORE_BATCH_SIZE, PROJECT_ID
 from ..utils import is_local, set_environment
 
 
@@ -39,6 +39,20 @@ class FirestoreCache:
         if data:
             return data.to_dict()
 
+    def get_all(self, documents):
+        """Documents in bulk, as {document: data}. If not exists, None."""
+        collection = self.firestore.collection(self.collection)
+        data = {document: None for document in documents}
+        for index in range(0, len(documents), FIRESTORE_BATCH_SIZE):
+            references = [
+                collection.document(document)
+                for document in documents[index : index + FIRESTORE_BATCH_SIZE]
+            ]
+            for snapshot in self.firestore.get_all(references):
+                if snapshot.exists:
+                    data[snapshot.id] = snapshot.to_dict()
+        return data
+
     def get_one(self, where=None, order_by=None, direction=firestore.Query.ASCENDING):
         query = self.firestore.collection(self.collection)
         if where:
@@ -0,0 +1,58 @@
+import threading
+from copy import deepcopy
+
+
+class PrefetchCache:
+    """
+    Status documents of partitions, loaded in bulk, then served from memory.
+    Documents which are set, or deleted, are read from Firestore again.
+    """
+
+    def __init__(self, cache, documents):
+        self.cache = cache
+        self.documents = cache.get_all(list(documents))
+        self.lock = threading.Lock()
+
+    def is_initial(self):
+        return self.cache.is_initial()
+
+    def has_data(self, document):
+        data = self.get(document)
+        if data and data.get("ok", False):
+            return True
+
+    def get(self, document):
+        with self.lock:
+            if document in self.documents:
+                # Copy, so not modified
+                return deepcopy(self.documents[document])
+        return self.cache.get(document)
+
+    def get_one(self, where=None, order_by=None, **kwargs):
+        # Maybe, a prefetched document is equal
+        if where and where[1] == "==":
+            key, _, value = where
+            with self.lock:
+                for data in self.documents.values():
+                    if get_field(data, key) == value:
+                        return deepcopy(data)
+        return self.cache.get_one(where=where, order_by=order_by, **kwargs)
+
+    def set(self, document, data):
+        self.cache.set(document, data)
+        with self.lock:
+            self.documents.pop(document, None)
+
+    def delete(self, document):
+        self.cache.delete(document)
+        with self.lock:
+            self.documents.pop(document, None)
+
+
+def get_field(data, key):
+    """Nested field, such as open.index"""
+    for k in key.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(k, None)
+    return data
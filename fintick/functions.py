@@ -2,13 +2,20 @@
 from fintick.providers.binance import BINANCE, binance_perpetual
 
 # from fintick.providers.deribit import DERIBIT, deribit_perpetual
-from fintick.providers.bitfinex import BITFINEX, bitfinex_perpetual
+from fintick.providers.bitfinex import BITFINEX, bitfinex_perpetual, bitfinex_websocket
 from fintick.providers.bitflyer import BITFLYER, bitflyer_perpetual
-from fintick.providers.bitmex import BITMEX, bitmex_futures, bitmex_perpetual
+from fintick.providers.bitmex import (
+    BITMEX,
+    bitmex_futures,
+    bitmex_perpetual,
+    bitmex_websocket,
+)
 from fintick.providers.bybit import BYBIT, bybit_perpetual
-from fintick.providers.coinbase import COINBASE, coinbase_spot
+from fintick.providers.coinbase import COINBASE, coinbase_spot, coinbase_websocket
 from fintick.providers.ftx import BTCMOVE, FTX, ftx_move, ftx_perpetual  # ftx_futures
 from fintick.providers.utils import assert_provider
+from fintick.ratelimit import get_rate_limiter_stats
+from fintick.sessions import get_session_stats
 
 
 def fintick_api(
@@ -17,15 +24,24 @@ def fintick_api(
     period_from: str = None,
     period_to: str = None,
     futures: bool = False,
+    max_workers: int = 1,
+    fixed_point: bool = False,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert_provider(provider)
     assert symbol, 'Required param "symbol" not provided'
     kwargs = {"period_from": period_from, "period_to": period_to, "verbose": verbose}
+    # REST, pages as they arrive, checkpointed before the deadline
+    if provider in (BINANCE, BITFINEX, BITFLYER, COINBASE, FTX):
+        kwargs.update({"stream": stream, "deadline": deadline})
     if provider == BINANCE:
         if futures:
             raise NotImplementedError
         else:
+            # Archive backfill
+            kwargs.update({"max_workers": max_workers, "fixed_point": fixed_point})
             binance_perpetual(symbol, **kwargs)
     elif provider == BITFINEX:
         if futures:
@@ -35,6 +51,8 @@ def fintick_api(
     elif provider == BITFLYER:
         bitflyer_perpetual(symbol, **kwargs)
     elif provider == BITMEX:
+        # S3 backfill
+        kwargs.update({"max_workers": max_workers, "fixed_point": fixed_point})
         if futures:
             bitmex_futures(symbol, **kwargs)
         else:
@@ -43,6 +61,8 @@ def fintick_api(
         if futures:
             raise NotImplementedError
         else:
+            # S3 backfill
+            kwargs.update({"max_workers": max_workers, "fixed_point": fixed_point})
             bybit_perpetual(symbol, **kwargs)
     elif provider == COINBASE:
         if futures:
@@ -60,3 +80,33 @@ def fintick_api(
             ftx_perpetual(symbol, **kwargs)
     # elif provider == UPBIT:
     #     upbit_perpetual(**kwargs)
+    if verbose:
+        for name, stats in get_session_stats().items():
+            print(f"{name.capitalize()} session: {stats}")
+        for name, stats in get_rate_limiter_stats().items():
+            print(f"{name.capitalize()} rate limit: {stats}")
+
+
+def fintick_websocket(
+    provider: str,
+    symbol: str,
+    max_partitions: int = None,
+    deadline: float = None,
+    verbose: bool = False,
+):
+    """Long running, hourly partitions are written once complete."""
+    assert_provider(provider)
+    assert symbol, 'Required param "symbol" not provided'
+    kwargs = {
+        "max_partitions": max_partitions,
+        "deadline": deadline,
+        "verbose": verbose,
+    }
+    if provider == BITFINEX:
+        bitfinex_websocket(symbol, **kwargs)
+    elif provider == BITMEX:
+        bitmex_websocket(symbol, **kwargs)
+    elif provider == COINBASE:
+        coinbase_websocket(symbol, **kwargs)
+    else:
+        raise NotImplementedError
@@ -0,0 +1,146 @@
+import datetime
+import json
+import os
+import threading
+
+from .constants import INSTRUMENT_CACHE_DIR, INSTRUMENT_TTL
+from .fscache import FirestoreCache, get_collection_name
+
+
+def get_instrument_cache():
+    """If INSTRUMENT_CACHE_DIR is set, instruments are also saved on disk."""
+    return InstrumentCache(os.environ.get(INSTRUMENT_CACHE_DIR, None))
+
+
+class InstrumentCache:
+    """
+    Futures per provider and root symbol, in memory, on disk, and in Firestore.
+
+    Active instruments are listed again after the TTL. Expired instruments never
+    change, so are listed once. Thereafter, active instruments expire into them.
+    """
+
+    # Shared, so each provider and root symbol is loaded once per process
+    instruments = {}
+    lock = threading.Lock()
+
+    def __init__(self, directory=None, firestore_cache=None, ttl=INSTRUMENT_TTL):
+        self.directory = directory
+        self._firestore_cache = firestore_cache
+        self.ttl = ttl
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def firestore_cache(self):
+        if self._firestore_cache is None:
+            collection = get_collection_name("instruments")
+            self._firestore_cache = FirestoreCache(collection)
+        return self._firestore_cache
+
+    def get_path(self, key):
+        return os.path.join(self.directory, f"{key}.instruments.json")
+
+    def get(self, key, get_active, get_expired, refresh=False):
+        """Active, then expired, instruments."""
+        with self.lock:
+            entry = self.instruments.get(key, None) or self.load(key)
+            if entry is None:
+                entry = self.list(get_active(), get_expired())
+                self.save(key, entry)
+            elif refresh or self.is_stale(entry):
+                active = get_active()
+                # No longer active, so expired
+                expired = [i for i in entry["active"] if i not in active]
+                entry = self.list(active, entry["expired"] + expired)
+                self.save(key, entry)
+            self.instruments[key] = entry
+            # Copies, so not modified. Maybe, saved before dedupe
+            return [dict(i) for i in dedupe(entry["active"] + entry["expired"])]
+
+    def list(self, active, expired):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        expired = expired + [i for i in active if i["expiry"] <= now]
+        active = [i for i in active if i["expiry"] > now]
+        # By symbol, as expired instruments may still be listed as active
+        symbols = {i["symbol"] for i in active}
+        expired = [i for i in dedupe(expired) if i["symbol"] not in symbols]
+        return {"updated": now, "active": active, "expired": expired}
+
+    def is_stale(self, entry):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # Or, any active instrument expired
+        if any(i["expiry"] <= now for i in entry["active"]):
+            return True
+        return (now - entry["updated"]).total_seconds() > self.ttl
+
+    def load(self, key):
+        data = None
+        if self.directory:
+            try:
+                with open(self.get_path(key), "r") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+        if data is None:
+            data = self.firestore_cache.get(key)
+            if data is not None and self.directory:
+                self.write(key, data)
+        if data is not None:
+            return deserialize(data)
+
+    def save(self, key, entry):
+        data = serialize(entry)
+        if self.directory:
+            self.write(key, data)
+        self.firestore_cache.set(key, data)
+
+    def write(self, key, data):
+        path = self.get_path(key)
+        # Atomic, so a partial file is never read
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+
+def dedupe(instruments):
+    """First of each symbol, in order."""
+    symbols = set()
+    deduped = []
+    for instrument in instruments:
+        if instrument["symbol"] not in symbols:
+            symbols.add(instrument["symbol"])
+            deduped.append(instrument)
+    return deduped
+
+
+def serialize(entry):
+    """As JSON, and Firestore, with timestamps as strings."""
+
+    def serialize_instrument(instrument):
+        return {
+            key: value.isoformat() if isinstance(value, datetime.datetime) else value
+            for key, value in instrument.items()
+        }
+
+    return {
+        "updated": entry["updated"].isoformat(),
+        "active": [serialize_instrument(i) for i in entry["active"]],
+        "expired": [serialize_instrument(i) for i in entry["expired"]],
+    }
+
+
+def deserialize(data):
+    def deserialize_instrument(instrument):
+        instrument = dict(instrument)
+        for key in ("listing", "expiry"):
+            if instrument.get(key, None):
+                instrument[key] = datetime.datetime.fromisoformat(instrument[key])
+        return instrument
+
+    return {
+        "updated": datetime.datetime.fromisoformat(data["updated"]),
+        "active": [deserialize_instrument(i) for i in data["active"]],
+        "expired": [deserialize_instrument(i) for i in data["expired"]],
+    }
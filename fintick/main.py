@@ -1,3 +1,4 @@
+import time
 from copy import copy
 
 from fintick.aggregators import (
@@ -8,11 +9,15 @@ from fintick.aggregators import (
 )
 from fintick.aggregators.constants import CANDLES, RENKO, THRESHOLD
 from fintick.constants import (
+    CHECKPOINT_MARGIN,
+    CHECKPOINT_MAX_ATTEMPTS,
     FINTICK,
     FINTICK_AGGREGATE,
     FINTICK_AGGREGATE_BARS,
     FINTICK_API,
+    FUNCTION_TIMEOUT,
 )
+from fintick.controllers import DeadlineExceeded, get_checkpoint_bucket
 from fintick.fscache import FirestoreCache
 from fintick.functions import fintick_api
 from fintick.pubsub.lib import publish
@@ -48,9 +53,26 @@ def fintick_api_gcp(event, context):
     params = base64_decode_event(event)
     keys = ("provider", "symbol", "period_from", "period_to")
     kwargs = {key: value for key, value in params.items() if key in keys}
-    fintick_api(**kwargs)
-    # Callback
-    publish(FINTICK_AGGREGATE, params)
+    # If not on GCS, checkpoints are on the instance, and not resumed by another, so
+    # not checkpointed
+    deadline = None
+    if get_checkpoint_bucket():
+        deadline = time.time() + FUNCTION_TIMEOUT - CHECKPOINT_MARGIN
+    try:
+        fintick_api(deadline=deadline, **kwargs)
+    except DeadlineExceeded:
+        attempt = params.get("attempt", 0) + 1
+        if attempt >= CHECKPOINT_MAX_ATTEMPTS:
+            raise Exception(
+                f"{params['provider']} {params['symbol']}: {attempt} attempts"
+            )
+        # Again, resumed from the checkpoint
+        params["attempt"] = attempt
+        publish(FINTICK_API, params)
+    else:
+        # Callback, so not an argument of the aggregator
+        params.pop("attempt", None)
+        publish(FINTICK_AGGREGATE, params)
 
 
 def fintick_aggregate_gcp(event, context):
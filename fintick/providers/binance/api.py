@@ -1,17 +1,31 @@
 import datetime
 import os
+import re
 import time
+from xml.etree import ElementTree
 
-import httpx
-
-from ...constants import BINANCE_API_KEY, HTTPX_ERRORS
-from ...utils import iter_api, parse_datetime
+from ...constants import BINANCE_API_KEY, HTTPX_ERRORS, RANGE_MIN_PAGES
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import (
+    SeekExhausted,
+    get_s3_text,
+    iter_api,
+    iter_api_range,
+    iter_s3_elements,
+    parse_datetime,
+    seek_api,
+)
 from .constants import (
     API_URL,
-    BINANCE_MAX_WEIGHT,
+    BINANCE,
+    MAX_FETCH_WORKERS,
     MAX_RESULTS,
     MAX_WEIGHT,
-    MIN_ELAPSED_PER_REQUEST,
+    MAX_WEIGHT_RESET,
+    S3_BUCKET_URL,
+    S3_PREFIX,
+    WEIGHTS,
 )
 
 
@@ -23,6 +37,11 @@ def get_binance_api_sleep_duration():
     return delta.total_seconds()
 
 
+def get_binance_api_weight(url):
+    endpoint = url.split("?")[0].split("/")[-1]
+    return WEIGHTS.get(endpoint, 1)
+
+
 def get_binance_api_url(url, pagination_id):
     if pagination_id:
         return url + f"&fromId={pagination_id}"
@@ -50,39 +69,99 @@ def get_binance_api_timestamp(trade):
     return parse_datetime(trade["time"], unit="ms")
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{API_URL}/historicalTrades?symbol={symbol}&limit={MAX_RESULTS}"
-    os.environ[BINANCE_MAX_WEIGHT] = str(1195)
-    result = iter_api(
+    return iter_api(
         url,
         get_binance_api_pagination_id,
         get_binance_api_timestamp,
         get_binance_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
         log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trades_range(
+    symbol,
+    timestamp_from,
+    timestamp_to,
+    pagination_id,
+    ticks,
+    log_prefix=None,
+    stream=False,
+):
+    """
+    If expected to be several pages, as ticks of the last partition, the range of
+    trade ids is fetched concurrently.
+    """
+    if ticks <= MAX_RESULTS * RANGE_MIN_PAGES:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    url = f"{API_URL}/historicalTrades?symbol={symbol}&limit={MAX_RESULTS}"
+    # From, so the page from pagination_id
+    id_to = pagination_id + MAX_RESULTS
+    try:
+        # Trade id_to is at, or after, timestamp_from
+        high = (id_to, timestamp_to)
+        trade_id = get_trade_id(symbol, timestamp_from, log_prefix, high=high)
+    except SeekExhausted:
+        trade_id = None  # Maybe, not the first trade, so paginated
+    if trade_id is None or id_to - trade_id <= MAX_RESULTS:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_range(
+        url,
+        lambda trade: trade["id"],
+        get_binance_api_pagination_id,
+        get_binance_api_timestamp,
+        get_binance_api_response,
+        MAX_RESULTS,
+        trade_id,
+        id_to,
+        max_workers=MAX_FETCH_WORKERS,
+        log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trade_id(symbol, timestamp, log_prefix=None, low=None, high=None):
+    """First trade id at, or after, timestamp."""
+    url = f"{API_URL}/historicalTrades?symbol={symbol}&limit={MAX_RESULTS}"
+    return seek_api(
+        url,
+        lambda trade: trade["id"],
+        get_binance_api_timestamp,
+        get_binance_api_response,
+        timestamp,
+        low=low,
+        high=high,
+        log_prefix=log_prefix,
     )
-    del os.environ[BINANCE_MAX_WEIGHT]
-    return result
 
 
 def get_binance_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(BINANCE, MAX_WEIGHT, MAX_WEIGHT_RESET)
+    rate_limiter.acquire(get_binance_api_weight(url))
     try:
         headers = {"X-MBX-APIKEY": os.environ.get(BINANCE_API_KEY, None)}
-        response = httpx.get(get_binance_api_url(url, pagination_id), headers=headers)
+        response = get_session(BINANCE).get(
+            get_binance_api_url(url, pagination_id), headers=headers
+        )
         if response.status_code == 200:
             # Response 429, when x-mbx-used-weight-1m is 1200
-            weight = response.headers.get("x-mbx-used-weight-1m", 0)
-            max_weight = os.environ.get(BINANCE_MAX_WEIGHT, MAX_WEIGHT)
-            if int(weight) >= int(max_weight):
-                sleep_duration = get_binance_api_sleep_duration()
-                print(f"Max requests, sleeping {sleep_duration} seconds")
-                time.sleep(sleep_duration)
+            weight = response.headers.get("x-mbx-used-weight-1m", None)
+            if weight is not None:
+                rate_limiter.update(
+                    remaining=MAX_WEIGHT - int(weight),
+                    reset_after=get_binance_api_sleep_duration(),
+                )
             data = response.json()
             data.reverse()  # Descending order, please
             return data
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_binance_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
@@ -91,3 +170,40 @@ def get_binance_api_response(url, pagination_id=None, retry=30):
             retry -= 1
             return get_binance_api_response(url, pagination_id, retry)
         raise
+
+
+def get_binance_dumps(symbol):
+    """Binance daily archives for symbol, as {date: size}."""
+    dumps = {}
+    marker = ""
+    while True:
+        params = {"prefix": f"{S3_PREFIX}{symbol}/", "marker": marker}
+        response = get_session(BINANCE).get(S3_BUCKET_URL, params=params)
+        if response.status_code == 200:
+            root = ElementTree.fromstring(response.content)
+            keys = []
+            for contents in iter_s3_elements(root, "Contents"):
+                key = get_s3_text(contents, "Key")
+                # Not .zip.CHECKSUM
+                match = re.search(r"-(\d{4}-\d{2}-\d{2})\.zip$", key)
+                if match:
+                    date = datetime.date.fromisoformat(match.group(1))
+                    dumps[date] = int(get_s3_text(contents, "Size"))
+                keys.append(key)
+            # Listed 1,000 keys at a time
+            if get_s3_text(root, "IsTruncated") == "true" and keys:
+                marker = keys[-1]
+            else:
+                return dumps
+        else:
+            print(f"Error {response.status_code}: {S3_BUCKET_URL}")
+            return
+
+
+def get_binance_checksum(url):
+    """SHA-256 of the archive, from "<sha256>  <filename>"."""
+    response = get_session(BINANCE).get(f"{url}.CHECKSUM")
+    if response.status_code == 200:
+        return response.text.split()[0]
+    else:
+        print(f"Error {response.status_code}: {url}.CHECKSUM")
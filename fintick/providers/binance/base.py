@@ -1,8 +1,19 @@
 from decimal import Decimal
 
-from ...controllers import FinTickSequentialIntegerMixin
-from .api import get_binance_api_timestamp, get_trades
-from .constants import BINANCE
+import numpy as np
+import pandas as pd
+
+from ...controllers import FinTickDailyS3Mixin, FinTickSequentialIntegerMixin
+from ...downloader import HistoricalDownloader
+from ...utils import parse_epoch
+from .api import (
+    get_binance_checksum,
+    get_binance_dumps,
+    get_trade_id,
+    get_trades,
+    get_trades_range,
+)
+from .constants import BINANCE, S3_COLUMNS, S3_URL
 
 
 class BinanceMixin(FinTickSequentialIntegerMixin):
@@ -10,33 +21,36 @@ class BinanceMixin(FinTickSequentialIntegerMixin):
     def exchange(self):
         return BINANCE
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, log_prefix)
-
-    def get_uid(self, trade):
-        return str(trade["id"])
-
-    def get_timestamp(self, trade):
-        return get_binance_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return Decimal(trade["price"])
-
-    def get_volume(self, trade):
-        return self.get_price(trade) * self.get_notional(trade)
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, log_prefix, stream=stream
+        )
 
-    def get_notional(self, trade):
-        return Decimal(trade["qty"])
+    def iter_api_range(self, symbol, pagination_id, ticks, log_prefix, stream=False):
+        return get_trades_range(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            pagination_id,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
 
-    def get_tick_rule(self, trade):
-        # If isBuyerMaker is true, order was filled by sell order
-        return 1 if not trade["isBuyerMaker"] else -1
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        return get_trade_id(symbol, timestamp, log_prefix, low=low, high=high)
 
-    def get_index(self, trade):
-        return int(trade["id"])
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["id", "time", "price", "qty", "isBuyerMaker"])
+        return {
+            "uid": df["id"].astype(str),
+            "timestamp": parse_epoch(df["time"], unit="ms"),
+            "price": df["price"],
+            "notional": df["qty"],
+            # If isBuyerMaker is true, order was filled by sell order
+            "tickRule": np.where(df["isBuyerMaker"].astype(bool), -1, 1),
+            "index": df["id"],
+        }
 
     def assert_data_frame(self, data_frame, trades):
         # Duplicates.
@@ -47,7 +61,60 @@ class BinanceMixin(FinTickSequentialIntegerMixin):
         assert abs(diff.sum()) == expected
 
     def get_is_complete(self, trades):
-        data = self.firestore_cache.get_one(
-            where=["open.index", "==", trades[0]["index"] + 1]
+        if self.is_seek_complete(trades):
+            return True
+        data = self.get_one_document(
+            where=["open.index", "==", int(trades["index"].iloc[0]) + 1]
         )
         return data is not None
+
+
+class BinanceDailyS3Mixin(FinTickDailyS3Mixin):
+    def get_dumps(self):
+        key = f"{BINANCE}-{self.api_symbol}"
+        return self.dump_index.get(
+            key, lambda: get_binance_dumps(self.api_symbol), date_to=self.period_to
+        )
+
+    def get_url(self, date):
+        return f"{S3_URL}{self.api_symbol}/{self.api_symbol}-trades-{date}.zip"
+
+    @property
+    def get_columns(self):
+        # Not quoteQty, which is rounded
+        return ("id", "price", "qty", "time", "isBuyerMaker")
+
+    def get_downloader(self, url):
+        checksum = get_binance_checksum(url)
+        # Not verifiable, so not downloaded
+        if checksum is not None:
+            return HistoricalDownloader(
+                url,
+                columns=self.get_columns,
+                cache=self.dump_cache,
+                column_names=S3_COLUMNS,
+                compression="zip",
+                checksum=checksum,
+            )
+
+    def parse_dataframe(self, data_frame):
+        # Maybe, a header
+        data_frame = data_frame[data_frame["id"].str.isdigit()]
+        epoch = data_frame["time"].astype("int64")
+        # Milliseconds, or microseconds since 2025
+        unit = "us" if len(epoch) and epoch.iloc[0] > 10**14 else "ms"
+        is_buyer_maker = data_frame["isBuyerMaker"].str.lower() == "true"
+        qty = data_frame["qty"].apply(Decimal)
+        # Exact, as from the REST API
+        volume = data_frame["price"].apply(Decimal) * qty
+        data_frame = data_frame.assign(
+            timestamp=pd.to_datetime(epoch, unit=unit),
+            index=data_frame["id"],
+            volume=volume.map(lambda value: format(value, "f")),
+            # If isBuyerMaker is true, order was filled by sell order
+            tickDirection=np.where(is_buyer_maker, "MinusTick", "PlusTick"),
+        ).rename(columns={"id": "uid"})
+        data_frame = super().parse_dataframe(data_frame)
+        # Notional is qty, as from the REST API, rather than a quotient
+        data_frame["notional"] = qty
+        return data_frame
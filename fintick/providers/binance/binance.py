@@ -3,7 +3,7 @@ import pandas as pd
 from ...utils import get_max_hot_date, parse_period_from_to
 from .perpetual import (
     BinanceDailyPartitionFromHourly,
-    BinancePerpetualDailyPartition,
+    BinancePerpetualDailyS3Partition,
     BinancePerpetualHourlyPartition,
 )
 
@@ -12,6 +12,10 @@ def binance_perpetual(
     symbol: str,
     period_from: str = None,
     period_to: str = None,
+    max_workers: int = 1,
+    fixed_point: bool = False,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -23,6 +27,8 @@ def binance_perpetual(
             symbol,
             period_from=timestamp_from,
             period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
     if date_from and date_to:
@@ -37,9 +43,12 @@ def binance_perpetual(
             if ok:
                 # Modify date_to by 1 day
                 date_to -= pd.Timedelta("1d")
-        BinancePerpetualDailyPartition(
+        # Daily archives, rather than REST API
+        BinancePerpetualDailyS3Partition(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
             verbose=verbose,
         ).main()
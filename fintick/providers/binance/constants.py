@@ -1,9 +1,20 @@
 BINANCE = "binance"
-BINANCE_MAX_WEIGHT = "BINANCE_MAX_WEIGHT"
 
 API_URL = "https://api.binance.com/api/v3"
 MAX_RESULTS = 1000
 
 # Response 429, when x-mbx-used-weight-1m is 1200
 MAX_WEIGHT = 1200
-MIN_ELAPSED_PER_REQUEST = 0
+MAX_WEIGHT_RESET = 60  # 1 minute
+# Weight per endpoint, if not 1
+WEIGHTS = {"historicalTrades": 5}
+
+# Concurrent requests, if fetching a range of trade ids. 4 req/s, by weight
+MAX_FETCH_WORKERS = 4
+
+# Daily archives of trades, with a SHA-256 .CHECKSUM file per archive
+S3_BUCKET_URL = "https://s3-ap-northeast-1.amazonaws.com/data.binance.vision"
+S3_PREFIX = "data/spot/daily/trades/"
+S3_URL = f"https://data.binance.vision/{S3_PREFIX}"
+# Archives have no header
+S3_COLUMNS = ("id", "price", "qty", "quoteQty", "time", "isBuyerMaker", "isBestMatch")
@@ -6,7 +6,7 @@ from ...controllers import (
     FinTickHourlyMixin,
     FinTickREST,
 )
-from .base import BinanceMixin
+from .base import BinanceDailyS3Mixin, BinanceMixin
 
 
 class BinancePerpetualHourlyPartition(FinTickHourlyMixin, BinanceMixin, FinTickREST):
@@ -26,3 +26,7 @@ class BinancePerpetualDailyPartition(
     FinTickREST,
 ):
     pass
+
+
+class BinancePerpetualDailyS3Partition(BinanceDailyS3Mixin, BinanceMixin, FinTick):
+    pass
@@ -1,4 +1,4 @@
-from .bitfinex import bitfinex_perpetual
+from .bitfinex import bitfinex_perpetual, bitfinex_websocket
 from .constants import BITFINEX
 
-__all__ = ["BITFINEX", "bitfinex_perpetual"]
+__all__ = ["BITFINEX", "bitfinex_perpetual", "bitfinex_websocket"]
@@ -1,24 +1,19 @@
+import datetime
 import json
 import time
-from decimal import Decimal
-
-import httpx
 
 from ...constants import HTTPX_ERRORS
-from ...utils import (
-    increment_api_total_requests,
-    iter_api,
-    parse_datetime,
-    throttle_api_requests,
-)
+from ...cursors import NudgeCursor
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import get_window_count, iter_api, iter_api_windows, parse_datetime
 from .constants import (
     API_URL,
-    BITFINEX_MAX_REQUESTS_RESET,
-    BITFINEX_TOTAL_REQUESTS,
+    BITFINEX,
+    MAX_FETCH_WORKERS,
     MAX_REQUESTS,
     MAX_REQUESTS_RESET,
     MAX_RESULTS,
-    MIN_ELAPSED_PER_REQUEST,
 )
 
 
@@ -29,15 +24,29 @@ def get_bitfinex_api_url(url, pagination_id):
 
 
 def get_bitfinex_api_pagination_id(timestamp, last_data=[], data=[]):
-    if len(data):
-        return data[-1][1]
+    return format_bitfinex_api_timestamp(timestamp)
+
+
+def get_bitfinex_api_cursor():
+    # If more than MAX_RESULTS trades at the same millisecond
+    return NudgeCursor(
+        get_bitfinex_api_pagination_id,
+        lambda trade: trade[0],
+        get_bitfinex_api_timestamp,
+        MAX_RESULTS,
+        resolution=datetime.timedelta(milliseconds=1),
+    )
 
 
 def get_bitfinex_api_timestamp(trade):
     return parse_datetime(trade[1], unit="ms")
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def format_bitfinex_api_timestamp(timestamp):
+    return int(timestamp.timestamp() * 1000)  # Millisecond
+
+
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     # No start query param
     # Specifying start, end returns MAX_RESULTS
     url = f"{API_URL}/{symbol}/hist?limit={MAX_RESULTS}"
@@ -47,26 +56,52 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_bitfinex_api_timestamp,
         get_bitfinex_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
+        cursor=get_bitfinex_api_cursor(),
         log_prefix=log_prefix,
+        stream=stream,
     )
 
 
-def get_bitfinex_api_response(url, pagination_id=None, retry=30):
-    throttle_api_requests(
-        BITFINEX_MAX_REQUESTS_RESET,
-        BITFINEX_TOTAL_REQUESTS,
-        MAX_REQUESTS_RESET,
-        MAX_REQUESTS,
+def get_trades_windows(
+    symbol, timestamp_from, timestamp_to, ticks, log_prefix=None, stream=False
+):
+    """If ticks are more than a window, windows are fetched concurrently."""
+    url = f"{API_URL}/{symbol}/hist?limit={MAX_RESULTS}"
+    pagination_id = format_bitfinex_api_timestamp(timestamp_to)
+    windows = get_window_count(ticks, MAX_RESULTS)
+    if windows == 1:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_windows(
+        url,
+        lambda trade: trade[0],
+        get_bitfinex_api_pagination_id,
+        get_bitfinex_api_timestamp,
+        get_bitfinex_api_response,
+        format_bitfinex_api_timestamp,
+        MAX_RESULTS,
+        timestamp_from,
+        timestamp_to,
+        windows,
+        max_workers=MAX_FETCH_WORKERS,
+        cursor=get_bitfinex_api_cursor(),
+        log_prefix=log_prefix,
+        stream=stream,
     )
+
+
+def get_bitfinex_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(BITFINEX, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_bitfinex_api_url(url, pagination_id))
-        increment_api_total_requests(BITFINEX_TOTAL_REQUESTS)
+        response = get_session(BITFINEX).get(get_bitfinex_api_url(url, pagination_id))
         if response.status_code == 200:
             result = response.read()
-            return json.loads(result, parse_float=Decimal)
+            return json.loads(result, parse_float=str)
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_bitfinex_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
@@ -1,14 +1,17 @@
-from decimal import Decimal
-
 import numpy as np
+import pandas as pd
 
-from ...controllers import FinTickNonSequentialIntegerMixin
-from ...utils import normalize_symbol
-from .api import get_bitfinex_api_timestamp, get_trades
-from .constants import BITFINEX
+from ...controllers import (
+    FinTickNonSequentialIntegerMixin,
+    FinTickTimePaginationMixin,
+    FinTickWebsocketMixin,
+)
+from ...utils import normalize_symbol, parse_epoch
+from .api import format_bitfinex_api_timestamp, get_trades, get_trades_windows
+from .constants import BITFINEX, WEBSOCKET_URL
 
 
-class BitfinexMixin(FinTickNonSequentialIntegerMixin):
+class BitfinexMixin(FinTickTimePaginationMixin, FinTickNonSequentialIntegerMixin):
     """
     Details: https://docs.bitfinex.com/reference#rest-public-trades
 
@@ -29,40 +32,65 @@ class BitfinexMixin(FinTickNonSequentialIntegerMixin):
         return normalize_symbol(self.api_symbol, provider=BITFINEX)
 
     def get_pagination_id(self, data=None):
-        return int(self.timestamp_to.timestamp() * 1000)  # Millisecond
-
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, log_prefix)
-
-    def get_uid(self, trade):
-        return str(trade[0])
-
-    def get_timestamp(self, trade):
-        return get_bitfinex_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return Decimal(trade[3])
-
-    def get_volume(self, trade):
-        return self.get_price(trade) * self.get_notional(trade)
-
-    def get_notional(self, trade):
-        return abs(Decimal(trade[2]))
-
-    def get_tick_rule(self, trade):
-        # Buy side indicates a down-tick because the maker was a buy order and
-        # their order was removed. Conversely, sell side indicates an up-tick.
-        return np.sign(trade[2])
-
-    def get_index(self, trade):
-        return trade[0]
+        return format_bitfinex_api_timestamp(self.timestamp_to)
+
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, log_prefix, stream=stream
+        )
+
+    def iter_api_windows(self, symbol, ticks, log_prefix, stream=False):
+        return get_trades_windows(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
+
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["id", "mts", "amount", "price"])
+        amount = df["amount"].astype(str)
+        is_negative = amount.str.startswith("-")
+        return {
+            "uid": df["id"].astype(str),
+            "timestamp": parse_epoch(df["mts"], unit="ms"),
+            "price": df["price"],
+            "notional": amount.str.lstrip("-"),
+            # Buy side indicates a down-tick because the maker was a buy order and
+            # their order was removed. Conversely, sell side indicates an up-tick.
+            "tickRule": np.where(is_negative.astype(bool), -1, 1),
+            "index": df["id"],
+        }
 
     def get_data_frame(self, trades):
         # Websocket sends trades in order, by incrementing non sequential integer
         # REST API returns results unsorted
         # Sort by uid, reversed
-        trades.sort(key=lambda x: x["index"], reverse=True)
+        trades = trades.sort_values("index", ascending=False, kind="stable")
         return super().get_data_frame(trades)
+
+
+class BitfinexWebsocketMixin(FinTickWebsocketMixin, BitfinexMixin):
+    """
+    Details: https://docs.bitfinex.com/reference#ws-public-trades
+    """
+
+    @property
+    def websocket_url(self):
+        return WEBSOCKET_URL
+
+    def get_subscribe_messages(self):
+        return [{"event": "subscribe", "channel": "trades", "symbol": self.api_symbol}]
+
+    def parse_message(self, message):
+        # Events are dicts, and heartbeats are [CHANNEL_ID, "hb"]
+        if isinstance(message, list):
+            # Snapshot, on subscribe, is recent trades
+            if isinstance(message[1], list):
+                return message[1]
+            # Trade executed. Then, updated with the same trade
+            elif message[1] == "te":
+                return [message[2]]
+        return []
@@ -1,11 +1,17 @@
 from ...utils import parse_period_from_to
-from .perpetual import BitfinexPerpetualDailyPartition, BitfinexPerpetualHourlyPartition
+from .perpetual import (
+    BitfinexPerpetualDailyPartition,
+    BitfinexPerpetualHourlyPartition,
+    BitfinexPerpetualWebsocket,
+)
 
 
 def bitfinex_perpetual(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -14,12 +20,31 @@ def bitfinex_perpetual(
     )
     if timestamp_from and timestamp_to:
         BitfinexPerpetualHourlyPartition(
-            symbol, period_from=timestamp_from, period_to=timestamp_to, verbose=verbose
+            symbol,
+            period_from=timestamp_from,
+            period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
+            verbose=verbose,
         ).main()
     if date_from and date_to:
         BitfinexPerpetualDailyPartition(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
+
+
+def bitfinex_websocket(
+    symbol: str = None,
+    max_partitions: int = None,
+    deadline: float = None,
+    verbose: bool = False,
+):
+    assert symbol, 'Required param "symbol" not provided'
+    BitfinexPerpetualWebsocket(
+        symbol, max_partitions=max_partitions, deadline=deadline, verbose=verbose
+    ).main()
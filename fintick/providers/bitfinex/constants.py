@@ -1,10 +1,10 @@
 BITFINEX = "bitfinex"
 
-BITFINEX_MAX_REQUESTS_RESET = "BITFINEX_MAX_REQUESTS_RESET"
-BITFINEX_TOTAL_REQUESTS = "BITFINEX_TOTAL_REQUESTS"
-
 API_URL = "https://api-pub.bitfinex.com/v2/trades"
+WEBSOCKET_URL = "wss://api-pub.bitfinex.com/ws/2"
 MAX_REQUESTS = 90
 MAX_REQUESTS_RESET = 60  # 1 minute
 MAX_RESULTS = 10000
-MIN_ELAPSED_PER_REQUEST = 0
+
+# Concurrent requests, if fetching windows of a partition
+MAX_FETCH_WORKERS = 3
@@ -1,10 +1,16 @@
 from ...controllers import FinTickDailyMixin, FinTickHourlyMixin, FinTickREST
-from .base import BitfinexMixin
+from .base import BitfinexMixin, BitfinexWebsocketMixin
 
 
 class BitfinexPerpetualHourlyPartition(FinTickHourlyMixin, BitfinexMixin, FinTickREST):
     pass
 
 
+class BitfinexPerpetualWebsocket(
+    FinTickHourlyMixin, BitfinexWebsocketMixin, FinTickREST
+):
+    pass
+
+
 class BitfinexPerpetualDailyPartition(FinTickDailyMixin, BitfinexMixin, FinTickREST):
     pass
@@ -1,30 +1,22 @@
 import json
 import time
-from decimal import Decimal
-
-import httpx
 
 from ...constants import HTTPX_ERRORS
-from ...utils import (
-    increment_api_total_requests,
-    iter_api,
-    parse_datetime,
-    throttle_api_requests,
-)
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import iter_api, parse_datetime, seek_api
 from .constants import (
-    BITFLYER_MAX_REQUESTS_RESET,
-    BITFLYER_TOTAL_REQUESTS,
+    BITFLYER,
     MAX_REQUESTS,
     MAX_REQUESTS_RESET,
     MAX_RESULTS,
-    MIN_ELAPSED_PER_REQUEST,
     URL,
 )
 
 
 def get_bitflyer_api_url(url, pagination_id):
     if pagination_id:
-        url += f"{url}&before={pagination_id}"
+        url += f"&before={pagination_id}"
     return url
 
 
@@ -37,7 +29,7 @@ def get_bitflyer_api_timestamp(trade):
     return parse_datetime(trade["exec_date"])
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{URL}/executions?product_code={symbol}&count={MAX_RESULTS}"
     return iter_api(
         url,
@@ -45,27 +37,40 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_bitflyer_api_timestamp,
         get_bitflyer_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
         log_prefix=log_prefix,
+        stream=stream,
     )
 
 
-def get_bitflyer_api_response(url, pagination_id=None, retry=30):
-    throttle_api_requests(
-        BITFLYER_MAX_REQUESTS_RESET,
-        BITFLYER_TOTAL_REQUESTS,
-        MAX_REQUESTS_RESET,
-        MAX_REQUESTS,
+def get_trade_id(symbol, timestamp, log_prefix=None, low=None, high=None):
+    """First trade id at, or after, timestamp."""
+    url = f"{URL}/executions?product_code={symbol}&count={MAX_RESULTS}"
+    return seek_api(
+        url,
+        lambda trade: trade["id"],
+        get_bitflyer_api_timestamp,
+        get_bitflyer_api_response,
+        timestamp,
+        low=low,
+        high=high,
+        log_prefix=log_prefix,
     )
+
+
+def get_bitflyer_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(BITFLYER, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_bitflyer_api_url(url, pagination_id))
-        increment_api_total_requests(BITFLYER_TOTAL_REQUESTS)
+        response = get_session(BITFLYER).get(get_bitflyer_api_url(url, pagination_id))
         if response.status_code == 200:
             result = response.read()
-            data = json.loads(result, parse_float=Decimal)
+            data = json.loads(result, parse_float=str)
             return data
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_bitflyer_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
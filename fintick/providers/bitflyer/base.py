@@ -1,10 +1,12 @@
-from decimal import Decimal
+import numpy as np
+import pandas as pd
 
 from ...controllers import (
     FinTickIntegerPaginationMixin,
     FinTickNonSequentialIntegerMixin,
 )
-from .api import get_bitflyer_api_timestamp, get_trades
+from ...utils import parse_epoch
+from .api import get_trade_id, get_trades
 from .constants import BITFLYER
 
 
@@ -15,29 +17,21 @@ class BitflyerMixin(FinTickIntegerPaginationMixin, FinTickNonSequentialIntegerMi
     def exchange(self):
         return BITFLYER
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, self.log_prefix)
-
-    def get_uid(self, trade):
-        return str(trade["id"])
-
-    def get_timestamp(self, trade):
-        return get_bitflyer_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return Decimal(trade["price"])
-
-    def get_volume(self, trade):
-        return self.get_price(trade) * self.get_notional(trade)
-
-    def get_notional(self, trade):
-        return Decimal(trade["size"])
-
-    def get_tick_rule(self, trade):
-        return 1 if trade["side"] == "BUY" else -1
-
-    def get_index(self, trade):
-        return int(trade["id"])
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, self.log_prefix, stream=stream
+        )
+
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        return get_trade_id(symbol, timestamp, log_prefix, low=low, high=high)
+
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["id", "exec_date", "price", "size", "side"])
+        return {
+            "uid": df["id"].astype(str),
+            "timestamp": parse_epoch(df["exec_date"]),
+            "price": df["price"],
+            "notional": df["size"],
+            "tickRule": np.where(df["side"] == "BUY", 1, -1),
+            "index": df["id"],
+        }
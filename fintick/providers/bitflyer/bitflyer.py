@@ -14,6 +14,8 @@ def bitflyer_perpetual(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -30,6 +32,8 @@ def bitflyer_perpetual(
             symbol,
             period_from=timestamp_from,
             period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
     if date_from and date_to:
@@ -48,5 +52,7 @@ def bitflyer_perpetual(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
@@ -1,4 +1,11 @@
-from .bitmex import bitmex_futures, bitmex_perpetual
+from .bitmex import bitmex_daily, bitmex_futures, bitmex_perpetual, bitmex_websocket
 from .constants import BITMEX, XBTUSD
 
-__all__ = ["BITMEX", "XBTUSD", "bitmex_perpetual", "bitmex_futures"]
+__all__ = [
+    "BITMEX",
+    "XBTUSD",
+    "bitmex_perpetual",
+    "bitmex_futures",
+    "bitmex_daily",
+    "bitmex_websocket",
+]
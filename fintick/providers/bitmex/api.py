@@ -2,17 +2,39 @@ import datetime
 import json
 import re
 import time
-from decimal import Decimal
-
-import httpx
+from xml.etree import ElementTree
 
 from ...constants import HTTPX_ERRORS
-from ...utils import iter_api, parse_datetime
-from .constants import API_URL, MAX_RESULTS, MIN_ELAPSED_PER_REQUEST, MONTHS
+from ...cursors import OffsetCursor
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import (
+    get_s3_text,
+    get_window_count,
+    iter_api,
+    iter_api_windows,
+    iter_s3_elements,
+    parse_datetime,
+)
+from .constants import (
+    API_URL,
+    BITMEX,
+    MAX_FETCH_WORKERS,
+    MAX_REQUESTS,
+    MAX_REQUESTS_RESET,
+    MAX_RESULTS,
+    MONTHS,
+    S3_BUCKET_URL,
+    S3_PREFIX,
+)
 
 
 def get_bitmex_api_url(url, pagination_id):
     url += f"&count={MAX_RESULTS}&reverse=true"
+    # Maybe, with an offset of trades at the same timestamp
+    if isinstance(pagination_id, (list, tuple)):
+        pagination_id, offset = pagination_id
+        url += f"&start={offset}"
     if pagination_id:
         return url + f"&endTime={pagination_id}"
     return url
@@ -22,6 +44,10 @@ def get_bitmex_api_pagination_id(timestamp, last_data=[], data=[]):
     return format_bitmex_api_timestamp(timestamp)
 
 
+def get_bitmex_api_cursor():
+    return OffsetCursor(get_bitmex_api_pagination_id, lambda trade: trade["trdMatchID"])
+
+
 def get_bitmex_api_timestamp(trade):
     return parse_datetime(trade["timestamp"])
 
@@ -30,35 +56,32 @@ def format_bitmex_api_timestamp(timestamp):
     return timestamp.replace(tzinfo=None).isoformat()
 
 
-def get_active_futures(root_symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_active_futures(root_symbol, verbose=True):
     endpoint = "instrument/active"
-    return get_futures(
-        endpoint, root_symbol, timestamp_from, pagination_id, log_prefix=log_prefix
-    )
+    return get_futures(endpoint, root_symbol, verbose=verbose)
 
 
-def get_expired_futures(root_symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_expired_futures(root_symbol, verbose=True):
     endpoint = "instrument"
-    return get_futures(
-        endpoint, root_symbol, timestamp_from, pagination_id, log_prefix=log_prefix
-    )
+    now = datetime.datetime.now(datetime.timezone.utc)
+    futures = get_futures(endpoint, root_symbol, verbose=verbose)
+    return [future for future in futures if future["expiry"] <= now]
 
 
-def get_futures(endpoint, root_symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_futures(endpoint, root_symbol, verbose=True):
     filters = json.dumps({"rootSymbol": root_symbol})
     url = f"{API_URL}/{endpoint}?filter={filters}"
-    timestamp_key = "timestamp"
-    results = iter_api(
-        url,
-        timestamp_key,
-        get_bitmex_api_pagination_id,
-        get_bitmex_api_response,
-        MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
-        timestamp_from=timestamp_from,
-        pagination_id=pagination_id,
-        log_prefix=log_prefix,
-    )
+    results = []
+    # Paginated by offset
+    offset = 0
+    while True:
+        data = get_bitmex_api_response(url, pagination_id=(None, offset))
+        results += data
+        if len(data) < MAX_RESULTS:
+            break
+        offset += len(data)
+    if verbose:
+        print(f"{BITMEX.capitalize()} {endpoint}: {len(results)} instruments")
     instruments = []
     regex = re.compile(f"^{root_symbol}" + r"(\w)\d+$")
     for instrument in results:
@@ -69,10 +92,9 @@ def get_futures(endpoint, root_symbol, timestamp_from, pagination_id, log_prefix
             if is_future:
                 listing = parse_datetime(instrument["listing"])
                 expiry = parse_datetime(instrument["expiry"])
-                if expiry >= timestamp_from:
-                    instruments.append(
-                        {"symbol": symbol, "listing": listing, "expiry": expiry}
-                    )
+                instruments.append(
+                    {"symbol": symbol, "listing": listing, "expiry": expiry}
+                )
     return instruments
 
 
@@ -91,7 +113,6 @@ def get_funding(symbol, timestamp_from, pagination_id, log_prefix=None):
             get_bitmex_api_response,
             parse_datetime,
             MAX_RESULTS,
-            MIN_ELAPSED_PER_REQUEST,
             timestamp_from=timestamp_from,
             pagination_id=pagination_id,
             log_prefix=log_prefix,
@@ -99,7 +120,7 @@ def get_funding(symbol, timestamp_from, pagination_id, log_prefix=None):
     ]
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{API_URL}/trade?symbol={symbol}"
     return iter_api(
         url,
@@ -107,30 +128,59 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_bitmex_api_timestamp,
         get_bitmex_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
+        cursor=get_bitmex_api_cursor(),
         log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trades_windows(
+    symbol, timestamp_from, timestamp_to, ticks, log_prefix=None, stream=False
+):
+    """If ticks are more than a window, windows are fetched concurrently."""
+    url = f"{API_URL}/trade?symbol={symbol}"
+    pagination_id = format_bitmex_api_timestamp(timestamp_to)
+    windows = get_window_count(ticks, MAX_RESULTS)
+    if windows == 1:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_windows(
+        url,
+        lambda trade: trade["trdMatchID"],
+        get_bitmex_api_pagination_id,
+        get_bitmex_api_timestamp,
+        get_bitmex_api_response,
+        format_bitmex_api_timestamp,
+        MAX_RESULTS,
+        timestamp_from,
+        timestamp_to,
+        windows,
+        max_workers=MAX_FETCH_WORKERS,
+        cursor=get_bitmex_api_cursor(),
+        log_prefix=log_prefix,
+        stream=stream,
     )
 
 
 def get_bitmex_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(BITMEX, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_bitmex_api_url(url, pagination_id))
+        response = get_session(BITMEX).get(get_bitmex_api_url(url, pagination_id))
         if response.status_code == 200:
-            remaining = response.headers["x-ratelimit-remaining"]
-            if remaining == 0:
-                timestamp = datetime.datetime.utcnow().timestamp()
-                reset = response.headers["x-ratelimit-reset"]
-                if reset > timestamp:
-                    sleep_duration = reset - timestamp
-                    print(f"Max requests, sleeping {sleep_duration} seconds")
-                    time.sleep(sleep_duration)
+            remaining = response.headers.get("x-ratelimit-remaining", None)
+            reset = response.headers.get("x-ratelimit-reset", None)
+            # If not both, the default window
+            if remaining is not None and reset is not None:
+                rate_limiter.update(
+                    remaining=int(remaining), reset_after=float(reset) - time.time()
+                )
             result = response.read()
-            return json.loads(result, parse_float=Decimal)
-        elif response.status_code == 429:
-            retry = response.headers.get("Retry-After", 1)
-            time.sleep(int(retry))
+            return json.loads(result, parse_float=str)
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_bitmex_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
@@ -139,3 +189,30 @@ def get_bitmex_api_response(url, pagination_id=None, retry=30):
             retry -= 1
             return get_bitmex_api_response(url, pagination_id, retry)
         raise
+
+
+def get_bitmex_dumps():
+    """BitMEX S3 dumps, as {date: size}."""
+    dumps = {}
+    marker = ""
+    while True:
+        params = {"prefix": S3_PREFIX, "marker": marker}
+        response = get_session(BITMEX).get(S3_BUCKET_URL, params=params)
+        if response.status_code == 200:
+            root = ElementTree.fromstring(response.content)
+            keys = []
+            for contents in iter_s3_elements(root, "Contents"):
+                key = get_s3_text(contents, "Key")
+                match = re.search(r"(\d{8})\.csv\.gz$", key)
+                if match:
+                    date = datetime.datetime.strptime(match.group(1), "%Y%m%d").date()
+                    dumps[date] = int(get_s3_text(contents, "Size"))
+                keys.append(key)
+            # Listed 1,000 keys at a time
+            if get_s3_text(root, "IsTruncated") == "true" and keys:
+                marker = keys[-1]
+            else:
+                return dumps
+        else:
+            print(f"Error {response.status_code}: {S3_BUCKET_URL}")
+            return
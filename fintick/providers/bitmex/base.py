@@ -1,19 +1,29 @@
 import datetime
-from decimal import Decimal
+from copy import copy
 
 import numpy as np
 import pandas as pd
 
 from ...bqloader import MULTIPLE_SYMBOL_SCHEMA
-from ...controllers import FinTickDailyS3Mixin
+from ...controllers import (
+    FinTickDailyS3Mixin,
+    FinTickMultiSymbolDailyMixin,
+    FinTickTimePaginationMixin,
+    FinTickWebsocketMixin,
+)
+from ...downloader import summarize_trades
+from ...fscache import firestore_data
+from ...instruments import get_instrument_cache
+from ...utils import parse_epoch
 from .api import (
     format_bitmex_api_timestamp,
     get_active_futures,
-    get_bitmex_api_timestamp,
+    get_bitmex_dumps,
     get_expired_futures,
     get_trades,
+    get_trades_windows,
 )
-from .constants import BITMEX, S3_URL
+from .constants import BITMEX, S3_URL, WEBSOCKET_URL
 from .lib import calculate_index
 
 
@@ -22,37 +32,37 @@ class BitmexMixin:
     def exchange(self):
         return BITMEX
 
-    def get_uid(self, trade):
-        return str(trade["trdMatchID"])
-
-    def get_timestamp(self, trade):
-        return get_bitmex_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return Decimal(trade["price"])
-
-    def get_volume(self, trade):
-        return Decimal(trade["foreignNotional"])
-
-    def get_notional(self, trade):
-        return self.get_volume(trade) / self.get_price(trade)
+    def get_page_columns(self, data):
+        columns = ["trdMatchID", "timestamp", "price", "foreignNotional", "side"]
+        df = pd.DataFrame(data, columns=columns)
+        return {
+            "uid": df["trdMatchID"].astype(str),
+            "timestamp": parse_epoch(df["timestamp"]),
+            "price": df["price"],
+            "volume": df["foreignNotional"],
+            "tickRule": np.where(df["side"] == "Buy", 1, -1),
+            "index": np.nan,  # No index, set per partition
+        }
 
-    def get_tick_rule(self, trade):
-        return 1 if trade["side"] == "Buy" else -1
 
-    def get_index(self, trade):
-        return np.nan  # No index, set per partition
-
-
-class BitmexRESTMixin(BitmexMixin):
+class BitmexRESTMixin(FinTickTimePaginationMixin, BitmexMixin):
     def get_pagination_id(self, data=None):
         return format_bitmex_api_timestamp(self.timestamp_to)
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, log_prefix)
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, log_prefix, stream=stream
+        )
+
+    def iter_api_windows(self, symbol, ticks, log_prefix, stream=False):
+        return get_trades_windows(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
 
     def get_data_frame(self, trades):
         data_frame = super().get_data_frame(trades)
@@ -61,7 +71,27 @@ class BitmexRESTMixin(BitmexMixin):
         return data_frame
 
 
+class BitmexWebsocketMixin(FinTickWebsocketMixin, BitmexRESTMixin):
+    @property
+    def websocket_url(self):
+        return WEBSOCKET_URL
+
+    def get_subscribe_messages(self):
+        return [{"op": "subscribe", "args": [f"trade:{self.api_symbol}"]}]
+
+    def parse_message(self, message):
+        # Partial, recent trades on subscribe. Then, insert
+        if isinstance(message, dict) and message.get("table") == "trade":
+            if message.get("action") in ("partial", "insert"):
+                return message["data"]
+        return []
+
+
 class BitmexDailyS3Mixin(FinTickDailyS3Mixin, BitmexMixin):
+    def get_dumps(self):
+        # All symbols are in the same dumps
+        return self.dump_index.get(BITMEX, get_bitmex_dumps, date_to=self.period_to)
+
     def get_url(self, date):
         date_string = date.strftime("%Y%m%d")
         return f"{S3_URL}{date_string}.csv.gz"
@@ -95,26 +125,33 @@ class BitmexDailyS3Mixin(FinTickDailyS3Mixin, BitmexMixin):
         data_frame = calculate_index(data_frame)
         return super().parse_dataframe(data_frame)
 
+    @property
+    def partition_symbols(self):
+        return [self.symbol]
+
+    def get_symbol_data_frame(self, groups):
+        """Data frame for the partition, from data frames grouped by symbol."""
+        data_frames = [groups[s] for s in self.partition_symbols if s in groups]
+        if data_frames:
+            data_frame = pd.concat(data_frames).sort_index()  # Order of dump
+            data_frame.attrs = data_frames[0].attrs  # Concat drops attrs
+            return self.select_columns(data_frame)
 
-class BitmexDailyMultiSymbolS3Mixin(BitmexDailyS3Mixin):
+
+class BitmexDailyMultiSymbolS3Mixin(BitmexDailyS3Mixin, FinTickMultiSymbolDailyMixin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.symbols = self.get_symbols()
 
     def get_symbols(self):
-        active_futures = get_active_futures(
-            self.symbol,
-            date_from=self.period_from,
-            date_to=self.period_to,
-            verbose=self.verbose,
-        )
-        expired_futures = get_expired_futures(
-            self.symbol,
-            date_from=self.period_from,
-            date_to=self.period_to,
-            verbose=self.verbose,
+        futures = get_instrument_cache().get(
+            f"{BITMEX}-{self.symbol}",
+            lambda: get_active_futures(self.symbol, verbose=self.verbose),
+            lambda: get_expired_futures(self.symbol, verbose=self.verbose),
         )
-        return active_futures + expired_futures
+        return [
+            future for future in futures if future["expiry"].date() >= self.period_from
+        ]
 
     @property
     def schema(self):
@@ -141,24 +178,23 @@ class BitmexDailyMultiSymbolS3Mixin(BitmexDailyS3Mixin):
             print(f"{self.log_prefix}: No data")
             return True
         else:
-            data = self.firestore_cache.get(document)
+            data = self.get_firestore_cache().get(document)
             if data:
                 ok = data.get("ok", False)
                 if ok and self.has_symbols(data):
                     print(f"{self.log_prefix}: {document} OK")
                     return True
 
-    def get_firebase_data(self, data_frame):
+    def get_firebase_data(self, data_frame, reverse=False):
         data = {}
+        summary = summarize_trades(data_frame, by="symbol", reverse=reverse)
         for s in self.active_symbols:
             symbol = s["symbol"]
             # API data
             d = self.get_symbol_data(symbol)
-            # Dataframe
-            df = data_frame[data_frame["symbol"] == symbol]
             # Maybe symbol
-            if len(df):
-                data[symbol] = super().get_firebase_data(df)
+            if symbol in summary:
+                data[symbol] = firestore_data(summary[symbol])
                 data[symbol]["listing"] = d["listing"].replace(
                     tzinfo=datetime.timezone.utc
                 )
@@ -170,9 +206,83 @@ class BitmexDailyMultiSymbolS3Mixin(BitmexDailyS3Mixin):
                 #     if not hasattr(value, "_nanosecond"):
                 #         setattr(value, "_nanosecond", 0)
             else:
-                df[symbol] = {}
+                data[symbol] = {}
         return data
 
+    @property
+    def partition_symbols(self):
+        return [s["symbol"] for s in self.active_symbols]
+
+    def filter_dataframe(self, data_frame):
+        return data_frame[data_frame.symbol.isin(self.partition_symbols)]
+
+    def select_columns(self, data_frame):
+        expiry = {s["symbol"]: s["expiry"] for s in self.symbols}
+        data_frame["expiry"] = pd.to_datetime(
+            data_frame["symbol"].map(expiry), utc=True
+        )
+        return super().select_columns(data_frame)
+
+
+class BitmexDailyFanOutS3Mixin(BitmexDailyS3Mixin):
+    """
+    Every symbol is in the same BitMEX dump. So, the dump is downloaded and parsed
+    once, then rows are grouped by symbol, and each partition is written from the
+    groups.
+    """
+
+    def __init__(self, controllers, *args, **kwargs):
+        super().__init__(None, *args, **kwargs)
+        self.controllers = controllers
+        self.done = set()
+
+    @property
+    def symbol(self):
+        return ", ".join([c.get_suffix(sep=" ") for c in self.controllers])
+
+    @property
+    def log_prefix(self):
+        return f"{self.exchange_display} {self.symbol}"
+
+    def get_document(self, partition):
+        # Copies of controllers, with state for the partition, if not OK
+        self.pending = []
+        for controller in self.controllers:
+            if controller.get_suffix() not in self.done:
+                controller.set_partition(partition)
+                data = controller.get_document(partition)
+                if not controller.is_data_OK(data):
+                    self.pending.append(copy(controller))
+        return self.pending
+
+    def is_data_OK(self, pending):
+        return not pending
+
+    def fetch(self):
+        data_frame = super().fetch()
+        groups = {}
+        if data_frame is not None:
+            for symbol, df in data_frame.groupby("symbol", sort=False):
+                df.attrs = data_frame.attrs
+                groups[symbol] = df
+        return [(c, c.get_symbol_data_frame(groups)) for c in self.pending]
+
+    def commit(self, controller, future):
+        for c, data_frame in future.result():
+            suffix = c.get_suffix()
+            if suffix not in self.done:
+                if data_frame is not None:
+                    c.write(data_frame)
+                else:
+                    self.done.add(suffix)
+                    if self.verbose:
+                        print(f"{c.log_prefix}: Done")
+        return len(self.done) < len(self.controllers)
+
     def filter_dataframe(self, data_frame):
-        query = " | ".join([f'symbol == "{s["symbol"]}"' for s in self.active_symbols])
-        return data_frame.query(query)
+        symbols = [s for c in self.pending for s in c.partition_symbols]
+        return data_frame[data_frame.symbol.isin(symbols)]
+
+    def select_columns(self, data_frame):
+        # Each controller selects columns for its schema
+        return data_frame
@@ -1,12 +1,19 @@
 from ...utils import parse_period_from_to
+from .fanout import BitmexDailyFanOutPartition
 from .futures import BitmexFuturesDailyPartition, BitmexFuturesHourlyPartition
-from .perpetual import BitmexPerpetualDailyPartition, BitmexPerpetualHourlyPartition
+from .perpetual import (
+    BitmexPerpetualDailyPartition,
+    BitmexPerpetualHourlyPartition,
+    BitmexPerpetualWebsocket,
+)
 
 
 def bitmex_perpetual(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    max_workers: int = 1,
+    fixed_point: bool = False,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -24,14 +31,30 @@ def bitmex_perpetual(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
             verbose=verbose,
         ).main()
 
 
+def bitmex_websocket(
+    symbol: str = None,
+    max_partitions: int = None,
+    deadline: float = None,
+    verbose: bool = False,
+):
+    assert symbol, 'Required param "symbol" not provided'
+    BitmexPerpetualWebsocket(
+        symbol, max_partitions=max_partitions, deadline=deadline, verbose=verbose
+    ).main()
+
+
 def bitmex_futures(
     root_symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    max_workers: int = 1,
+    fixed_point: bool = False,
     verbose: bool = False,
 ):
     assert root_symbol, 'Required param "root_symbol" not provided'
@@ -49,5 +72,55 @@ def bitmex_futures(
             root_symbol,
             period_from=date_from,
             period_to=date_to,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
             verbose=verbose,
         ).main()
+
+
+def bitmex_daily(
+    symbols: str = None,
+    root_symbols: str = None,
+    period_from: str = None,
+    period_to: str = None,
+    max_workers: int = 1,
+    fixed_point: bool = False,
+    verbose: bool = False,
+):
+    """
+    Perpetual symbols and futures root symbols, comma separated. Daily partitions
+    for all are written from one download of each BitMEX dump.
+    """
+    assert symbols or root_symbols, 'Required param "symbols" not provided'
+    symbols = symbols.split(",") if symbols else []
+    root_symbols = root_symbols.split(",") if root_symbols else []
+    timestamp_from, timestamp_to, date_from, date_to = parse_period_from_to(
+        period_from=period_from, period_to=period_to
+    )
+    if timestamp_from and timestamp_to:
+        for symbol in symbols:
+            BitmexPerpetualHourlyPartition(
+                symbol,
+                period_from=timestamp_from,
+                period_to=timestamp_to,
+            ).main()
+        for root_symbol in root_symbols:
+            BitmexFuturesHourlyPartition(
+                root_symbol,
+                period_from=timestamp_from,
+                period_to=timestamp_to,
+            ).main()
+    if date_from and date_to:
+        kwargs = {"period_from": date_from, "period_to": date_to, "verbose": verbose}
+        controllers = [
+            BitmexPerpetualDailyPartition(symbol, **kwargs) for symbol in symbols
+        ] + [
+            BitmexFuturesDailyPartition(root_symbol, **kwargs)
+            for root_symbol in root_symbols
+        ]
+        BitmexDailyFanOutPartition(
+            controllers,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
+            **kwargs,
+        ).main()
@@ -1,10 +1,19 @@
 BITMEX = "bitmex"
 
-S3_URL = "https://s3-eu-west-1.amazonaws.com/public.bitmex.com/data/trade/"
+S3_BUCKET_URL = "https://s3-eu-west-1.amazonaws.com/public.bitmex.com"
+S3_PREFIX = "data/trade/"
+S3_URL = f"{S3_BUCKET_URL}/{S3_PREFIX}"
 
 API_URL = "https://www.bitmex.com/api/v1"
+WEBSOCKET_URL = "wss://ws.bitmex.com/realtime"
 MAX_RESULTS = 1000
-MIN_ELAPSED_PER_REQUEST = 0
+# Unauthenticated, then x-ratelimit-remaining and x-ratelimit-reset
+MAX_REQUESTS = 30
+MAX_REQUESTS_RESET = 60  # 1 minute
+# Symbols paginated concurrently, rate limited together
+MAX_WORKERS = 2
+# Concurrent requests, if fetching windows of a partition
+MAX_FETCH_WORKERS = 2
 
 XBTUSD = "XBTUSD"
 
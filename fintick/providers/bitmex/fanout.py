@@ -0,0 +1,6 @@
+from ...controllers import FinTick
+from .base import BitmexDailyFanOutS3Mixin, BitmexMixin
+
+
+class BitmexDailyFanOutPartition(BitmexDailyFanOutS3Mixin, BitmexMixin, FinTick):
+    pass
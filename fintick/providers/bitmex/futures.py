@@ -1,11 +1,14 @@
 from ...controllers import FinTick, FinTickHourlyMixin, FinTickMultiSymbolREST
 from .base import BitmexDailyMultiSymbolS3Mixin, BitmexMixin
+from .constants import MAX_WORKERS
 
 
 class BitmexFuturesHourlyPartition(
     FinTickHourlyMixin, BitmexMixin, FinTickMultiSymbolREST
 ):
-    pass
+    @property
+    def max_workers(self):
+        return MAX_WORKERS
 
 
 class BitmexFuturesDailyPartition(BitmexDailyMultiSymbolS3Mixin, FinTick):
@@ -1,11 +1,9 @@
-import numpy as np
+import pandas as pd
 
 
 def calculate_index(data_frame):
-    symbols = data_frame.symbol.unique()
-    data_frame["index"] = np.nan  # B/C pandas index
-    for symbol in symbols:
-        index = data_frame.index[data_frame.symbol == symbol]
-        # 0-based index according to symbol
-        data_frame.loc[index, "index"] = index.values - index.values[0]
+    # 0-based index according to symbol, B/C pandas index
+    index = pd.Series(data_frame.index, index=data_frame.index)
+    first_index = index.groupby(data_frame["symbol"]).transform("first")
+    data_frame["index"] = index - first_index
     return data_frame
@@ -1,10 +1,19 @@
 from ...controllers import FinTick, FinTickHourlyMixin, FinTickREST
-from .base import BitmexDailyS3Mixin, BitmexMixin, BitmexRESTMixin
+from .base import (
+    BitmexDailyS3Mixin,
+    BitmexMixin,
+    BitmexRESTMixin,
+    BitmexWebsocketMixin,
+)
 
 
 class BitmexPerpetualHourlyPartition(FinTickHourlyMixin, BitmexRESTMixin, FinTickREST):
     pass
 
 
+class BitmexPerpetualWebsocket(FinTickHourlyMixin, BitmexWebsocketMixin, FinTickREST):
+    pass
+
+
 class BitmexPerpetualDailyPartition(BitmexDailyS3Mixin, BitmexMixin, FinTick):
     pass
@@ -1,24 +1,20 @@
+import datetime
 import json
+import re
 import time
-from decimal import Decimal
 
-import httpx
-
-from ...constants import HTTPX_ERRORS
-from ...utils import (
-    increment_api_total_requests,
-    iter_api,
-    parse_datetime,
-    throttle_api_requests,
-)
+from ...constants import HTTPX_ERRORS, RANGE_MIN_PAGES
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import SeekExhausted, iter_api, iter_api_range, parse_datetime, seek_api
 from .constants import (
     API_URL,
-    BYBIT_MAX_REQUESTS_RESET,
-    BYBIT_TOTAL_REQUESTS,
+    BYBIT,
+    MAX_FETCH_WORKERS,
     MAX_REQUESTS,
     MAX_REQUESTS_RESET,
     MAX_RESULTS,
-    MIN_ELAPSED_PER_REQUEST,
+    S3_URL,
 )
 
 
@@ -41,7 +37,7 @@ def get_bybit_api_timestamp(trade):
     return parse_datetime(trade["time"])
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{API_URL}/trading-records?symbol={symbol}&limit={MAX_RESULTS}"
     return iter_api(
         url,
@@ -49,26 +45,77 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_bybit_api_timestamp,
         get_bybit_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
         log_prefix=log_prefix,
+        stream=stream,
     )
 
 
-def get_bybit_api_response(url, pagination_id=None, retry=30):
-    throttle_api_requests(
-        BYBIT_MAX_REQUESTS_RESET,
-        BYBIT_TOTAL_REQUESTS,
-        MAX_REQUESTS_RESET,
-        MAX_REQUESTS,
+def get_trades_range(
+    symbol,
+    timestamp_from,
+    timestamp_to,
+    pagination_id,
+    ticks,
+    log_prefix=None,
+    stream=False,
+):
+    """
+    If expected to be several pages, as ticks of the last partition, the range of
+    trade ids is fetched concurrently.
+    """
+    if ticks <= MAX_RESULTS * RANGE_MIN_PAGES:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    url = f"{API_URL}/trading-records?symbol={symbol}&limit={MAX_RESULTS}"
+    # From, so the page from pagination_id
+    id_to = pagination_id + MAX_RESULTS
+    try:
+        # Trade id_to is at, or after, timestamp_from
+        high = (id_to, timestamp_to)
+        trade_id = get_trade_id(symbol, timestamp_from, log_prefix, high=high)
+    except SeekExhausted:
+        trade_id = None  # Maybe, not the first trade, so paginated
+    if trade_id is None or id_to - trade_id <= MAX_RESULTS:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_range(
+        url,
+        lambda trade: trade["id"],
+        get_bybit_api_pagination_id,
+        get_bybit_api_timestamp,
+        get_bybit_api_response,
+        MAX_RESULTS,
+        trade_id,
+        id_to,
+        max_workers=MAX_FETCH_WORKERS,
+        log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trade_id(symbol, timestamp, log_prefix=None, low=None, high=None):
+    """First trade id at, or after, timestamp."""
+    url = f"{API_URL}/trading-records?symbol={symbol}&limit={MAX_RESULTS}"
+    return seek_api(
+        url,
+        lambda trade: trade["id"],
+        get_bybit_api_timestamp,
+        get_bybit_api_response,
+        timestamp,
+        low=low,
+        high=high,
+        log_prefix=log_prefix,
     )
+
+
+def get_bybit_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(BYBIT, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_bybit_api_url(url, pagination_id))
-        increment_api_total_requests(BYBIT_TOTAL_REQUESTS)
+        response = get_session(BYBIT).get(get_bybit_api_url(url, pagination_id))
         if response.status_code == 200:
             result = response.read()
-            data = json.loads(result, parse_float=Decimal)
+            data = json.loads(result, parse_float=str)
             assert data["ret_msg"] == "OK"
             res = data["result"]
             # If no pagination_id, ascending order
@@ -76,6 +123,9 @@ def get_bybit_api_response(url, pagination_id=None, retry=30):
                 # Descending order, please
                 res.reverse()
             return res
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_bybit_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
@@ -84,3 +134,18 @@ def get_bybit_api_response(url, pagination_id=None, retry=30):
             retry -= 1
             return get_bybit_api_response(url, pagination_id, retry)
         raise
+
+
+def get_bybit_dumps(symbol):
+    """Bybit dumps for symbol, as {date: None}, as sizes are not listed."""
+    url = f"{S3_URL}{symbol}/"
+    response = get_session(BYBIT).get(url)
+    if response.status_code == 200:
+        dates = re.findall(
+            rf'href="{symbol}(\d{{4}}-\d{{2}}-\d{{2}})\.csv\.gz"', response.text
+        )
+        return {datetime.date.fromisoformat(date): None for date in dates}
+    elif response.status_code == 404:
+        return {}  # No data
+    else:
+        print(f"Error {response.status_code}: {url}")
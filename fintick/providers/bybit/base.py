@@ -1,10 +1,9 @@
-from decimal import Decimal
-
-import httpx
+import numpy as np
 import pandas as pd
 
 from ...controllers import FinTickDailyS3Mixin, FinTickSequentialIntegerMixin
-from .api import get_bybit_api_timestamp, get_trades
+from ...utils import parse_epoch
+from .api import get_bybit_dumps, get_trade_id, get_trades, get_trades_range
 from .constants import BYBIT, MAX_RESULTS, S3_URL
 
 
@@ -13,29 +12,16 @@ class BybitMixin:
     def exchange(self):
         return BYBIT
 
-    def get_uid(self, trade):
-        return str(trade["id"])
-
-    def get_timestamp(self, trade):
-        return get_bybit_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return Decimal(trade["price"])
-
-    def get_volume(self, trade):
-        return Decimal(trade["qty"])
-
-    def get_notional(self, trade):
-        return self.get_volume(trade) / self.get_price(trade)
-
-    def get_tick_rule(self, trade):
-        return 1 if trade["side"] == "Buy" else -1
-
-    def get_index(self, trade):
-        return trade["id"]
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["id", "time", "price", "qty", "side"])
+        return {
+            "uid": df["id"].astype(str),
+            "timestamp": parse_epoch(df["time"]),
+            "price": df["price"],
+            "volume": df["qty"],
+            "tickRule": np.where(df["side"] == "Buy", 1, -1),
+            "index": df["id"],
+        }
 
 
 class BybitRESTMixin(FinTickSequentialIntegerMixin, BybitMixin):
@@ -47,18 +33,35 @@ class BybitRESTMixin(FinTickSequentialIntegerMixin, BybitMixin):
             assert pagination_id > 0
         return pagination_id
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, log_prefix)
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, log_prefix, stream=stream
+        )
+
+    def iter_api_range(self, symbol, pagination_id, ticks, log_prefix, stream=False):
+        return get_trades_range(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            pagination_id,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
+
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        return get_trade_id(symbol, timestamp, log_prefix, low=low, high=high)
 
 
 class BybitDailyS3Mixin(FinTickDailyS3Mixin):
+    def get_dumps(self):
+        key = f"{BYBIT}-{self.symbol}"
+        return self.dump_index.get(
+            key, lambda: get_bybit_dumps(self.symbol), date_to=self.period_to
+        )
+
     def get_url(self, date):
-        directory = f"{S3_URL}{self.symbol}/"
-        response = httpx.get(directory)
-        if response.status_code == 200:
-            return f"{S3_URL}{self.symbol}/{self.symbol}{date.isoformat()}.csv.gz"
-        else:
-            print(f"{self.exchange.capitalize()} {self.symbol}: No data")
+        return f"{S3_URL}{self.symbol}/{self.symbol}{date.isoformat()}.csv.gz"
 
     @property
     def get_columns(self):
@@ -6,6 +6,8 @@ def bybit_perpetual(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    max_workers: int = 1,
+    fixed_point: bool = False,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -23,5 +25,7 @@ def bybit_perpetual(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
             verbose=verbose,
         ).main()
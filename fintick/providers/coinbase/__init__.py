@@ -1,4 +1,4 @@
-from .coinbase import coinbase_spot
+from .coinbase import coinbase_spot, coinbase_websocket
 from .constants import COINBASE
 
-__all__ = ["COINBASE", "coinbase_spot"]
+__all__ = ["COINBASE", "coinbase_spot", "coinbase_websocket"]
@@ -1,10 +1,17 @@
 import time
 
-import httpx
-
-from ...constants import HTTPX_ERRORS
-from ...utils import iter_api, parse_datetime
-from .constants import API_URL, MAX_RESULTS, MIN_ELAPSED_PER_REQUEST
+from ...constants import HTTPX_ERRORS, RANGE_MIN_PAGES
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import SeekExhausted, iter_api, iter_api_range, parse_datetime, seek_api
+from .constants import (
+    API_URL,
+    COINBASE,
+    MAX_FETCH_WORKERS,
+    MAX_REQUESTS,
+    MAX_REQUESTS_RESET,
+    MAX_RESULTS,
+)
 
 
 def get_coinbase_api_url(url, pagination_id):
@@ -25,7 +32,7 @@ def get_coinbase_api_timestamp(trade):
     return parse_datetime(trade["time"])
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{API_URL}/products/{symbol}/trades"
     return iter_api(
         url,
@@ -33,18 +40,80 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_coinbase_api_timestamp,
         get_coinbase_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
         log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trades_range(
+    symbol,
+    timestamp_from,
+    timestamp_to,
+    pagination_id,
+    ticks,
+    log_prefix=None,
+    stream=False,
+):
+    """
+    If expected to be several pages, as ticks of the last partition, the range of
+    trade ids is fetched concurrently.
+    """
+    if ticks <= MAX_RESULTS * RANGE_MIN_PAGES:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    url = f"{API_URL}/products/{symbol}/trades"
+    # After, so before pagination_id
+    id_to = pagination_id
+    try:
+        # Trade id_to is at, or after, timestamp_from
+        high = (id_to, timestamp_to)
+        trade_id = get_trade_id(symbol, timestamp_from, log_prefix, high=high)
+    except SeekExhausted:
+        trade_id = None  # Maybe, not the first trade, so paginated
+    if trade_id is None or id_to - trade_id <= MAX_RESULTS:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_range(
+        url,
+        lambda trade: trade["trade_id"],
+        get_coinbase_api_pagination_id,
+        get_coinbase_api_timestamp,
+        get_coinbase_api_response,
+        MAX_RESULTS,
+        trade_id,
+        id_to,
+        is_before=True,
+        max_workers=MAX_FETCH_WORKERS,
+        log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trade_id(symbol, timestamp, log_prefix=None, low=None, high=None):
+    """First trade id at, or after, timestamp."""
+    url = f"{API_URL}/products/{symbol}/trades"
+    return seek_api(
+        url,
+        lambda trade: trade["trade_id"],
+        get_coinbase_api_timestamp,
+        get_coinbase_api_response,
+        timestamp,
+        low=low,
+        high=high,
+        log_prefix=log_prefix,
     )
 
 
 def get_coinbase_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(COINBASE, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_coinbase_api_url(url, pagination_id))
+        response = get_session(COINBASE).get(get_coinbase_api_url(url, pagination_id))
         if response.status_code == 200:
             return response.json()
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_coinbase_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
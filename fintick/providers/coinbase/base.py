@@ -1,8 +1,10 @@
-from decimal import Decimal
+import numpy as np
+import pandas as pd
 
-from ...controllers import FinTickSequentialIntegerMixin
-from .api import get_coinbase_api_timestamp, get_trades
-from .constants import COINBASE
+from ...controllers import FinTickSequentialIntegerMixin, FinTickWebsocketMixin
+from ...utils import parse_epoch
+from .api import get_trade_id, get_trades, get_trades_range
+from .constants import COINBASE, WEBSOCKET_URL
 
 
 class CoinbaseMixin(FinTickSequentialIntegerMixin):
@@ -10,37 +12,71 @@ class CoinbaseMixin(FinTickSequentialIntegerMixin):
     def exchange(self):
         return COINBASE
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, self.log_prefix)
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, self.log_prefix, stream=stream
+        )
+
+    def iter_api_range(self, symbol, pagination_id, ticks, log_prefix, stream=False):
+        return get_trades_range(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            pagination_id,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
 
-    def get_uid(self, trade):
-        return str(trade["trade_id"])
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        return get_trade_id(symbol, timestamp, log_prefix, low=low, high=high)
 
-    def get_timestamp(self, trade):
-        return get_coinbase_api_timestamp(trade)
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["trade_id", "time", "price", "size", "side"])
+        return {
+            "uid": df["trade_id"].astype(str),
+            "timestamp": parse_epoch(df["time"]),
+            "price": df["price"],
+            "notional": df["size"],
+            # Buy side indicates a down-tick because the maker was a buy order and
+            # their order was removed. Conversely, sell side indicates an up-tick.
+            "tickRule": np.where(df["side"] == "sell", 1, -1),
+            "index": df["trade_id"],
+        }
 
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
+    def get_is_complete(self, trades):
+        if self.is_seek_complete(trades):
+            return True
+        data = self.get_one_document(
+            where=["open.index", "==", int(trades["index"].iloc[0]) + 1]
+        )
+        return data is not None
 
-    def get_price(self, trade):
-        return Decimal(trade["price"])
 
-    def get_volume(self, trade):
-        return self.get_price(trade) * self.get_notional(trade)
+class CoinbaseWebsocketMixin(FinTickWebsocketMixin, CoinbaseMixin):
+    """
+    Details: https://docs.pro.coinbase.com/#the-matches-channel
+    """
 
-    def get_notional(self, trade):
-        return Decimal(trade["size"])
+    @property
+    def websocket_url(self):
+        return WEBSOCKET_URL
 
-    def get_tick_rule(self, trade):
-        # Buy side indicates a down-tick because the maker was a buy order and
-        # their order was removed. Conversely, sell side indicates an up-tick.
-        return 1 if trade["side"] == "sell" else -1
+    def get_subscribe_messages(self):
+        return [
+            {
+                "type": "subscribe",
+                "product_ids": [self.api_symbol],
+                "channels": ["matches"],
+            }
+        ]
 
-    def get_index(self, trade):
-        return int(trade["trade_id"])
+    def get_gap_pagination_id(self):
+        # Trade ids aren't timestamps, so sought
+        return self.seek_pagination_id()
 
-    def get_is_complete(self, trades):
-        data = self.firestore_cache.get_one(
-            where=["open.index", "==", trades[0]["index"] + 1]
-        )
-        return data is not None
+    def parse_message(self, message):
+        # Last match, on subscribe. Then, match
+        if message.get("type") in ("last_match", "match"):
+            return [message]
+        return []
@@ -5,6 +5,7 @@ from .spot import (
     CoinbaseDailyPartition,
     CoinbaseDailyPartitionFromHourly,
     CoinbaseHourlyPartition,
+    CoinbaseWebsocket,
 )
 
 
@@ -12,6 +13,8 @@ def coinbase_spot(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -23,6 +26,8 @@ def coinbase_spot(
             symbol,
             period_from=timestamp_from,
             period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
     if date_from and date_to:
@@ -41,5 +46,19 @@ def coinbase_spot(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
+
+
+def coinbase_websocket(
+    symbol: str = None,
+    max_partitions: int = None,
+    deadline: float = None,
+    verbose: bool = False,
+):
+    assert symbol, 'Required param "symbol" not provided'
+    CoinbaseWebsocket(
+        symbol, max_partitions=max_partitions, deadline=deadline, verbose=verbose
+    ).main()
@@ -1,8 +1,13 @@
 COINBASE = "coinbase"
 
 API_URL = "https://api.pro.coinbase.com"
+WEBSOCKET_URL = "wss://ws-feed.pro.coinbase.com"
 MAX_RESULTS = 100
-MIN_ELAPSED_PER_REQUEST = 1 / 3.0  # 3 req/s
+MAX_REQUESTS = 3
+MAX_REQUESTS_RESET = 1  # 3 req/s
+
+# Concurrent requests, if fetching a range of trade ids
+MAX_FETCH_WORKERS = MAX_REQUESTS
 
 # Symbols for trade verification
 BTCUSD = "BTC-USD"
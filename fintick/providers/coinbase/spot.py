@@ -9,7 +9,7 @@ from ...controllers import (
     FinTickREST,
 )
 from ...s3downloader import assert_type_decimal
-from .base import CoinbaseMixin
+from .base import CoinbaseMixin, CoinbaseWebsocketMixin
 from .constants import BTCUSD
 
 
@@ -17,6 +17,10 @@ class CoinbaseHourlyPartition(FinTickHourlyMixin, CoinbaseMixin, FinTickREST):
     pass
 
 
+class CoinbaseWebsocket(FinTickHourlyMixin, CoinbaseWebsocketMixin, FinTickREST):
+    pass
+
+
 class CoinbaseDailyPartitionFromHourly(
     FinTickDailyPartitionFromHourlyMixin, CoinbaseMixin, FinTick
 ):
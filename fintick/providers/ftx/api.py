@@ -1,12 +1,20 @@
 import json
 import time
-from decimal import Decimal
-
-import httpx
 
 from ...constants import HTTPX_ERRORS
-from ...utils import iter_api, parse_datetime
-from .constants import API_URL, BTC, MAX_RESULTS, MIN_ELAPSED_PER_REQUEST
+from ...cursors import NudgeCursor
+from ...ratelimit import get_rate_limiter, get_retry_after
+from ...sessions import get_session
+from ...utils import get_window_count, iter_api, iter_api_windows, parse_datetime
+from .constants import (
+    API_URL,
+    BTC,
+    FTX,
+    MAX_FETCH_WORKERS,
+    MAX_REQUESTS,
+    MAX_REQUESTS_RESET,
+    MAX_RESULTS,
+)
 
 
 def get_ftx_api_url(url, pagination_id):
@@ -17,18 +25,20 @@ def get_ftx_api_url(url, pagination_id):
 
 
 def get_ftx_api_pagination_id(timestamp, last_data=[], data=[]):
+    return format_ftx_api_timestamp(timestamp)
+
+
+def get_ftx_api_cursor():
     """
-    FTX API is seriously donkey balls. If more than 100 trades at same timestamp,
-    the next timestamp is same as first. In such case, the pagination_id needs
-    to be adjusted a small amount until unique trades are captured again.
+    FTX API is seriously donkey balls. If more than MAX_RESULTS trades at the same
+    timestamp, the next page is the same. So, the cursor is nudged before it.
     """
-    pagination_id = format_ftx_api_timestamp(timestamp)
-    ids = [trade["id"] for trade in last_data]
-    unique = [trade["id"] for trade in data if trade["id"] not in ids]
-    if len(data) == MAX_RESULTS and not len(unique):
-        pagination_id -= 1e-6
-        return round(pagination_id, 6)
-    return pagination_id
+    return NudgeCursor(
+        get_ftx_api_pagination_id,
+        lambda trade: trade["id"],
+        get_ftx_api_timestamp,
+        MAX_RESULTS,
+    )
 
 
 def get_ftx_api_timestamp(trade):
@@ -36,10 +46,10 @@ def get_ftx_api_timestamp(trade):
 
 
 def format_ftx_api_timestamp(timestamp):
-    return timestamp.timestamp()
+    return round(timestamp.timestamp(), 6)
 
 
-def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
+def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None, stream=False):
     url = f"{API_URL}/markets/{symbol}/trades"
     return iter_api(
         url,
@@ -47,10 +57,38 @@ def get_trades(symbol, timestamp_from, pagination_id, log_prefix=None):
         get_ftx_api_timestamp,
         get_ftx_api_response,
         MAX_RESULTS,
-        MIN_ELAPSED_PER_REQUEST,
         timestamp_from=timestamp_from,
         pagination_id=pagination_id,
+        cursor=get_ftx_api_cursor(),
+        log_prefix=log_prefix,
+        stream=stream,
+    )
+
+
+def get_trades_windows(
+    symbol, timestamp_from, timestamp_to, ticks, log_prefix=None, stream=False
+):
+    """If ticks are more than a window, windows are fetched concurrently."""
+    url = f"{API_URL}/markets/{symbol}/trades"
+    pagination_id = format_ftx_api_timestamp(timestamp_to)
+    windows = get_window_count(ticks, MAX_RESULTS)
+    if windows == 1:
+        return get_trades(symbol, timestamp_from, pagination_id, log_prefix, stream)
+    return iter_api_windows(
+        url,
+        lambda trade: trade["id"],
+        get_ftx_api_pagination_id,
+        get_ftx_api_timestamp,
+        get_ftx_api_response,
+        format_ftx_api_timestamp,
+        MAX_RESULTS,
+        timestamp_from,
+        timestamp_to,
+        windows,
+        max_workers=MAX_FETCH_WORKERS,
+        cursor=get_ftx_api_cursor(),
         log_prefix=log_prefix,
+        stream=stream,
     )
 
 
@@ -67,7 +105,8 @@ def get_expired_futures(root_symbol=BTC, verbose=True):
 
 
 def get_futures(url, root_symbol, verbose=True):
-    response = httpx.get(url)
+    get_rate_limiter(FTX, MAX_REQUESTS, MAX_REQUESTS_RESET).acquire()
+    response = get_session(FTX).get(url)
     data = response.json()
     result = data["result"]
     success = data["success"]
@@ -86,16 +125,20 @@ def get_futures(url, root_symbol, verbose=True):
 
 
 def get_ftx_api_response(url, pagination_id=None, retry=30):
+    rate_limiter = get_rate_limiter(FTX, MAX_REQUESTS, MAX_REQUESTS_RESET)
+    rate_limiter.acquire()
     try:
-        response = httpx.get(get_ftx_api_url(url, pagination_id))
+        response = get_session(FTX).get(get_ftx_api_url(url, pagination_id))
         if response.status_code == 200:
             result = response.read()
-            data = response.json()
-            data = json.loads(result, parse_float=Decimal)
+            data = json.loads(result, parse_float=str)
             if data["success"]:
                 return data["result"]
             else:
                 raise Exception(data["success"])
+        elif response.status_code == 429 and retry > 0:
+            rate_limiter.block(get_retry_after(response))
+            return get_ftx_api_response(url, pagination_id, retry - 1)
         else:
             raise Exception(f"HTTP {response.status_code}: {response.reason_phrase}")
     except HTTPX_ERRORS:
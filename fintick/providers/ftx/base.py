@@ -1,9 +1,13 @@
-from ...controllers import FinTickNonSequentialIntegerMixin
-from .api import format_ftx_api_timestamp, get_ftx_api_timestamp, get_trades
+import numpy as np
+import pandas as pd
+
+from ...controllers import FinTickNonSequentialIntegerMixin, FinTickTimePaginationMixin
+from ...utils import parse_epoch
+from .api import format_ftx_api_timestamp, get_trades, get_trades_windows
 from .constants import FTX
 
 
-class FTXMixin(FinTickNonSequentialIntegerMixin):
+class FTXMixin(FinTickTimePaginationMixin, FinTickNonSequentialIntegerMixin):
     @property
     def exchange(self):
         return FTX
@@ -15,29 +19,28 @@ class FTXMixin(FinTickNonSequentialIntegerMixin):
     def get_pagination_id(self, data=None):
         return format_ftx_api_timestamp(self.timestamp_to)
 
-    def iter_api(self, symbol, pagination_id, log_prefix):
-        return get_trades(symbol, self.timestamp_from, pagination_id, log_prefix)
-
-    def get_uid(self, trade):
-        return str(trade["id"])
-
-    def get_timestamp(self, trade):
-        return get_ftx_api_timestamp(trade)
-
-    def get_nanoseconds(self, trade):
-        return self.get_timestamp(trade).nanosecond
-
-    def get_price(self, trade):
-        return trade["price"]
-
-    def get_volume(self, trade):
-        return self.get_price(trade) * self.get_notional(trade)
-
-    def get_notional(self, trade):
-        return trade["size"]
-
-    def get_tick_rule(self, trade):
-        return 1 if trade["side"] == "buy" else -1
-
-    def get_index(self, trade):
-        return int(trade["id"])
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        return get_trades(
+            symbol, self.timestamp_from, pagination_id, log_prefix, stream=stream
+        )
+
+    def iter_api_windows(self, symbol, ticks, log_prefix, stream=False):
+        return get_trades_windows(
+            symbol,
+            self.timestamp_from,
+            self.timestamp_to,
+            ticks,
+            log_prefix,
+            stream=stream,
+        )
+
+    def get_page_columns(self, data):
+        df = pd.DataFrame(data, columns=["id", "time", "price", "size", "side"])
+        return {
+            "uid": df["id"].astype(str),
+            "timestamp": parse_epoch(df["time"]),
+            "price": df["price"],
+            "notional": df["size"],
+            "tickRule": np.where(df["side"] == "buy", 1, -1),
+            "index": df["id"],
+        }
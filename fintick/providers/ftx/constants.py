@@ -1,11 +1,13 @@
 FTX = "ftx"
 
-FTX_MAX_REQUESTS_RESET = "FTX_MAX_REQUESTS_RESET"
-FTX_TOTAL_REQUESTS = "FTX_TOTAL_REQUESTS"
-
 API_URL = "https://ftx.com/api"
 MAX_RESULTS = 200
-MIN_ELAPSED_PER_REQUEST = 1 / 30.0  # 30 req/s
+MAX_REQUESTS = 30
+MAX_REQUESTS_RESET = 1  # 30 req/s
+# Symbols paginated concurrently, rate limited together
+MAX_WORKERS = 8
+# Concurrent requests, if fetching windows of a partition
+MAX_FETCH_WORKERS = 8
 
 # For MOVE
 BTC = "BTC"
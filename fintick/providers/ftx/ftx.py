@@ -8,6 +8,8 @@ def ftx_perpetual(
     symbol: str = None,
     period_from: str = None,
     period_to: str = None,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     assert symbol, 'Required param "symbol" not provided'
@@ -19,6 +21,8 @@ def ftx_perpetual(
             symbol,
             period_from=timestamp_from,
             period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
     if date_from and date_to:
@@ -26,6 +30,8 @@ def ftx_perpetual(
             symbol,
             period_from=date_from,
             period_to=date_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
 
@@ -33,6 +39,8 @@ def ftx_perpetual(
 def ftx_move(
     period_from: str = None,
     period_to: str = None,
+    stream: bool = False,
+    deadline: float = None,
     verbose: bool = False,
 ):
     timestamp_from, timestamp_to, date_from, date_to = parse_period_from_to(
@@ -43,6 +51,8 @@ def ftx_move(
             api_symbol=BTC,
             period_from=timestamp_from,
             period_to=timestamp_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
     if date_from and date_to:
@@ -50,5 +60,7 @@ def ftx_move(
             api_symbol=BTC,
             period_from=date_from,
             period_to=date_to,
+            stream=stream,
+            deadline=deadline,
             verbose=verbose,
         ).main()
@@ -5,21 +5,28 @@ from ...controllers import (
     FinTickMultiSymbolHourlyMixin,
     FinTickMultiSymbolREST,
 )
+from ...instruments import get_instrument_cache
 from .api import get_active_futures, get_expired_futures
 from .base import FTXMixin
-from .constants import BTCMOVE
+from .constants import BTCMOVE, FTX, MAX_WORKERS
 
 
 class BaseFTXMOVE(FTXMixin, FinTickMultiSymbolREST):
+    @property
+    def max_workers(self):
+        return MAX_WORKERS
+
     @property
     def log_prefix(self):
         symbol = BTCMOVE.replace("-", "")
         return f"{self.exchange_display} {symbol}"
 
     def get_symbols(self):
-        active_futures = get_active_futures(self.symbol, verbose=False)
-        expired_futures = get_expired_futures(self.symbol, verbose=False)
-        futures = active_futures + expired_futures
+        futures = get_instrument_cache().get(
+            f"{FTX}-{self.symbol}",
+            lambda: get_active_futures(self.symbol, verbose=False),
+            lambda: get_expired_futures(self.symbol, verbose=False),
+        )
         regex = re.compile(r"^BTC-MOVE-(WK)?-?(\d{4})?(\d{4})?(Q\d)?$")
         move_futures = []
         for future in futures:
@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from .constants import RATE_LIMIT_DIR
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Not shared by processes
+
+# Rate limiters per exchange, shared by threads
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name, max_requests, max_requests_reset):
+    """
+    Shared by processes with a file lock, in RATE_LIMIT_DIR or the temp directory.
+    """
+    with rate_limiters_lock:
+        if name not in rate_limiters:
+            directory = os.environ.get(RATE_LIMIT_DIR, None) or os.path.join(
+                tempfile.gettempdir(), "fintick-ratelimit"
+            )
+            rate_limiters[name] = RateLimiter(
+                name, max_requests, max_requests_reset, directory=directory
+            )
+        return rate_limiters[name]
+
+
+def get_rate_limiter_stats():
+    with rate_limiters_lock:
+        return {name: limiter.stats for name, limiter in rate_limiters.items()}
+
+
+class RateLimiter:
+    """
+    Token bucket per exchange. Requests cost tokens, such as Binance weight, and
+    tokens are refilled at max_requests per max_requests_reset seconds.
+
+    Tokens are reserved, so may be negative. Each request waits until its own
+    tokens are refilled, so throughput is the limit, without polling.
+    """
+
+    def __init__(self, name, max_requests, max_requests_reset, directory=None):
+        self.name = name
+        self.max_requests = max_requests
+        self.rate = max_requests / max_requests_reset
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.state = None  # If not shared by processes
+        self.requests = 0
+        self.waited = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def acquire(self, cost=1):
+        with self.get_state() as state:
+            now = time.time()
+            self.refill(state, now)
+            state["tokens"] -= cost
+            wait = max(-state["tokens"] / self.rate, state["blocked_until"] - now)
+            self.requests += 1
+            self.waited += max(wait, 0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def update(self, remaining=None, reset_after=None):
+        """From response headers, i.e. remaining requests, or weight."""
+        with self.get_state() as state:
+            now = time.time()
+            self.refill(state, now)
+            if remaining is not None:
+                state["tokens"] = min(state["tokens"], remaining)
+                if remaining <= 0 and reset_after:
+                    self.set_blocked_until(state, now + reset_after)
+
+    def block(self, retry_after):
+        """HTTP 429, so no requests until retry after."""
+        with self.get_state() as state:
+            now = time.time()
+            self.refill(state, now)
+            state["tokens"] = min(state["tokens"], 0)
+            self.set_blocked_until(state, now + retry_after)
+        print(f"{self.name.capitalize()} HTTP 429, sleeping {retry_after} seconds")
+
+    def refill(self, state, now):
+        elapsed = max(now - state["updated"], 0)
+        tokens = state["tokens"] + elapsed * self.rate
+        state["tokens"] = min(tokens, self.max_requests)
+        state["updated"] = now
+
+    def set_blocked_until(self, state, blocked_until):
+        state["blocked_until"] = max(state["blocked_until"], blocked_until)
+
+    def get_initial_state(self):
+        return {"tokens": self.max_requests, "updated": time.time(), "blocked_until": 0}
+
+    @contextmanager
+    def get_state(self):
+        with self.lock:
+            if self.directory and fcntl:
+                path = os.path.join(self.directory, self.name)
+                with open(f"{path}.lock", "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        state = self.load(path)
+                        yield state
+                        self.save(path, state)
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                if self.state is None:
+                    self.state = self.get_initial_state()
+                yield self.state
+
+    def load(self, path):
+        try:
+            with open(f"{path}.json", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return self.get_initial_state()
+
+    def save(self, path, state):
+        with open(f"{path}.json", "w") as f:
+            json.dump(state, f)
+
+    @property
+    def stats(self):
+        # Per process
+        return f"{self.requests} requests, waited {self.waited:.1f} seconds"
+
+
+def get_retry_after(response, default=1):
+    return float(response.headers.get("retry-after", default))
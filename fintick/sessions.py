@@ -0,0 +1,84 @@
+import os
+import threading
+
+import httpx
+
+from .constants import HTTP2, HTTP_TIMEOUT
+
+# Sessions per provider, shared by threads
+sessions = {}
+sessions_lock = threading.Lock()
+
+
+def get_session(name):
+    with sessions_lock:
+        if name not in sessions:
+            http2 = os.environ.get(HTTP2, "").lower() in ("1", "true")
+            timeout = os.environ.get(HTTP_TIMEOUT, None)
+            timeout = float(timeout) if timeout else httpx.Timeout(5.0)
+            sessions[name] = Session(name, http2=http2, timeout=timeout)
+        return sessions[name]
+
+
+def get_session_stats():
+    with sessions_lock:
+        return {name: session.stats for name, session in sessions.items()}
+
+
+class Session:
+    """
+    Pooled, keep-alive connections for a provider. Requests are counted, as are new
+    connections, so reused connections are the difference. Connections are traced,
+    from httpx 0.21, so if not, only requests are counted.
+    """
+
+    def __init__(self, name, http2=False, timeout=httpx.Timeout(5.0)):
+        self.name = name
+        self.requests = 0
+        self.connections = 0
+        self.is_traced = False
+        self.lock = threading.Lock()
+        # HTTP/2 requires httpx[http2]
+        self.client = httpx.Client(
+            http2=http2, timeout=timeout, event_hooks={"request": [self.on_request]}
+        )
+
+    def on_request(self, request):
+        # Before httpx 0.18, no extensions
+        extensions = getattr(request, "extensions", None)
+        if extensions is not None:
+            extensions["trace"] = self.trace
+        with self.lock:
+            self.requests += 1
+
+    def trace(self, event_name, info):
+        with self.lock:
+            self.is_traced = True
+            if event_name == "connection.connect_tcp.complete":
+                self.connections += 1
+
+    def get(self, url, **kwargs):
+        return self.client.get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.client.head(url, **kwargs)
+
+    def stream(self, method, url, **kwargs):
+        return self.client.stream(method, url, **kwargs)
+
+    @property
+    def reused(self):
+        if self.is_traced:
+            return self.requests - self.connections
+
+    @property
+    def stats(self):
+        if not self.is_traced:
+            return f"{self.requests} requests"
+        return (
+            f"{self.requests} requests, {self.connections} connections, "
+            f"{self.reused} reused"
+        )
+
+    def close(self):
+        self.client.close()
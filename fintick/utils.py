@@ -1,10 +1,15 @@
 import base64
 import datetime
+import itertools
 import json
+import math
 import os
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pendulum
 from google.cloud import pubsub_v1
@@ -15,8 +20,12 @@ from .constants import (
     BIGQUERY_MAX_HOT,
     GCP_APPLICATION_CREDENTIALS,
     LOCAL_ENV_VARS,
+    MAX_WINDOWS,
     PRODUCTION_ENV_VARS,
     PROJECT_ID,
+    RANGE_PAGES,
+    SEEK_MAX_PROBES,
+    WINDOW_PAGES,
 )
 
 
@@ -67,52 +76,6 @@ def get_trades_name():
     return f"{project}-trades"
 
 
-def get_api_max_requests_reset(seconds):
-    return time.time() + seconds
-
-
-def set_api_environ_vars(
-    max_requests_reset_key, total_requests_key, max_requests_reset, reset=False
-):
-    if reset or (max_requests_reset_key not in os.environ):
-        max_requests_reset = get_api_max_requests_reset(max_requests_reset)
-        os.environ[max_requests_reset_key] = str(max_requests_reset)
-    if reset or (total_requests_key not in os.environ):
-        os.environ[total_requests_key] = str(0)
-
-
-def increment_api_total_requests(total_requests_key):
-    total_requests = int(os.environ[total_requests_key])
-    os.environ[total_requests_key] = str(total_requests + 1)
-
-
-def throttle_api_requests(
-    max_requests_reset_key, total_requests_key, max_requests_reset, max_requests
-):
-    set_api_environ_vars(
-        max_requests_reset_key,
-        total_requests_key,
-        max_requests_reset,
-        reset=False,
-    )
-    now = time.time()
-    value = float(os.environ[max_requests_reset_key])
-    if now >= value:
-        set_api_environ_vars(
-            max_requests_reset_key,
-            total_requests_key,
-            max_requests_reset,
-            reset=True,
-        )
-    else:
-        total_requests = int(os.environ[total_requests_key])
-        if total_requests >= max_requests:
-            sleep_time = float(os.environ[max_requests_reset_key]) - now
-            if sleep_time > 0:
-                print(f"Max requests, sleeping {sleep_time} seconds")
-                time.sleep(sleep_time)
-
-
 def normalize_symbol(symbol, provider=None):
     for char in ("-", "/", "_"):
         symbol = symbol.replace(char, "")
@@ -144,6 +107,14 @@ def parse_datetime(value, unit="ns"):
     return timestamp.replace(tzinfo=datetime.timezone.utc)
 
 
+def parse_epoch(values, unit=None):
+    """Nanoseconds since epoch, for a column of timestamps."""
+    if not len(values):
+        return np.array([], dtype="int64")
+    timestamps = pd.to_datetime(values, unit=unit, utc=True)
+    return timestamps.values.view("int64")
+
+
 def get_hot_date():
     hot_time = datetime.datetime.utcnow() - BIGQUERY_HOT
     return hot_time.date()
@@ -281,16 +252,54 @@ def iter_api(
     get_api_timestamp,  # Function
     get_api_response,  # Function
     max_results,
-    min_elapsed_per_request,
     timestamp_from=None,
     pagination_id=None,
+    cursor=None,
     log_prefix=None,
+    stream=False,
 ):
+    pages = iter_pages(
+        url,
+        get_api_pagination_id,
+        get_api_timestamp,
+        get_api_response,
+        max_results,
+        timestamp_from=timestamp_from,
+        pagination_id=pagination_id,
+        cursor=cursor,
+        log_prefix=log_prefix,
+    )
+    # If stream, pages as they arrive
+    if stream:
+        return pages
     results = []
+    is_last_iteration = True
+    for data, is_last_iteration, _ in pages:
+        results += data
+    return results, is_last_iteration
+
+
+def iter_pages(
+    url,
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    max_results,
+    timestamp_from=None,
+    pagination_id=None,
+    cursor=None,
+    log_prefix=None,
+):
+    """
+    Pages, with whether it is the last iteration, and the next pagination_id.
+
+    If cursor, the next pagination_id is by cursor, which may not stall at a
+    timestamp, and wasted requests are reported.
+    """
+    get_pagination_id = cursor or get_api_pagination_id
     last_data = []
     stop_iteration = False
     while not stop_iteration:
-        start = time.time()
         data = get_api_response(url, pagination_id=pagination_id)
         if not len(data):
             is_last_iteration = stop_iteration = True
@@ -298,13 +307,9 @@ def iter_api(
             last_trade = data[-1]
             timestamp = get_api_timestamp(last_trade)
             # Next pagination_id
-            pagination_id = get_api_pagination_id(
-                timestamp, last_data=last_data, data=data
-            )
+            pagination_id = get_pagination_id(timestamp, last_data=last_data, data=data)
             # B/C unique
             last_data = data
-            # Append results
-            results += data
             less_than_max_results = len(data) < max_results
             is_last_iteration = pagination_id is None or less_than_max_results
             is_within_partition = timestamp_from and timestamp > timestamp_from
@@ -317,13 +322,358 @@ def iter_api(
                 if not timestamp.microsecond:
                     t += ".000000"
                 print(f"{log_prefix}: {t}")
-        # Throttle requests
-        elapsed = time.time() - start
-        if elapsed < min_elapsed_per_request:
-            time.sleep(min_elapsed_per_request - elapsed)
+        yield data, is_last_iteration, pagination_id
+    if cursor is not None and log_prefix:
+        cursor.report(log_prefix)
+
+
+def iter_api_range(
+    url,
+    get_api_id,  # Function
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    max_results,
+    id_from,
+    id_to,
+    is_before=False,
+    max_workers=1,
+    log_prefix=None,
+    stream=False,
+):
+    """
+    Trades with sequential ids, from id_from to id_to exclusive. The range is split
+    into chunks, which are fetched concurrently.
+
+    If is_before, the API returns trades before pagination_id, otherwise from it.
+    """
+    pages = iter_range_pages(
+        url,
+        get_api_id,
+        get_api_pagination_id,
+        get_api_timestamp,
+        get_api_response,
+        max_results,
+        id_from,
+        id_to,
+        is_before=is_before,
+        max_workers=max_workers,
+        log_prefix=log_prefix,
+    )
+    # If stream, pages as they arrive
+    if stream:
+        return pages
+    results = []
+    is_last_iteration = False
+    for data, is_last_iteration, _ in pages:
+        results += data
+    return results, is_last_iteration
+
+
+def iter_range_pages(
+    url,
+    get_api_id,  # Function
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    max_results,
+    id_from,
+    id_to,
+    is_before=False,
+    max_workers=1,
+    log_prefix=None,
+):
+    """Chunks, in descending order, as pages for iter_api."""
+    size = max_results * RANGE_PAGES
+    chunks = [
+        (max(stop - size, id_from), stop) for stop in range(id_to, id_from, -size)
+    ]
+
+    def get_chunk(chunk):
+        start, stop = chunk
+        return get_api_range(
+            url, get_api_id, get_api_response, start, stop, is_before=is_before
+        )
+
+    # Missing trades are asserted by the controller, as some are known
+    for (start, stop), data in iter_concurrent(get_chunk, chunks, max_workers):
+        if not len(data):
+            continue
+        timestamp = get_api_timestamp(data[-1])
+        pagination_id = get_api_pagination_id(timestamp, data=data[-max_results:])
+        # As iter_api, if no pagination_id, there are no earlier trades
+        is_last_iteration = start == id_from and pagination_id is None
+        # Basic logging for stackdriver
+        if log_prefix:
+            print(f"{log_prefix}: {timestamp.replace(tzinfo=None).isoformat()}")
+        yield data, is_last_iteration, pagination_id
+
+
+def get_api_range(url, get_api_id, get_api_response, id_from, id_to, is_before=False):
+    """Trades with ids from id_from to id_to exclusive, in descending order."""
+    pages = []
+    pagination_id = id_to if is_before else id_from
+    while (id_from < pagination_id) if is_before else (pagination_id < id_to):
+        data = get_api_response(url, pagination_id=pagination_id)
+        if is_before:
+            low, high = id_from, pagination_id
+        else:
+            low, high = pagination_id, id_to
+        trades = [trade for trade in data if low <= get_api_id(trade) < high]
+        if not len(trades):
+            break
+        pages.append(trades)
+        # Trades are in descending order
+        if is_before:
+            pagination_id = get_api_id(trades[-1])
+        else:
+            pagination_id = get_api_id(trades[0]) + 1
+    # Pages in descending order
+    if not is_before:
+        pages.reverse()
+    return [trade for page in pages for trade in page]
+
+
+def get_window_count(ticks, max_results):
+    """Windows, so each is about WINDOW_PAGES pages, if ticks are as expected."""
+    pages = math.ceil(ticks / max_results)
+    return min(max(math.ceil(pages / WINDOW_PAGES), 1), MAX_WINDOWS)
+
+
+def iter_api_windows(
+    url,
+    get_api_uid,  # Function
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    format_api_timestamp,  # Function
+    max_results,
+    timestamp_from,
+    timestamp_to,
+    windows,
+    max_workers=1,
+    cursor=None,
+    log_prefix=None,
+    stream=False,
+):
+    """
+    Trades from timestamp_from to timestamp_to, for APIs paginated by timestamp. The
+    period is split into windows, which are fetched concurrently.
+    """
+    pages = iter_window_pages(
+        url,
+        get_api_uid,
+        get_api_pagination_id,
+        get_api_timestamp,
+        get_api_response,
+        format_api_timestamp,
+        max_results,
+        timestamp_from,
+        timestamp_to,
+        windows,
+        max_workers=max_workers,
+        cursor=cursor,
+        log_prefix=log_prefix,
+    )
+    # If stream, pages as they arrive
+    if stream:
+        return pages
+    results = []
+    is_last_iteration = False
+    for data, is_last_iteration, _ in pages:
+        results += data
+    return results, is_last_iteration
+
+
+def iter_window_pages(
+    url,
+    get_api_uid,  # Function
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    format_api_timestamp,  # Function
+    max_results,
+    timestamp_from,
+    timestamp_to,
+    windows,
+    max_workers=1,
+    cursor=None,
+    log_prefix=None,
+):
+    """Windows, in descending order, as pages for iter_api."""
+    delta = (timestamp_to - timestamp_from) / windows
+    boundaries = [timestamp_from + delta * index for index in range(windows)]
+    boundaries.append(timestamp_to)
+    # Descending
+    periods = list(zip(boundaries[:-1], boundaries[1:]))[::-1]
+
+    def get_window(period):
+        window_from, window_to = period
+        return get_api_window(
+            url,
+            get_api_uid,
+            get_api_pagination_id,
+            get_api_timestamp,
+            get_api_response,
+            max_results,
+            window_from,
+            format_api_timestamp(window_to),
+            # Copies, with counts shared
+            cursor=copy(cursor) if cursor else None,
+        )
+
+    uids = set()
+    results = iter_concurrent(get_window, periods, max_workers)
+    for (window_from, _), (data, is_last_iteration) in results:
+        # Windows overlap at the seams
+        data = [trade for trade in data if get_api_uid(trade) not in uids]
+        uids = {get_api_uid(trade) for trade in data}
+        if len(data):
+            timestamp = get_api_timestamp(data[-1])
+            pagination_id = get_api_pagination_id(timestamp, data=data[-max_results:])
+        else:
+            pagination_id = format_api_timestamp(window_from)
+        # Basic logging for stackdriver
+        if log_prefix:
+            print(f"{log_prefix}: {window_from.replace(tzinfo=None).isoformat()}")
+        yield data, is_last_iteration, pagination_id
+        # Earlier windows are empty
+        if is_last_iteration:
+            break
+    if cursor is not None and log_prefix:
+        cursor.report(log_prefix)
+
+
+def get_api_window(
+    url,
+    get_api_uid,  # Function
+    get_api_pagination_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    max_results,
+    timestamp_from,
+    pagination_id,
+    cursor=None,
+):
+    """Trades to pagination_id, and from timestamp_from, in descending order."""
+    results = []
+    uids = set()
+    pages = iter_pages(
+        url,
+        get_api_pagination_id,
+        get_api_timestamp,
+        get_api_response,
+        max_results,
+        timestamp_from=timestamp_from,
+        pagination_id=pagination_id,
+        cursor=cursor,
+    )
+    is_last_iteration = False
+    for data, is_last_iteration, next_pagination_id in pages:
+        # Pages overlap, if pagination is inclusive
+        trades = [trade for trade in data if get_api_uid(trade) not in uids]
+        # Trades at the same timestamp overflow a page, and weren't paginated
+        if len(data) and not len(trades):
+            assert next_pagination_id != pagination_id, f"Stuck at {pagination_id}"
+        pagination_id = next_pagination_id
+        uids.update(get_api_uid(trade) for trade in trades)
+        results += [t for t in trades if get_api_timestamp(t) >= timestamp_from]
     return results, is_last_iteration
 
 
+def iter_concurrent(func, items, max_workers=1):
+    """Items, and results, in order. Bounded, so results are not all in memory."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        items = iter(items)
+        futures = deque()
+        while True:
+            for item in itertools.islice(items, max_workers + 1 - len(futures)):
+                futures.append((item, executor.submit(func, item)))
+            if not futures:
+                break
+            item, future = futures.popleft()
+            yield item, future.result()
+
+
+class SeekExhausted(Exception):
+    """Probes were exhausted, so the trade id is not the least."""
+
+
+def seek_api(
+    url,
+    get_api_id,  # Function
+    get_api_timestamp,  # Function
+    get_api_response,  # Function
+    timestamp,
+    low=None,
+    high=None,
+    max_probes=SEEK_MAX_PROBES,
+    log_prefix=None,
+):
+    """
+    Least trade id at, or after, timestamp, by interpolation search of trade ids. Each
+    probe is a request, with pagination_id as the trade id. If known, low and high are
+    trades, as id and timestamp, before, and at or after, timestamp. If no trade,
+    None. If not found within max_probes, raises SeekExhausted.
+    """
+
+    def probe(pagination_id=None):
+        data = get_api_response(url, pagination_id=pagination_id)
+        return [(get_api_id(trade), get_api_timestamp(trade)) for trade in data]
+
+    probes = 0
+    # If no high, most recent trades
+    if high is None:
+        low, high = seek_bounds(probe(), timestamp, low)
+        probes += 1
+    is_bisect = False
+    is_found = high is None
+    while not is_found and probes < max_probes:
+        low_id = low[0] if low else 0
+        high_id = high[0]
+        if high_id - low_id <= 1:
+            is_found = True
+            break
+        # Until a trade is before timestamp, or if interpolation is slow, bisect
+        if is_bisect or low is None:
+            guess = (low_id + high_id) // 2
+        else:
+            fraction = (timestamp - low[1]) / (high[1] - low[1])
+            guess = low_id + round(fraction * (high_id - low_id))
+        guess = min(max(guess, low_id + 1), high_id - 1)
+        low, high = seek_bounds(probe(guess), timestamp, low, high)
+        probes += 1
+        remaining = high[0] - (low[0] if low else 0)
+        if remaining == high_id - low_id:
+            # Maybe, no trade ids between
+            if is_bisect:
+                is_found = True
+                break
+            is_bisect = True
+        else:
+            is_bisect = remaining > (high_id - low_id) // 2
+    if not is_found:
+        is_found = high[0] - (low[0] if low else 0) <= 1
+    if log_prefix:
+        print(f"{log_prefix}: Seek {timestamp.isoformat()}, {probes} probes")
+    if not is_found:
+        raise SeekExhausted(f"Seek {timestamp.isoformat()}, {probes} probes")
+    if high is not None:
+        return high[0]
+
+
+def seek_bounds(trades, timestamp, low=None, high=None):
+    """Trades, as id and timestamp, before and at, or after, timestamp."""
+    for trade in trades:
+        trade_id, trade_timestamp = trade
+        if trade_timestamp < timestamp:
+            if low is None or trade_id > low[0]:
+                low = trade
+        elif high is None or trade_id < high[0]:
+            high = trade
+    return low, high
+
+
 def absolute_delta(value, delta):
     if delta.total_seconds() < 0:
         value += delta
@@ -332,6 +682,18 @@ def absolute_delta(value, delta):
     return value
 
 
+def iter_s3_elements(element, tag):
+    # Tags are namespaced, i.e. {http://s3.amazonaws.com/doc/2006-03-01/}Key
+    for child in element:
+        if child.tag.split("}")[-1] == tag:
+            yield child
+
+
+def get_s3_text(element, tag):
+    for child in iter_s3_elements(element, tag):
+        return child.text
+
+
 def get_request_data(request, keys):
     """For HTTP functions"""
     data = {key: None for key in keys}
@@ -4,7 +4,8 @@
 import typer
 
 import pathfix  # noqa: F401
-from fintick.functions import fintick_api
+from fintick.functions import fintick_api, fintick_websocket
+from fintick.providers.bitmex import bitmex_daily
 from fintick.aggregators import (
     renko_aggregator, thresh_aggregator, trade_aggregator, candle_aggregator
 )
@@ -29,6 +30,9 @@ def api(
         period_from: str = None, 
         period_to: str = None,
         futures: bool = False,
+        max_workers: int = 1,
+        fixed_point: bool = False,
+        stream: bool = False,
         verbose: bool = True
      ):
         fintick_api(
@@ -37,6 +41,43 @@ def api(
             period_from=period_from, 
             period_to=period_to, 
             futures=futures, 
+            max_workers=max_workers,
+            fixed_point=fixed_point,
+            stream=stream,
+            verbose=verbose
+        )
+
+@app.command()
+def websocket(
+        provider: str = None,
+        symbol: str = None,
+        max_partitions: int = None,
+        verbose: bool = True
+     ):
+        fintick_websocket(
+            provider,
+            symbol,
+            max_partitions=max_partitions,
+            verbose=verbose
+        )
+
+@app.command()
+def bitmex(
+        symbols: str = None,
+        root_symbols: str = None,
+        period_from: str = None,
+        period_to: str = None,
+        max_workers: int = 1,
+        fixed_point: bool = False,
+        verbose: bool = True
+     ):
+        bitmex_daily(
+            symbols=symbols,
+            root_symbols=root_symbols,
+            period_from=period_from,
+            period_to=period_to,
+            max_workers=max_workers,
+            fixed_point=fixed_point,
             verbose=verbose
         )
 
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+# isort:skip_file
+import json
+import random
+import time
+from decimal import Decimal
+
+import pandas as pd
+import typer
+
+import pathfix  # noqa: F401
+from fintick.controllers import FinTick
+from fintick.downloader import (
+    HistoricalDownloader,
+    calculate_notional,
+    calculate_tick_rule,
+    get_decimal_data_frame,
+    normalize_trades,
+    set_dtypes,
+    strip_nanoseconds,
+    utc_timestamp,
+)
+from fintick.providers.binance.perpetual import BinancePerpetualHourlyPartition
+from fintick.providers.bitmex.constants import S3_URL, XBTUSD
+from fintick.utils import parse_datetime
+
+app = typer.Typer()
+
+
+def get_trades_data_frame(total_rows):
+    tick_directions = ("PlusTick", "ZeroPlusTick", "MinusTick", "ZeroMinusTick")
+    timestamp = pd.Timestamp("2016-05-14")
+    timestamps = pd.date_range(timestamp, periods=total_rows, freq="997ns")
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "price": [Decimal(random.randint(1, 100000)) / 2 for _ in timestamps],
+            "volume": [Decimal(random.randint(1, 10000)) for _ in timestamps],
+            "tickDirection": [random.choice(tick_directions) for _ in timestamps],
+        }
+    )
+
+
+def get_bitmex_data_frame(date=None, total_rows=1000000):
+    """A BitMEX day, or if no date, random trades like a BitMEX day"""
+    if date:
+        date_string = date.replace("-", "")
+        url = f"{S3_URL}{date_string}.csv.gz"
+        columns = ("symbol", "timestamp", "price", "tickDirection", "size")
+        data_frames = HistoricalDownloader(url, columns).stream()
+        data_frame = pd.concat([df[df.symbol == XBTUSD] for df in data_frames])
+        data_frame["timestamp"] = pd.to_datetime(
+            data_frame["timestamp"], format="%Y-%m-%dD%H:%M:%S.%f"
+        )
+        data_frame = data_frame.rename(columns={"size": "volume"})
+    else:
+        data_frame = get_trades_data_frame(total_rows)
+        for column in ("price", "volume"):
+            data_frame[column] = data_frame[column].astype(str)
+    data_frame["index"] = range(len(data_frame))
+    return data_frame.reset_index(drop=True)
+
+
+def get_megabytes(data_frame):
+    return round(data_frame.memory_usage(deep=True).sum() / 1024 / 1024, 1)
+
+
+def report(name, total_rows, elapsed):
+    rows_per_second = round(total_rows / elapsed)
+    print(f"{name}: {elapsed:.3f} seconds, {rows_per_second} rows/sec")
+
+
+@app.command()
+def normalize(total_rows: int = 100000):
+    data_frame = get_trades_data_frame(total_rows)
+    df = data_frame.copy()
+    start = time.time()
+    for func in (
+        utc_timestamp,
+        strip_nanoseconds,
+        calculate_notional,
+        calculate_tick_rule,
+    ):
+        df = func(df)
+    report("apply", total_rows, time.time() - start)
+    df = data_frame.copy()
+    start = time.time()
+    normalize_trades(df)
+    report("normalize_trades", total_rows, time.time() - start)
+
+
+@app.command()
+def fixed_point(date: str = None, total_rows: int = 1000000):
+    data_frame = get_bitmex_data_frame(date=date, total_rows=total_rows)
+    total_rows = len(data_frame)
+    for name, is_fixed_point in (("decimal", False), ("fixed_point", True)):
+        start = time.time()
+        df = set_dtypes(data_frame.copy(), fixed_point=is_fixed_point)
+        df = normalize_trades(df)
+        report(f"{name} parse", total_rows, time.time() - start)
+        print(f"{name} memory: {get_megabytes(df)} MB")
+        start = time.time()
+        FinTick(XBTUSD).get_firebase_data(df)
+        report(f"{name} summary", total_rows, time.time() - start)
+        start = time.time()
+        get_decimal_data_frame(df)
+        report(f"{name} to BigQuery", total_rows, time.time() - start)
+
+
+def get_binance_pages(total_rows, max_results=1000):
+    """Pages like the Binance historicalTrades API"""
+    pages = []
+    for start in range(total_rows, 0, -max_results):
+        page = [
+            {
+                "id": index,
+                "price": f"{random.randint(1, 10000000) / 100:.2f}",
+                "qty": f"{random.randint(1, 100000) / 1000:.3f}",
+                "quoteQty": "0",
+                "time": 1609459200000 + index,
+                "isBuyerMaker": random.random() > 0.5,
+                "isBestMatch": True,
+            }
+            for index in range(start, max(start - max_results, 0), -1)
+        ]
+        pages.append(json.dumps(page))
+    return pages
+
+
+def parse_binance_trade(trade):
+    """Per trade, before the page parser"""
+    price = Decimal(trade["price"])
+    notional = Decimal(trade["qty"])
+    return {
+        "uid": str(trade["id"]),
+        "timestamp": parse_datetime(trade["time"], unit="ms"),
+        "nanoseconds": parse_datetime(trade["time"], unit="ms").nanosecond,
+        "price": price,
+        "volume": price * notional,
+        "notional": notional,
+        "tickRule": 1 if not trade["isBuyerMaker"] else -1,
+        "index": int(trade["id"]),
+    }
+
+
+@app.command()
+def page(path: str = None, total_rows: int = 100000):
+    """Recorded pages, as a JSON list of response bodies, or random Binance pages"""
+    if path:
+        with open(path) as f:
+            pages = json.load(f)
+    else:
+        pages = get_binance_pages(total_rows)
+    controller = BinancePerpetualHourlyPartition("BTCUSDT")
+    data = [trade for p in pages for trade in json.loads(p)]
+    total_rows = len(data)
+    start = time.time()
+    pd.DataFrame([parse_binance_trade(trade) for trade in data])
+    report("per trade", total_rows, time.time() - start)
+    start = time.time()
+    controller.parse_data(data)
+    report("page", total_rows, time.time() - start)
+
+
+if __name__ == "__main__":
+    app()
@@ -5,7 +5,7 @@ from uuid import uuid4
 
 from invoke import task
 
-from fintick.constants import BIGQUERY_LOCATION, FINTICK
+from fintick.constants import BIGQUERY_LOCATION, FINTICK, FUNCTION_TIMEOUT
 from fintick.fscache import FirestoreCache
 from fintick.functions import (
     fintick_aggregate_bars_gcp,
@@ -46,13 +46,12 @@ def upload_config(c):
 def deploy_function(c, entry_point, memory=256, is_http=True):
     name = NAME_REGEX.match(entry_point).group(1).replace("_", "-")
     region = os.environ[BIGQUERY_LOCATION]
-    timeout = 540  # Max, 9 minutes
     env_vars = get_deploy_env_vars()
     cmd = f"""
         gcloud functions deploy {name}-{memory} \
             --region={region} \
             --memory={memory}MB \
-            --timeout={timeout}s \
+            --timeout={FUNCTION_TIMEOUT}s \
             --runtime=python38 \
             --entry-point={entry_point} \
             --set-env-vars={env_vars} \
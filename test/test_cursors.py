@@ -0,0 +1,97 @@
+import datetime
+from copy import copy
+
+from fintick.cursors import NudgeCursor, OffsetCursor
+from fintick.utils import iter_api
+
+from .test_pipeline import TIMESTAMP
+
+MAX_RESULTS = 10
+
+
+def get_timestamps():
+    timestamps = [TIMESTAMP + datetime.timedelta(seconds=i) for i in range(30)]
+    # Liquidation cascade, more trades at the same timestamp than a page
+    timestamps += [TIMESTAMP + datetime.timedelta(seconds=15)] * 25
+    return sorted(timestamps)
+
+
+class API:
+    """Paginated by timestamp, inclusive, and offset, like BitMEX"""
+
+    def __init__(self, timestamps):
+        self.trades = [
+            {"id": index, "time": timestamp}
+            for index, timestamp in enumerate(timestamps)
+        ]
+        self.requests = 0
+
+    def get_api_response(self, url, pagination_id=None):
+        self.requests += 1
+        offset = 0
+        if isinstance(pagination_id, tuple):
+            pagination_id, offset = pagination_id
+        trades = [t for t in self.trades[::-1] if t["time"] <= pagination_id]
+        return trades[offset : offset + MAX_RESULTS]
+
+    def fetch(self, cursor):
+        return iter_api(
+            "url",
+            get_pagination_id,
+            get_timestamp,
+            self.get_api_response,
+            MAX_RESULTS,
+            timestamp_from=TIMESTAMP - datetime.timedelta(seconds=1),
+            pagination_id=TIMESTAMP + datetime.timedelta(minutes=1),
+            cursor=cursor,
+            log_prefix="test",
+        )
+
+
+def get_pagination_id(timestamp, last_data=[], data=[]):
+    return timestamp
+
+
+def get_timestamp(trade):
+    return trade["time"]
+
+
+def get_uid(trade):
+    return trade["id"]
+
+
+def test_offset_cursor(capsys):
+    api = API(get_timestamps())
+    cursor = OffsetCursor(get_pagination_id, get_uid)
+    data, is_last_iteration = api.fetch(cursor)
+    assert is_last_iteration
+    # All trades, including those at the same timestamp
+    assert {trade["id"] for trade in data} == {trade["id"] for trade in api.trades}
+    # Stalled once, then by offset
+    assert cursor.wasted == 1
+    assert cursor.requests <= api.requests
+    assert "wasted" in capsys.readouterr().out
+
+
+def test_nudge_cursor():
+    api = API(get_timestamps())
+    cursor = NudgeCursor(get_pagination_id, get_uid, get_timestamp, MAX_RESULTS)
+    data, is_last_iteration = api.fetch(cursor)
+    assert is_last_iteration
+    # Not stalled, though trades at the same timestamp after the page are missing
+    assert cursor.wasted == 0
+    timestamps = {trade["time"] for trade in data}
+    assert timestamps == {trade["time"] for trade in api.trades}
+
+
+def test_cursor_copy():
+    cursor = OffsetCursor(get_pagination_id, get_uid)
+    page = [{"id": 1}, {"id": 2}]
+    cursor(TIMESTAMP, data=page)
+    other = copy(cursor)
+    other(TIMESTAMP, last_data=page, data=page)
+    # Offset per copy, counts are shared
+    assert other.offset == 2
+    assert not cursor.offset
+    assert cursor.requests == 2
+    assert cursor.wasted == 1
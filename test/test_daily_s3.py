@@ -0,0 +1,207 @@
+import datetime
+import hashlib
+import random
+import time
+from decimal import Decimal
+
+import pandas as pd
+from fintick.controllers import FinTick, FinTickDailyS3Mixin
+from fintick.providers.binance import base as binance_base
+from fintick.providers.binance.perpetual import BinancePerpetualDailyS3Partition
+from fintick.providers.bitmex.fanout import BitmexDailyFanOutPartition
+from fintick.providers.bitmex.futures import BitmexFuturesDailyPartition
+from fintick.providers.bitmex.perpetual import BitmexPerpetualDailyPartition
+
+from .test_downloader import get_zip, mock_stream
+
+
+class DailyS3(FinTickDailyS3Mixin, FinTick):
+    def __init__(self, *args, min_date=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_date = min_date
+        self.written = []
+
+    def get_document(self, partition):
+        return None
+
+    def fetch(self):
+        time.sleep(random.random() / 100)
+        if self.partition >= self.min_date:
+            return pd.DataFrame([{"price": 1}])
+
+    def write(self, data_frame):
+        self.written.append(self.partition)
+
+
+def get_written(max_workers):
+    date_to = datetime.date(2021, 1, 10)
+    controller = DailyS3(
+        "XBTUSD",
+        period_from=datetime.date(2021, 1, 1),
+        period_to=date_to,
+        min_date=datetime.date(2021, 1, 5),
+        max_workers=max_workers,
+    )
+    controller.main()
+    return controller.written
+
+
+def test_ordered_commits():
+    expected = [datetime.date(2021, 1, day) for day in range(10, 4, -1)]
+    assert get_written(1) == expected
+    assert get_written(4) == expected
+
+
+def get_dump(date):
+    symbols = ("XBTUSD", "ETHUSD", "XBTH21", "XBTM21")
+    tick_directions = ("PlusTick", "MinusTick")
+    return pd.DataFrame(
+        [
+            {
+                "trdMatchID": f"{index:08d}-0000",
+                "symbol": symbols[index % 4],
+                "timestamp": f"{date.isoformat()}D00:00:{index % 60:02d}.000001000",
+                "price": f"{index}.5",
+                "tickDirection": tick_directions[index % 2],
+                "foreignNotional": str(index * 10),
+            }
+            for index in range(1, 101)
+        ]
+    )
+
+
+class Written:
+    def __init__(self, *args, dumps=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dumps = dumps
+        self.written = {}
+
+    def get_dumps(self):
+        return self.dumps
+
+    def get_document(self, partition):
+        return None
+
+    def download(self, url):
+        return self.filter_dataframe(get_dump(self.partition))
+
+    def write(self, data_frame):
+        self.written[self.partition] = data_frame
+
+
+class Perpetual(Written, BitmexPerpetualDailyPartition):
+    pass
+
+
+class Futures(Written, BitmexFuturesDailyPartition):
+    def get_symbols(self):
+        expiry = datetime.datetime(2021, 6, 25, 12)
+        return [
+            {"symbol": "XBTH21", "listing": None, "expiry": expiry},
+            {"symbol": "XBTM21", "listing": None, "expiry": expiry},
+        ]
+
+
+class FanOut(BitmexDailyFanOutPartition):
+    urls = []
+
+    def get_dumps(self):
+        return None
+
+    def download(self, url):
+        self.urls.append(url)
+        return self.filter_dataframe(get_dump(self.partition))
+
+
+def test_fan_out():
+    kwargs = {
+        "period_from": datetime.date(2021, 1, 1),
+        "period_to": datetime.date(2021, 1, 3),
+    }
+    expected = [Perpetual("XBTUSD", **kwargs), Futures("XBT", **kwargs)]
+    for controller in expected:
+        controller.main()
+    controllers = [Perpetual("XBTUSD", **kwargs), Futures("XBT", **kwargs)]
+    FanOut(controllers, max_workers=2, **kwargs).main()
+    assert len(FanOut.urls) == 3  # One download per partition
+    for controller, expected_controller in zip(controllers, expected):
+        assert len(controller.written) == 3
+        for partition, data_frame in controller.written.items():
+            expected_data_frame = expected_controller.written[partition]
+            assert data_frame.equals(expected_data_frame)
+    # Row number of dump, less first row of symbol
+    data_frame = controllers[0].written[datetime.date(2021, 1, 1)]
+    assert list(data_frame["index"]) == list(range(0, 100, 4))
+
+
+def test_dump_index():
+    dumps = {datetime.date(2021, 1, day): 1 for day in (2, 4)}
+    controller = Perpetual(
+        "XBTUSD",
+        period_from=datetime.date(2021, 1, 1),
+        period_to=datetime.date(2021, 1, 5),
+        dumps=dumps,
+    )
+    controller.main()
+    # Not published, and before first dump, are not downloaded
+    assert list(controller.written) == list(dumps)[::-1]
+
+
+class BinanceArchive(BinancePerpetualDailyS3Partition):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = {}
+
+    def get_dumps(self):
+        return {self.period_to: None}
+
+    def get_document(self, partition):
+        return None
+
+    def write(self, data_frame):
+        self.written[self.partition] = data_frame
+
+
+def get_binance_written(monkeypatch, data, checksum):
+    monkeypatch.setattr(binance_base, "get_binance_checksum", lambda url: checksum)
+    mock_stream(monkeypatch, data)
+    date = datetime.date(2021, 1, 7)
+    controller = BinanceArchive("BTCUSDT", period_from=date, period_to=date)
+    controller.main()
+    return controller.written
+
+
+def test_binance_archive(monkeypatch):
+    data = get_zip(total_rows=10)
+    checksum = hashlib.sha256(data).hexdigest()
+    written = get_binance_written(monkeypatch, data, checksum)
+    data_frame = written[datetime.date(2021, 1, 7)]
+    assert list(data_frame["uid"]) == [str(index) for index in range(1, 11)]
+    assert list(data_frame["index"]) == list(range(1, 11))
+    assert data_frame["timestamp"].iloc[0] == pd.Timestamp(
+        1610000000001, unit="ms", tz="UTC"
+    )
+    assert list(data_frame["tickRule"]) == [-1] * 10
+    # Price * qty, rather than quoteQty
+    assert data_frame["volume"].iloc[0] == Decimal("0.15")
+    assert data_frame["notional"].iloc[0] == Decimal("0.1")
+
+
+def test_binance_archive_checksum(monkeypatch):
+    data = get_zip(total_rows=10)
+    assert not get_binance_written(monkeypatch, data, "0" * 64)
+    # Not verifiable
+    assert not get_binance_written(monkeypatch, data, None)
+
+
+def test_dump_index_partitions():
+    dumps = {datetime.date(2021, 1, day): 1 for day in (2, 4)}
+    controller = Perpetual(
+        "XBTUSD",
+        period_from=datetime.date(2021, 1, 1),
+        period_to=datetime.date(2021, 1, 5),
+        dumps=dumps,
+    )
+    # So, only those are prefetched
+    partitions = list(controller.iter_dump_partition(dumps))
+    assert partitions == list(dumps)[::-1]
@@ -0,0 +1,410 @@
+import datetime
+import gzip
+import hashlib
+import io
+import os
+import random
+import zipfile
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
+
+import httpx
+import pandas as pd
+import pytest
+from fintick.controllers import FinTick
+from fintick.downloader import (
+    DumpCache,
+    DumpIndex,
+    HistoricalDownloader,
+    calculate_notional,
+    calculate_tick_rule,
+    get_decimal_data_frame,
+    get_scales,
+    get_sortable,
+    normalize_trades,
+    row_to_json,
+    set_dtypes,
+    strip_nanoseconds,
+    sum_decimal,
+    summarize_trades,
+    utc_timestamp,
+)
+from fintick.downloader import downloader as downloader_module
+from fintick.providers.bitmex import BITMEX
+from fintick.providers.bitmex.api import get_bitmex_dumps
+from fintick.sessions import get_session
+
+COLUMNS = ("trdMatchID", "symbol", "timestamp", "price", "foreignNotional")
+
+
+def get_temp_file(total_rows=1000):
+    lines = ["timestamp,symbol,side,price,trdMatchID,foreignNotional"]
+    for index in range(total_rows):
+        symbol = "XBTUSD" if index % 2 else "ETHUSD"
+        lines.append(
+            f"2016-05-14D00:00:{index % 60:02d}.{index:09d},{symbol},Buy,"
+            f"{index}.5,{index:08d}-0000,{index * 10}"
+        )
+    temp_file = NamedTemporaryFile()
+    temp_file.write(gzip.compress("\n".join(lines).encode()))
+    temp_file.flush()
+    return temp_file
+
+
+def test_stream_equals_extract():
+    temp_file = get_temp_file()
+    downloader = HistoricalDownloader(None, COLUMNS, block_size=1024)
+    expected = downloader._extract(temp_file.name)
+    data_frames = list(downloader._iter_data_frames(temp_file))
+    assert len(data_frames) > 1
+    data_frame = pd.concat(data_frames)
+    assert data_frame.equals(expected[data_frame.columns])
+
+
+def get_zip(total_rows=1000):
+    """Like Binance archives, without header"""
+    lines = [
+        f"{index},{index}.5,0.1,{index}.05,{1610000000000 + index},True,True"
+        for index in range(1, total_rows + 1)
+    ]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("BTCUSDT-trades-2021-01-07.csv", "\n".join(lines))
+    return buffer.getvalue()
+
+
+ZIP_COLUMNS = ("id", "price", "qty", "quoteQty", "time", "isBuyerMaker", "isBestMatch")
+
+
+def test_stream_zip_without_header():
+    temp_file = NamedTemporaryFile()
+    temp_file.write(get_zip())
+    temp_file.flush()
+    downloader = HistoricalDownloader(
+        None,
+        ("id", "price", "time"),
+        block_size=1024,
+        column_names=ZIP_COLUMNS,
+        compression="zip",
+    )
+    expected = downloader._extract(temp_file.name)
+    data_frames = list(downloader._iter_data_frames(temp_file))
+    assert len(data_frames) > 1
+    data_frame = pd.concat(data_frames)
+    assert data_frame.equals(expected[data_frame.columns])
+    assert list(data_frame["id"]) == [str(index) for index in range(1, 1001)]
+
+
+def test_stream_preserves_row_number():
+    temp_file = get_temp_file()
+    downloader = HistoricalDownloader(None, COLUMNS, block_size=1024)
+    data_frames = downloader._iter_data_frames(temp_file)
+    data_frame = pd.concat([df[df.symbol == "XBTUSD"] for df in data_frames])
+    assert list(data_frame.index) == list(range(1, 1000, 2))
+
+
+class DroppedStream(httpx.SyncByteStream):
+    def __init__(self, data, total_bytes):
+        self.data = data
+        self.total_bytes = total_bytes
+
+    def __iter__(self):
+        yield self.data[: self.total_bytes]
+        raise httpx.ReadError("Connection dropped")
+
+
+class Transport(httpx.BaseTransport):
+    # Unlike httpx.MockTransport, responses are not read
+    def __init__(self, handler):
+        self.handler = handler
+
+    def handle_request(self, request):
+        return self.handler(request)
+
+
+def mock_stream(monkeypatch, data, drop_after=None, drops=1, accept_ranges=True):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        start = 0
+        value = request.headers.get("range", None)
+        if value and accept_ranges:
+            start = int(value.split("=")[1].rstrip("-"))
+        headers = {"content-length": str(len(data) - start)}
+        if start:
+            headers["content-range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+        status_code = 206 if start else 200
+        if drop_after and len(requests) <= drops:
+            stream = DroppedStream(data, drop_after)
+            return httpx.Response(status_code, headers=headers, stream=stream)
+        stream = httpx.ByteStream(data[start:])
+        return httpx.Response(status_code, headers=headers, stream=stream)
+
+    def stream(method, url, **kwargs):
+        client = httpx.Client(transport=Transport(handler))
+        return client.stream(method, url, **kwargs)
+
+    monkeypatch.setattr(downloader_module.httpx, "stream", stream)
+    monkeypatch.setattr(downloader_module, "RETRY_DELAY", 0)
+    return requests
+
+
+def test_download_resumes(monkeypatch):
+    data = os.urandom(1000)
+    requests = mock_stream(monkeypatch, data, drop_after=400)
+    temp_file = HistoricalDownloader("https://example.com", COLUMNS).download()
+    with temp_file:
+        assert open(temp_file.name, "rb").read() == data
+    assert "range" not in requests[0].headers
+    assert requests[1].headers["range"] == "bytes=400-"
+
+
+def test_download_restarts_without_range(monkeypatch):
+    data = os.urandom(1000)
+    requests = mock_stream(monkeypatch, data, drop_after=400, accept_ranges=False)
+    temp_file = HistoricalDownloader("https://example.com", COLUMNS).download()
+    with temp_file:
+        assert open(temp_file.name, "rb").read() == data
+    assert len(requests) == 2
+
+
+def test_download_verifies_size(monkeypatch):
+    data = os.urandom(1000)
+
+    def stream(method, url, **kwargs):
+        def handler(request):
+            headers = {"content-length": "1001"}
+            return httpx.Response(200, headers=headers, stream=httpx.ByteStream(data))
+
+        client = httpx.Client(transport=Transport(handler))
+        return client.stream(method, url, **kwargs)
+
+    monkeypatch.setattr(downloader_module.httpx, "stream", stream)
+    monkeypatch.setattr(downloader_module, "RETRY_DELAY", 0)
+    assert HistoricalDownloader("https://example.com", COLUMNS).download() is None
+
+
+def test_download_verifies_checksum(monkeypatch):
+    data = get_zip()
+    checksum = hashlib.sha256(data).hexdigest()
+    mock_stream(monkeypatch, data)
+    url = "https://example.com"
+    temp_file = HistoricalDownloader(url, COLUMNS, checksum=checksum).download()
+    with temp_file:
+        assert open(temp_file.name, "rb").read() == data
+    mock_stream(monkeypatch, b"\0" + data[1:])
+    assert HistoricalDownloader(url, COLUMNS, checksum=checksum).download() is None
+
+
+def test_download_gives_up(monkeypatch):
+    data = os.urandom(1000)
+    mock_stream(monkeypatch, data, drop_after=400, drops=10, accept_ranges=False)
+    assert HistoricalDownloader("https://example.com", COLUMNS).download() is None
+
+
+@pytest.mark.parametrize("status_code", [405, None])
+def test_download_without_head(tmp_path, monkeypatch, status_code):
+    def head(url, **kwargs):
+        if status_code is None:
+            raise httpx.ConnectError("Failed")
+        return httpx.Response(status_code)
+
+    data = os.urandom(1000)
+    mock_stream(monkeypatch, data)
+    monkeypatch.setattr(downloader_module.httpx, "head", head)
+    cache = DumpCache(str(tmp_path))
+    url = "https://example.com"
+    temp_file = HistoricalDownloader(url, COLUMNS, cache=cache).download()
+    with temp_file:
+        assert open(temp_file.name, "rb").read() == data
+    # Not validated, so not cached
+    assert not list(tmp_path.iterdir())
+
+
+def get_trades_data_frame(total_rows=1000):
+    tick_directions = ("PlusTick", "ZeroPlusTick", "MinusTick", "ZeroMinusTick")
+    timestamp = pd.Timestamp("2016-05-14")
+    data_frame = pd.DataFrame(
+        [
+            {
+                "timestamp": timestamp + pd.Timedelta(index * 999, unit="ns"),
+                "price": Decimal(f"{index}.5"),
+                "volume": Decimal(index * 10),
+                "tickDirection": tick_directions[index % 4],
+            }
+            for index in range(total_rows)
+        ]
+    )
+    data_frame.index += 10  # Not a default index
+    return data_frame
+
+
+def test_normalize_trades():
+    df = get_trades_data_frame()
+    expected = get_trades_data_frame()
+    for func in (
+        utc_timestamp,
+        strip_nanoseconds,
+        calculate_notional,
+        calculate_tick_rule,
+    ):
+        expected = func(expected)
+    data_frame = normalize_trades(df)
+    pd.testing.assert_frame_equal(data_frame, expected)
+
+
+def put(cache, url, data=b"data", etag="1"):
+    temp_file = NamedTemporaryFile()
+    temp_file.write(data)
+    temp_file.flush()
+    return cache.put(url, temp_file.name, etag=etag)
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = DumpCache(str(tmp_path))
+    url = "https://example.com/20160514.csv.gz"
+    assert cache.get(url) is None
+    put(cache, url)
+    assert cache.get(url, size=4, etag="1")
+    assert cache.get(url, size=5, etag="1") is None
+    assert cache.get(url, size=4, etag="2") is None
+    assert cache.hits == 1
+    assert cache.misses == 3
+    assert cache.hit_bytes == 4
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = DumpCache(str(tmp_path), max_bytes=8)
+    urls = [f"https://example.com/{index}.csv.gz" for index in range(3)]
+    for index, url in enumerate(urls[:2]):
+        path = put(cache, url)
+        os.utime(path, (index, index))
+    # Most recently used
+    cache.get(urls[0])
+    put(cache, urls[2])
+    assert cache.get(urls[0])
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[2])
+
+
+def test_dump_index(tmp_path):
+    calls = []
+
+    def list_dumps():
+        calls.append(None)
+        return {datetime.date(2021, 1, 1): 1}
+
+    index = DumpIndex(str(tmp_path))
+    index.indexes.clear()
+    assert index.get("bitmex", list_dumps) == {datetime.date(2021, 1, 1): 1}
+    assert index.get("bitmex", list_dumps, date_to=datetime.date(2021, 1, 1))
+    assert len(calls) == 1
+    # Not listed until date, but listed recently
+    assert index.get("bitmex", list_dumps, date_to=datetime.date(2021, 1, 2))
+    assert len(calls) == 1
+    # Loaded from disk, then refreshed on demand
+    index.indexes.clear()
+    index = DumpIndex(str(tmp_path), max_age=0)
+    assert index.get("bitmex", list_dumps)
+    assert len(calls) == 1
+    assert index.get("bitmex", list_dumps, date_to=datetime.date(2021, 1, 2))
+    assert len(calls) == 2
+    index.indexes.clear()
+
+
+def test_bitmex_dumps(monkeypatch):
+    pages = [
+        """<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">
+        <IsTruncated>true</IsTruncated>
+        <Contents><Key>data/trade/</Key><Size>0</Size></Contents>
+        <Contents><Key>data/trade/20141122.csv.gz</Key><Size>10</Size></Contents>
+        </ListBucketResult>""",
+        """<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">
+        <IsTruncated>false</IsTruncated>
+        <Contents><Key>data/trade/20141123.csv.gz</Key><Size>20</Size></Contents>
+        </ListBucketResult>""",
+    ]
+    markers = []
+
+    def get(url, params=None):
+        markers.append(params["marker"])
+        return httpx.Response(200, content=pages[len(markers) - 1].encode())
+
+    monkeypatch.setattr(get_session(BITMEX), "get", get)
+    assert get_bitmex_dumps() == {
+        datetime.date(2014, 11, 22): 10,
+        datetime.date(2014, 11, 23): 20,
+    }
+    assert markers == ["", "data/trade/20141122.csv.gz"]
+
+
+def get_string_data_frame():
+    data_frame = get_trades_data_frame(total_rows=100)
+    data_frame["price"] = data_frame["price"].astype(str)
+    data_frame["volume"] = [f"0.{index:04d}" for index in range(100)]
+    data_frame["index"] = data_frame.index
+    return data_frame
+
+
+def test_fixed_point():
+    data_frame = set_dtypes(get_string_data_frame(), fixed_point=True)
+    assert get_scales(data_frame) == {"price": 1, "volume": 4}
+    assert data_frame["price"].dtype == "int64"
+    expected = set_dtypes(get_string_data_frame())
+    df = get_decimal_data_frame(data_frame)
+    assert df["price"].equals(expected["price"])
+    assert df["volume"].equals(expected["volume"])
+
+
+def test_fixed_point_not_exact():
+    data_frame = get_string_data_frame()
+    data_frame.loc[10, "volume"] = "1e-20"
+    data_frame = set_dtypes(data_frame, fixed_point=True)
+    assert get_scales(data_frame) == {"price": 1}
+    assert isinstance(data_frame.loc[10, "volume"], Decimal)
+
+
+def test_fixed_point_firebase_data():
+    data_frame = normalize_trades(set_dtypes(get_string_data_frame(), fixed_point=True))
+    expected = normalize_trades(set_dtypes(get_string_data_frame()))
+    data = FinTick("XBTUSD").get_firebase_data(data_frame)
+    expected_data = FinTick("XBTUSD").get_firebase_data(expected)
+    for key in ("volume", "buyVolume", "notional", "buyNotional"):
+        assert Decimal(data[key]) == Decimal(expected_data[key])
+    for key in ("open", "low", "high", "close"):
+        for k in ("price", "volume", "notional"):
+            assert Decimal(data[key][k]) == Decimal(expected_data[key][k])
+
+
+def get_summary(df):
+    # Before the summary kernel
+    scales = get_scales(df)
+    price = get_sortable(df, "price")
+    buy_side = df[df["tickRule"] == 1]
+    return {
+        "open": row_to_json(df.head(1).iloc[0], scales),
+        "low": row_to_json(df.loc[price.idxmin()], scales),
+        "high": row_to_json(df.loc[price.idxmax()], scales),
+        "close": row_to_json(df.tail(1).iloc[0], scales),
+        "volume": sum_decimal(df, "volume"),
+        "buyVolume": sum_decimal(buy_side, "volume"),
+        "notional": sum_decimal(df, "notional"),
+        "buyNotional": sum_decimal(buy_side, "notional"),
+        "ticks": len(df),
+        "buyTicks": len(buy_side),
+    }
+
+
+def test_summarize_trades():
+    data_frame = get_string_data_frame()
+    data_frame["price"] = [str(random.randint(1, 5)) for _ in data_frame.index]
+    data_frame["symbol"] = [random.choice("ABC") for _ in data_frame.index]
+    for fixed_point in (False, True):
+        df = normalize_trades(set_dtypes(data_frame.copy(), fixed_point=fixed_point))
+        descending = df.iloc[::-1]
+        assert summarize_trades(descending, reverse=True)[None] == get_summary(df)
+        summary = summarize_trades(df, by="symbol")
+        assert list(summary) == list(df.symbol.unique())
+        for symbol, data in summary.items():
+            assert data == get_summary(df[df.symbol == symbol])
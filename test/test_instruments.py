@@ -0,0 +1,84 @@
+import datetime
+
+from fintick.instruments import InstrumentCache
+
+from .test_pipeline import Firestore
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def get_instrument(symbol, days):
+    return {"symbol": symbol, "expiry": NOW + datetime.timedelta(days=days)}
+
+
+class Exchange:
+    def __init__(self):
+        self.active = [get_instrument("A", 1), get_instrument("B", 30)]
+        self.expired = [get_instrument("C", -30)]
+        self.requests = []
+
+    def get_active(self):
+        self.requests.append("active")
+        return self.active
+
+    def get_expired(self):
+        self.requests.append("expired")
+        return self.expired
+
+    def get(self, cache, key, **kwargs):
+        symbols = cache.get(key, self.get_active, self.get_expired, **kwargs)
+        return [instrument["symbol"] for instrument in symbols]
+
+
+def test_instrument_cache(tmp_path):
+    exchange = Exchange()
+    firestore = Firestore()
+    cache = InstrumentCache(tmp_path, firestore_cache=firestore)
+    assert exchange.get(cache, "cold") == ["A", "B", "C"]
+    assert exchange.get(cache, "cold") == ["A", "B", "C"]
+    assert exchange.requests == ["active", "expired"]
+    # Another process, from disk
+    del InstrumentCache.instruments["cold"]
+    cache = InstrumentCache(tmp_path, firestore_cache=Firestore())
+    assert exchange.get(cache, "cold") == ["A", "B", "C"]
+    assert exchange.requests == ["active", "expired"]
+    # Another instance, from Firestore
+    del InstrumentCache.instruments["cold"]
+    cache = InstrumentCache(firestore_cache=firestore)
+    symbols = cache.get("cold", exchange.get_active, exchange.get_expired)
+    assert exchange.requests == ["active", "expired"]
+    assert symbols[0]["expiry"] == exchange.active[0]["expiry"]
+
+
+def test_instrument_cache_ttl():
+    exchange = Exchange()
+    cache = InstrumentCache(firestore_cache=Firestore(), ttl=0)
+    assert exchange.get(cache, "ttl") == ["A", "B", "C"]
+    # A is no longer active, and D is listed
+    exchange.active = [exchange.active[1], get_instrument("D", 60)]
+    assert exchange.get(cache, "ttl") == ["B", "D", "C", "A"]
+    # Expired are listed once
+    assert exchange.requests == ["active", "expired", "active"]
+
+
+def test_instrument_cache_expiry():
+    exchange = Exchange()
+    cache = InstrumentCache(firestore_cache=Firestore())
+    exchange.get(cache, "expiry")
+    # A expired, so active are listed again
+    entry = InstrumentCache.instruments["expiry"]
+    entry["active"][0]["expiry"] = NOW - datetime.timedelta(seconds=1)
+    exchange.active = [exchange.active[1]]
+    assert exchange.get(cache, "expiry") == ["B", "C", "A"]
+    assert exchange.requests == ["active", "expired", "active"]
+
+
+def test_instrument_cache_expired_still_listed():
+    exchange = Exchange()
+    cache = InstrumentCache(firestore_cache=Firestore(), ttl=0)
+    exchange.get(cache, "listed")
+    # A expired, but is still listed as active
+    exchange.active[0] = get_instrument("A", -1)
+    assert exchange.get(cache, "listed") == ["B", "C", "A"]
+    assert exchange.get(cache, "listed") == ["B", "C", "A"]
+    assert exchange.get(cache, "listed", refresh=True) == ["B", "C", "A"]
@@ -0,0 +1,75 @@
+import datetime
+import time
+
+from fintick.controllers import FinTickMultiSymbolHourlyMixin, FinTickMultiSymbolREST
+
+EXPIRY = datetime.datetime(2021, 2, 1, tzinfo=datetime.timezone.utc)
+
+
+class MultiSymbol(FinTickMultiSymbolHourlyMixin, FinTickMultiSymbolREST):
+    def __init__(self, *args, max_workers=1, **kwargs):
+        self.workers = max_workers
+        super().__init__(*args, **kwargs)
+        self.written = []
+
+    @property
+    def exchange(self):
+        return "exchange"
+
+    @property
+    def max_workers(self):
+        return self.workers
+
+    def get_symbols(self):
+        return [
+            {"symbol": f"S{index}", "api_symbol": f"S-{index}", "expiry": EXPIRY}
+            for index in range(8)
+        ]
+
+    def get_document(self, partition):
+        return None
+
+    def get_pagination_id(self, data=None):
+        return None
+
+    def iter_api(self, symbol, pagination_id, log_prefix):
+        time.sleep(0.05)  # Latency
+        trades = [
+            {"id": f"{symbol}-{index}", "timestamp": self.timestamp_from, "i": index}
+            for index in range(3, 0, -1)
+        ]
+        return trades, True
+
+    def get_page_columns(self, data):
+        return {
+            "uid": [trade["id"] for trade in data],
+            "timestamp": [trade["timestamp"].timestamp() * 1e9 for trade in data],
+            "price": ["1"] * len(data),
+            "notional": [str(trade["i"]) for trade in data],
+            "tickRule": [1] * len(data),
+            "index": [trade["i"] for trade in data],
+        }
+
+    def get_is_complete(self, trades):
+        return True
+
+    def write(self, data_frame, is_complete=False, data=None):
+        self.written.append(data_frame)
+
+
+def get_written(max_workers):
+    timestamp = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+    controller = MultiSymbol(
+        "S", period_from=timestamp, period_to=timestamp, max_workers=max_workers
+    )
+    start = time.time()
+    controller.main()
+    return controller.written, time.time() - start
+
+
+def test_concurrent_symbols():
+    expected, elapsed = get_written(1)
+    written, concurrent_elapsed = get_written(8)
+    assert len(written) == 1
+    assert written[0].equals(expected[0])
+    assert concurrent_elapsed < elapsed / 2
@@ -0,0 +1,140 @@
+import datetime
+import json
+import random
+from decimal import Decimal
+
+import pandas as pd
+from fintick.downloader import (
+    concat_trades,
+    filter_trades,
+    get_decimal_data_frame,
+    get_scales,
+)
+from fintick.providers.binance.perpetual import BinancePerpetualHourlyPartition
+from fintick.providers.bitfinex.perpetual import BitfinexPerpetualHourlyPartition
+from fintick.providers.bitmex.perpetual import BitmexPerpetualHourlyPartition
+
+BINANCE_PAGE = b"""[
+    {"id": 2, "price": "30000.10", "qty": "0.002", "quoteQty": "60.0002",
+    "time": 1609459200123, "isBuyerMaker": false, "isBestMatch": true},
+    {"id": 1, "price": "30000.00", "qty": "1.5", "quoteQty": "45000",
+    "time": 1609459200001, "isBuyerMaker": true, "isBestMatch": true}
+]"""
+
+BITMEX_PAGE = b"""[
+    {"timestamp": "2021-01-01T00:00:00.123Z", "symbol": "XBTUSD", "side": "Sell",
+    "size": 100, "price": 29000.5, "trdMatchID": "b", "foreignNotional": 100},
+    {"timestamp": "2021-01-01T00:00:00.001Z", "symbol": "XBTUSD", "side": "Buy",
+    "size": 30, "price": 29000, "trdMatchID": "a", "foreignNotional": 30}
+]"""
+
+BITFINEX_PAGE = (
+    b"[[12, 1609459200123, -0.25, 29000.1], [10, 1609459200001, 1e-05, 29000]]"
+)
+
+
+def test_binance_page():
+    controller = BinancePerpetualHourlyPartition("BTCUSDT")
+    data_frame = controller.parse_data(json.loads(BINANCE_PAGE))
+    assert get_scales(data_frame) == {"price": 1, "notional": 3, "volume": 4}
+    df = get_decimal_data_frame(data_frame)
+    assert df.uid.tolist() == ["2", "1"]
+    assert df.price.tolist() == [Decimal("30000.10"), Decimal("30000.00")]
+    assert df.notional.tolist() == [Decimal("0.002"), Decimal("1.5")]
+    assert df.volume.tolist() == [Decimal("60.0002"), Decimal("45000")]
+    assert df.tickRule.tolist() == [1, -1]
+    assert df["index"].tolist() == [2, 1]
+    assert data_frame.tickRule.dtype == "int8"
+    timestamp = pd.Timestamp("2021-01-01T00:00:00.123", tz=datetime.timezone.utc)
+    assert df.timestamp.iloc[0] == timestamp
+    assert df.nanoseconds.tolist() == [0, 0]
+
+
+def test_bitmex_page():
+    controller = BitmexPerpetualHourlyPartition("XBTUSD")
+    data = json.loads(BITMEX_PAGE, parse_float=str)
+    df = get_decimal_data_frame(controller.parse_data(data))
+    assert df.price.tolist() == [Decimal("29000.5"), Decimal("29000")]
+    assert df.volume.tolist() == [Decimal("100"), Decimal("30")]
+    assert df.notional.tolist() == [
+        Decimal(100) / Decimal("29000.5"),
+        Decimal(30) / 29000,
+    ]
+    assert df.tickRule.tolist() == [-1, 1]
+
+
+def test_bitfinex_page():
+    controller = BitfinexPerpetualHourlyPartition("tBTCUSD")
+    data = json.loads(BITFINEX_PAGE, parse_float=str)
+    df = get_decimal_data_frame(controller.parse_data(data))
+    assert df.notional.tolist() == [Decimal("0.25"), Decimal("0.00001")]
+    assert df.volume.tolist() == [Decimal("7250.025"), Decimal("0.29")]
+    assert df.tickRule.tolist() == [-1, 1]
+
+
+def test_empty_page():
+    controller = BinancePerpetualHourlyPartition("BTCUSDT")
+    assert not len(controller.parse_data([]))
+
+
+def test_null_trades():
+    controller = BinancePerpetualHourlyPartition("BTCUSDT")
+    data = json.loads(BINANCE_PAGE)
+    data[0]["price"] = None
+    data_frame = controller.parse_data(data)
+    assert data_frame["uid"].tolist() == ["1"]
+    df = get_decimal_data_frame(data_frame)
+    assert df["price"].tolist() == [Decimal("30000.00")]
+
+
+def test_concat_trades():
+    controller = BinancePerpetualHourlyPartition("BTCUSDT")
+    data = json.loads(BINANCE_PAGE)
+    data[0]["price"] = "1.123"
+    data_frames = [controller.parse_data(data[:1]), controller.parse_data(data[1:])]
+    data_frame = concat_trades(data_frames)
+    assert get_scales(data_frame)["price"] == 3
+    df = get_decimal_data_frame(data_frame)
+    assert df.price.tolist() == [Decimal("1.123"), Decimal("30000")]
+
+
+def test_filter_trades():
+    timestamp_from = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+    timestamp_to = timestamp_from + datetime.timedelta(hours=1)
+    timestamps = pd.to_datetime(
+        [timestamp_to + datetime.timedelta(seconds=1)]
+        + [timestamp_to, timestamp_from, timestamp_from, timestamp_to]
+        + [timestamp_from - datetime.timedelta(microseconds=1)],
+        utc=True,
+    )
+    data_frame = pd.DataFrame(
+        {"uid": ["x", "c", "a", "c", "b", "a"], "timestamp": timestamps}
+    )
+    df, outside, duplicates = filter_trades(data_frame, timestamp_from, timestamp_to)
+    assert df.uid.tolist() == ["c", "a", "b"]
+    assert df.index.tolist() == [1, 2, 4]
+    assert outside == 2
+    assert duplicates == 1
+
+
+def test_filter_trades_random():
+    timestamp_from = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+    timestamp_to = timestamp_from + datetime.timedelta(hours=1)
+    trades = [
+        {
+            "uid": str(random.randint(0, 500)),
+            "timestamp": timestamp_from
+            + datetime.timedelta(seconds=random.randint(-600, 4200)),
+        }
+        for _ in range(1000)
+    ]
+    # Before vectorizing
+    unique = set()
+    expected = []
+    for trade in trades:
+        is_within_partition = timestamp_from <= trade["timestamp"] <= timestamp_to
+        if trade["uid"] not in unique and is_within_partition:
+            expected.append(trade["uid"])
+            unique.add(trade["uid"])
+    df, _, _ = filter_trades(pd.DataFrame(trades), timestamp_from, timestamp_to)
+    assert df.uid.tolist() == expected
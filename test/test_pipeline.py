@@ -0,0 +1,119 @@
+import datetime
+import time
+
+import pandas as pd
+import pytest
+from fintick.controllers import (
+    FinTickHourlyMixin,
+    FinTickIntegerPaginationMixin,
+    FinTickREST,
+)
+from fintick.controllers.pipeline import Pipeline
+
+TIMESTAMP = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def sleep(item):
+    time.sleep(0.05)
+    return item
+
+
+def test_pipeline():
+    results = []
+    start = time.time()
+    Pipeline().run(range(10), sleep, sleep, results.append)
+    # Serial, 10 * 0.1 seconds
+    assert time.time() - start < 0.8
+    assert results == list(range(10))
+
+
+def test_pipeline_error():
+    def fail(item):
+        if item == 3:
+            raise ValueError
+        return item
+
+    results = []
+    with pytest.raises(ValueError):
+        Pipeline().run(range(100), fail, results.append)
+    assert results == [0, 1, 2]
+
+
+class Firestore:
+    def __init__(self):
+        self.documents = {}
+        self.written = []
+
+    def get(self, document):
+        return self.documents.get(document, None)
+
+    def get_all(self, documents):
+        return {document: self.get(document) for document in documents}
+
+    def set(self, document, data):
+        self.documents[document] = data
+        self.written.append(document)
+
+
+class IntegerREST(FinTickHourlyMixin, FinTickIntegerPaginationMixin, FinTickREST):
+    """Trades have sequential ids, 3 per hour"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.firestore = Firestore()
+        self.pagination_ids = []
+
+    @property
+    def exchange(self):
+        return "exchange"
+
+    @property
+    def firestore_cache(self):
+        return self.firestore
+
+    def iter_api(self, symbol, pagination_id, log_prefix):
+        time.sleep(0.1)  # Latency
+        self.pagination_ids.append(pagination_id)
+        # With one trade from the previous partition
+        ids = range(pagination_id - 1, max(pagination_id - 5, 0), -1)
+        return list(ids), pagination_id <= 5
+
+    def get_page_columns(self, data):
+        return {
+            "uid": [str(i) for i in data],
+            "timestamp": [self.get_trade_timestamp(i).value for i in data],
+            "price": ["1"] * len(data),
+            "notional": ["1"] * len(data),
+            "tickRule": [1] * len(data),
+            "index": data,
+        }
+
+    def get_trade_timestamp(self, trade_id):
+        hours, minutes = divmod(trade_id - 1, 3)
+        delta = datetime.timedelta(hours=hours, minutes=minutes)
+        return pd.Timestamp(TIMESTAMP + delta)
+
+    def write(self, data_frame, is_complete=False, data=None):
+        time.sleep(0.1)  # BigQuery
+        self.set_firebase(data, is_complete=is_complete)
+
+
+def test_rest_pipeline():
+    period_to = TIMESTAMP + datetime.timedelta(hours=4)
+    controller = IntegerREST("S", period_from=TIMESTAMP, period_to=period_to)
+    # Last partition
+    controller.firestore.set("2021-01-01T05", {"open": {"index": 16}, "ok": True})
+    start = time.time()
+    controller.main()
+    # Serial, 5 * 0.2 seconds
+    assert time.time() - start < 0.85
+    # Pagination from partitions not yet written
+    assert controller.pagination_ids == [16, 13, 10, 7, 4]
+    # Written in order
+    documents = [f"2021-01-01T{hour:02d}" for hour in range(4, -1, -1)]
+    assert controller.firestore.written[1:] == documents
+    for hour, document in zip(range(4, -1, -1), documents):
+        data = controller.firestore.documents[document]
+        assert data["ok"] is True
+        assert data["open"]["index"] == hour * 3 + 1
+        assert data["ticks"] == 3
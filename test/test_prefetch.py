@@ -0,0 +1,73 @@
+import datetime
+
+from fintick.fscache import PrefetchCache
+
+from .test_pipeline import TIMESTAMP, Firestore, IntegerREST
+
+
+class CountingFirestore(Firestore):
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def get(self, document):
+        self.reads.append(document)
+        return super().get(document)
+
+    def get_all(self, documents):
+        self.reads.append(tuple(documents))
+        return {document: self.documents.get(document) for document in documents}
+
+    def get_one(self, where=None, order_by=None):
+        self.reads.append((where, order_by))
+
+
+def test_prefetch_cache():
+    firestore = CountingFirestore()
+    firestore.set("a", {"open": {"index": 1}, "ok": True})
+    firestore.set("b", {"open": {"index": 2}, "ok": False})
+    cache = PrefetchCache(firestore, ["a", "b", "c"])
+    assert cache.has_data("a")
+    assert not cache.has_data("b")
+    assert cache.get("c") is None
+    assert cache.get_one(where=["open.index", "==", 2]) == firestore.documents["b"]
+    # One round trip
+    assert firestore.reads == [("a", "b", "c")]
+    # Copies, so not modified
+    cache.get("a")["ok"] = False
+    assert cache.has_data("a")
+    # Invalidated, so read again
+    cache.set("b", {"open": {"index": 2}, "ok": True})
+    assert cache.has_data("b")
+    assert firestore.reads[1:] == ["b"]
+    # Not prefetched
+    assert cache.get_one(where=["open.index", "==", 3]) is None
+    assert firestore.reads[2:] == [(["open.index", "==", 3], None)]
+
+
+def test_rest_prefetch():
+    period_to = TIMESTAMP + datetime.timedelta(hours=4)
+    controller = IntegerREST("S", period_from=TIMESTAMP, period_to=period_to)
+    controller.firestore = CountingFirestore()
+    controller.firestore.set("2021-01-01T05", {"open": {"index": 16}, "ok": True})
+    controller.main()
+    assert controller.pagination_ids == [16, 13, 10, 7, 4]
+    # Partitions, and last partitions, in one round trip
+    documents = tuple(f"2021-01-01T{hour:02d}" for hour in range(6))
+    assert controller.firestore.reads[0] == documents
+    # Otherwise, only documents written while main is running
+    written = controller.firestore.written[1:]
+    assert all(document in written for document in controller.firestore.reads[1:])
+    # After main, from Firestore
+    assert controller.prefetched is None
+
+
+def test_prefetch_partitions():
+    controller = IntegerREST("S", period_from=TIMESTAMP, period_to=TIMESTAMP)
+    controller.firestore = CountingFirestore()
+    other = IntegerREST("S", period_from=TIMESTAMP, period_to=TIMESTAMP)
+    with controller.prefetch([TIMESTAMP]), other.prefetch():
+        controller.get_firestore_cache()
+        # Not shared, so not waiting for other controllers
+        assert controller.prefetch_lock is not other.prefetch_lock
+    assert controller.firestore.reads == [("2021-01-01T00", "2021-01-01T01")]
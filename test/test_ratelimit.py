@@ -0,0 +1,96 @@
+import multiprocessing
+import threading
+import time
+
+import httpx
+import pytest
+from fintick.providers.binance.api import get_binance_api_weight
+from fintick.providers.bitmex import api as bitmex_api
+from fintick.ratelimit import RateLimiter, get_retry_after
+
+
+def acquire(directory, total_requests):
+    rate_limiter = RateLimiter("test", 10, 0.1, directory=directory)
+    for _ in range(total_requests):
+        rate_limiter.acquire()
+
+
+def test_rate_limit_threads(tmp_path):
+    # 10 requests, then 100 req/s
+    start = time.time()
+    threads = [
+        threading.Thread(target=acquire, args=(str(tmp_path), 20)) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    assert 0.45 <= elapsed < 0.8
+
+
+def test_rate_limit_processes(tmp_path):
+    start = time.time()
+    processes = [
+        multiprocessing.Process(target=acquire, args=(str(tmp_path), 20))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+    assert 0.45 <= elapsed < 1
+
+
+def test_rate_limit_weight():
+    rate_limiter = RateLimiter("test", 10, 0.1)
+    start = time.time()
+    rate_limiter.acquire(10)
+    rate_limiter.acquire(20)
+    assert 0.15 <= time.time() - start < 0.3
+    assert get_binance_api_weight("https://api.binance.com/api/v3/trades?s=1") == 1
+    url = "https://api.binance.com/api/v3/historicalTrades?symbol=BTCUSDT"
+    assert get_binance_api_weight(url) == 5
+
+
+def test_rate_limit_headers():
+    rate_limiter = RateLimiter("test", 10, 0.1)
+    rate_limiter.update(remaining=0, reset_after=0.2)
+    start = time.time()
+    rate_limiter.acquire()
+    assert 0.15 <= time.time() - start < 0.3
+
+
+def test_rate_limit_429():
+    rate_limiter = RateLimiter("test", 10, 0.1)
+    response = httpx.Response(429, headers={"Retry-After": "0.2"})
+    rate_limiter.block(get_retry_after(response))
+    start = time.time()
+    rate_limiter.acquire()
+    assert 0.15 <= time.time() - start < 0.3
+
+
+class Session:
+    def __init__(self, response):
+        self.response = response
+        self.requests = 0
+
+    def get(self, url):
+        self.requests += 1
+        return self.response
+
+
+def test_rate_limit_429_retries(monkeypatch):
+    session = Session(httpx.Response(429, headers={"Retry-After": "0"}))
+    monkeypatch.setattr(bitmex_api, "get_session", lambda name: session)
+    with pytest.raises(Exception, match="HTTP 429"):
+        bitmex_api.get_bitmex_api_response("https://www.bitmex.com", retry=2)
+    assert session.requests == 3
+
+
+def test_rate_limit_headers_missing(monkeypatch):
+    headers = {"x-ratelimit-remaining": "10"}  # No x-ratelimit-reset
+    session = Session(httpx.Response(200, headers=headers, content=b"[]"))
+    monkeypatch.setattr(bitmex_api, "get_session", lambda name: session)
+    assert bitmex_api.get_bitmex_api_response("https://www.bitmex.com") == []
@@ -0,0 +1,269 @@
+import datetime
+import time
+
+import pytest
+from fintick.controllers import FinTickSequentialIntegerMixin
+from fintick.providers.binance import api as binance_api
+from fintick.utils import SeekExhausted, iter_api_range, seek_api
+
+from .test_pipeline import TIMESTAMP, IntegerREST
+
+TOTAL_TRADES = 100000
+
+
+def get_timestamp(trade_id):
+    # Trade rate increases
+    seconds = (trade_id / TOTAL_TRADES) ** 0.5 * 86400
+    return TIMESTAMP + datetime.timedelta(seconds=seconds)
+
+
+class API:
+    def __init__(self, trade_ids, is_ascending=True, max_results=1000):
+        self.trade_ids = trade_ids
+        self.is_ascending = is_ascending
+        self.max_results = max_results
+        self.requests = 0
+        self.pagination_ids = []
+
+    def get_api_response(self, url, pagination_id=None):
+        self.requests += 1
+        self.pagination_ids.append(pagination_id)
+        trade_ids = self.trade_ids
+        if pagination_id is None:
+            trade_ids = trade_ids[-self.max_results :]
+        # Like Binance, fromId
+        elif self.is_ascending:
+            trade_ids = [i for i in trade_ids if i >= pagination_id]
+            trade_ids = trade_ids[: self.max_results]
+        # Like Coinbase, or Bitflyer, before id
+        else:
+            trade_ids = [i for i in trade_ids if i < pagination_id]
+            trade_ids = trade_ids[-self.max_results :]
+        return [{"id": i, "time": get_timestamp(i)} for i in reversed(trade_ids)]
+
+    def seek(self, timestamp):
+        return seek_api(
+            "url",
+            lambda trade: trade["id"],
+            lambda trade: trade["time"],
+            self.get_api_response,
+            timestamp,
+        )
+
+
+def get_expected(trade_ids, timestamp):
+    return min([i for i in trade_ids if get_timestamp(i) >= timestamp])
+
+
+@pytest.mark.parametrize("is_ascending", [True, False])
+@pytest.mark.parametrize("hours", [1, 7, 13, 23])
+def test_seek_api(is_ascending, hours):
+    trade_ids = list(range(1, TOTAL_TRADES + 1))
+    api = API(trade_ids, is_ascending=is_ascending, max_results=100)
+    timestamp = TIMESTAMP + datetime.timedelta(hours=hours)
+    assert api.seek(timestamp) == get_expected(trade_ids, timestamp)
+    # Not paginated back from the most recent trade, which is 1,000 requests or so
+    assert api.requests <= 16
+
+
+def test_seek_api_non_sequential():
+    trade_ids = list(range(1, TOTAL_TRADES * 10, 10))
+    api = API(trade_ids, is_ascending=False, max_results=100)
+    timestamp = TIMESTAMP + datetime.timedelta(hours=3)
+    trade_id = api.seek(timestamp)
+    assert trade_id >= get_expected(trade_ids, timestamp)
+    assert get_timestamp(trade_id - 100) < timestamp
+    assert api.requests <= 32
+
+
+def test_seek_api_exhausted():
+    trade_ids = list(range(1, TOTAL_TRADES + 1))
+    api = API(trade_ids, max_results=100)
+    timestamp = TIMESTAMP + datetime.timedelta(hours=7)
+    # Not the least trade id, so not returned
+    with pytest.raises(SeekExhausted):
+        seek_api(
+            "url",
+            lambda trade: trade["id"],
+            lambda trade: trade["time"],
+            api.get_api_response,
+            timestamp,
+            max_probes=2,
+        )
+
+
+@pytest.mark.parametrize("is_ascending", [True, False])
+def test_seek_api_bounds(is_ascending):
+    trade_ids = list(range(1, TOTAL_TRADES + 1))
+    api = API(trade_ids, is_ascending=is_ascending, max_results=100)
+    timestamp = TIMESTAMP + datetime.timedelta(hours=7)
+    expected = get_expected(trade_ids, timestamp)
+    low = expected - 5000
+    high = expected + 5000
+    trade_id = seek_api(
+        "url",
+        lambda trade: trade["id"],
+        lambda trade: trade["time"],
+        api.get_api_response,
+        timestamp,
+        low=(low, get_timestamp(low)),
+        high=(high, get_timestamp(high)),
+    )
+    assert trade_id == expected
+    # Not the most recent trades
+    assert None not in api.pagination_ids
+    assert all(low < i < high for i in api.pagination_ids)
+    assert api.requests <= 16
+
+
+def test_seek_api_after_most_recent():
+    api = API(list(range(1, 1001)))
+    assert api.seek(TIMESTAMP + datetime.timedelta(days=2)) is None
+
+
+class SeekREST(FinTickSequentialIntegerMixin, IntegerREST):
+    def seek_api(self, symbol, timestamp, log_prefix, low=None, high=None):
+        self.timestamps.append(timestamp)
+        self.bounds.append((low, high))
+        hours = int((timestamp - TIMESTAMP).total_seconds() // 3600)
+        return hours * 3 + 1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timestamps = []
+        self.bounds = []
+
+
+def test_seek_partition():
+    # No data for the last partition, so partitions needn't be in order
+    period_from = TIMESTAMP + datetime.timedelta(hours=2)
+    controller = SeekREST("S", period_from=period_from, period_to=period_from)
+    controller.main()
+    assert controller.timestamps == [TIMESTAMP + datetime.timedelta(hours=3)]
+    # No summaries, so no bounds
+    assert controller.bounds == [(None, None)]
+    assert controller.pagination_ids == [10]
+    data = controller.firestore.documents["2021-01-01T02"]
+    assert data["ok"] is True
+    assert data["open"]["index"] == 7
+
+
+def test_seek_partition_bounds():
+    # Last partition is incomplete, so sought, from its first trade
+    period_from = TIMESTAMP + datetime.timedelta(hours=2)
+    controller = SeekREST("S", period_from=period_from, period_to=period_from)
+    timestamp = TIMESTAMP + datetime.timedelta(hours=3, minutes=1)
+    open_trade = {"index": 11, "timestamp": timestamp}
+    controller.firestore.set("2021-01-01T03", {"open": open_trade, "ok": False})
+    controller.main()
+    assert controller.bounds == [(None, (11, timestamp))]
+    assert controller.firestore.documents["2021-01-01T02"]["ok"] is True
+
+
+class RangeREST(FinTickSequentialIntegerMixin, IntegerREST):
+    def iter_api_range(self, symbol, pagination_id, ticks, log_prefix, stream=False):
+        self.ticks = ticks
+        return [], True
+
+
+def test_fetch_api_range():
+    controller = RangeREST("S", period_from=TIMESTAMP, period_to=TIMESTAMP)
+    next(controller.iter_partition())
+    # Last partition wasn't summarized, so paginated
+    controller.fetch_api(4)
+    assert controller.pagination_ids == [4]
+    controller.firestore.set("2021-01-01T01", {"ticks": 12345, "ok": True})
+    assert controller.fetch_api(4) == ([], True)
+    assert controller.ticks == 12345
+
+
+def test_get_trades_range(monkeypatch):
+    bounds = []
+
+    def get_trade_id(symbol, timestamp, log_prefix=None, low=None, high=None):
+        bounds.append(high)
+        return 1
+
+    monkeypatch.setattr(binance_api, "get_trade_id", get_trade_id)
+    monkeypatch.setattr(binance_api, "get_trades", lambda *args: "pages")
+    monkeypatch.setattr(binance_api, "iter_api_range", lambda *args, **kw: "range")
+    timestamp_to = TIMESTAMP + datetime.timedelta(hours=1)
+    # A page or two, so not sought
+    trades = binance_api.get_trades_range("S", TIMESTAMP, timestamp_to, 100001, 1500)
+    assert trades == "pages"
+    assert bounds == []
+    # Several pages, so sought from the page of pagination_id
+    trades = binance_api.get_trades_range("S", TIMESTAMP, timestamp_to, 100001, 90000)
+    assert trades == "range"
+    assert bounds == [(101001, timestamp_to)]
+
+
+def get_pagination_id(timestamp, last_data=[], data=[]):
+    return data[-1]["id"]
+
+
+def get_range(api, id_from, id_to, max_workers=1, stream=False):
+    return iter_api_range(
+        "url",
+        lambda trade: trade["id"],
+        get_pagination_id,
+        lambda trade: trade["time"],
+        api.get_api_response,
+        api.max_results,
+        id_from,
+        id_to,
+        is_before=not api.is_ascending,
+        max_workers=max_workers,
+        stream=stream,
+    )
+
+
+@pytest.mark.parametrize("is_ascending", [True, False])
+def test_iter_api_range(is_ascending):
+    api = API(list(range(1, 1001)), is_ascending=is_ascending, max_results=10)
+    # Most recent trades may not exist yet
+    data, is_last_iteration = get_range(api, 150, 1010, max_workers=4)
+    assert [trade["id"] for trade in data] == list(range(1000, 149, -1))
+    assert not is_last_iteration
+    # Pages, in descending order
+    pages = list(get_range(api, 150, 500, max_workers=4, stream=True))
+    assert [pagination_id for _, _, pagination_id in pages] == [400, 300, 200, 150]
+
+
+def test_iter_api_range_concurrent():
+    class SlowAPI(API):
+        def get_api_response(self, url, pagination_id=None):
+            time.sleep(0.02)
+            return super().get_api_response(url, pagination_id)
+
+    api = SlowAPI(list(range(1, 6001)), max_results=100)
+    start = time.time()
+    data, _ = get_range(api, 1, 6001, max_workers=6)
+    # Serial, 60 * 0.02 seconds
+    assert time.time() - start < 0.8
+    assert len(data) == 6000
+
+
+def test_iter_api_range_missing_trades():
+    # Asserted by the controller, as some gaps are known
+    trade_ids = [i for i in range(1, 1001) if i != 500]
+    api = API(trade_ids, max_results=10)
+    data, _ = get_range(api, 1, 1001, max_workers=4)
+    assert [trade["id"] for trade in data] == trade_ids[::-1]
+
+
+def test_iter_api_range_last_iteration():
+    api = API(list(range(1, 1001)), max_results=10)
+    # No trades before the first
+    data, is_last_iteration = iter_api_range(
+        "url",
+        lambda trade: trade["id"],
+        lambda timestamp, data=[]: data[-1]["id"] if data[-1]["id"] > 1 else None,
+        lambda trade: trade["time"],
+        api.get_api_response,
+        api.max_results,
+        1,
+        1001,
+    )
+    assert len(data) == 1000
+    assert is_last_iteration
@@ -0,0 +1,46 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fintick.sessions import Session
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_reuses_connections():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    session = Session("test")
+    try:
+        for _ in range(5):
+            assert session.get(url).json() == []
+    finally:
+        session.close()
+        server.shutdown()
+    assert session.requests == 5
+    assert session.connections == 1
+    assert session.reused == 4
+
+
+def test_session_without_trace():
+    session = Session("test")
+    try:
+        # Before httpx 0.18, no extensions, so not traced
+        session.on_request(object())
+    finally:
+        session.close()
+    assert session.reused is None
+    assert session.stats == "1 requests"
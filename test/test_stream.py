@@ -0,0 +1,262 @@
+import datetime
+import itertools
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fintick.bqloader import SINGLE_SYMBOL_SCHEMA, get_arrow_schema
+from fintick.constants import CHECKPOINT_BUCKET, CHECKPOINT_DIR
+from fintick.controllers import DeadlineExceeded, FinTickSequentialIntegerMixin
+from fintick.controllers import stream as stream_module
+from fintick.providers.bitfinex.base import BitfinexMixin
+from fintick.downloader import (
+    TradeBuffer,
+    get_decimal_data_frame,
+    merge_summaries,
+    parse_trades,
+    summarize_trades,
+)
+from fintick.utils import iter_api
+
+from .test_pipeline import TIMESTAMP, Firestore, IntegerREST
+
+
+def get_columns(trade_ids):
+    return {
+        "uid": [str(i) for i in trade_ids],
+        "timestamp": [TIMESTAMP.timestamp() * 1e9 + i * 1e9 for i in trade_ids],
+        "price": [str(100 + (i * 7) % 5) + ".5" for i in trade_ids],
+        "notional": [f"0.{i}" for i in trade_ids],
+        "tickRule": [1 if i % 3 else -1 for i in trade_ids],
+        "index": trade_ids,
+    }
+
+
+HOURS = datetime.timedelta(hours=4)
+LAST_DOCUMENT = "2021-01-01T05"
+
+
+class Firestore(Firestore):
+    def delete(self, document):
+        self.documents.pop(document, None)
+
+
+def test_iter_api_stream():
+    def get_api_response(url, pagination_id=None):
+        return list(range(pagination_id, max(pagination_id - 3, 0), -1))
+
+    args = (
+        "url",
+        lambda timestamp, last_data=[], data=[]: data[-1] - 1,
+        lambda trade: TIMESTAMP,
+        get_api_response,
+        3,
+    )
+    kwargs = {"timestamp_from": TIMESTAMP - datetime.timedelta(1), "pagination_id": 7}
+    pages = list(iter_api(*args, stream=True, **kwargs))
+    assert pages == [([7, 6, 5], False, 4), ([4, 3, 2], False, 1), ([1], True, 0)]
+    results, is_last_iteration = iter_api(*args, **kwargs)
+    assert results == list(range(7, 0, -1))
+    assert is_last_iteration
+
+
+def test_merge_summaries():
+    data_frame = parse_trades(get_columns(list(range(20, 0, -1))))
+    summary = summarize_trades(data_frame, reverse=True)
+    # Descending, so the second page is before the first
+    first = summarize_trades(data_frame.iloc[:8], reverse=True)
+    second = summarize_trades(data_frame.iloc[8:], reverse=True)
+    assert merge_summaries(second, first) == summary
+
+
+def test_trade_buffer(tmp_path):
+    data_frame = parse_trades(get_columns(list(range(1, 7))))
+    data_frame["volume"] = data_frame["volume"].astype(object)
+    buffer = TradeBuffer(get_arrow_schema(SINGLE_SYMBOL_SCHEMA), directory=tmp_path)
+    buffer.append(data_frame.iloc[:3])
+    buffer.append(data_frame.iloc[3:])
+    assert buffer.num_rows == 6
+    df = buffer.read()
+    expected = get_decimal_data_frame(data_frame)
+    for column in ("uid", "price", "volume", "notional", "index"):
+        assert list(df[column]) == list(expected[column])
+    assert df["price"].iloc[0] == Decimal("102.5")
+    buffer.remove()
+    assert not list(tmp_path.iterdir())
+
+
+class StreamREST(FinTickSequentialIntegerMixin, IntegerREST):
+    """Pages of 3 trades, which overlap by 1 trade"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursors = Firestore()
+        self.rows = {}
+
+    @property
+    def cursor_cache(self):
+        return self.cursors
+
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        if stream:
+            return self.iter_pages(pagination_id)
+        return super().iter_api(symbol, pagination_id, log_prefix)
+
+    def iter_pages(self, pagination_id):
+        self.pagination_ids.append(pagination_id)
+        while True:
+            page = list(range(pagination_id - 1, max(pagination_id - 4, 0), -1))
+            pagination_id = page[-1] + 1
+            is_last = page[-1] == 1
+            yield page, is_last, pagination_id
+            if is_last or self.get_trade_timestamp(page[-1]) < self.timestamp_from:
+                break
+
+    def get_page_columns(self, data):
+        columns = get_columns(data)
+        columns["timestamp"] = [self.get_trade_timestamp(i).value for i in data]
+        return columns
+
+    def write(self, data_frame, is_complete=False, data=None):
+        if isinstance(data_frame, TradeBuffer):
+            df = data_frame.read()
+        else:
+            df = get_decimal_data_frame(data_frame)
+        document = self.get_document_name(self.partition)
+        self.rows[document] = df.sort_values("index").reset_index(drop=True)
+        self.set_firebase(data, is_complete=is_complete)
+
+
+def test_rest_stream():
+    period_to = TIMESTAMP + HOURS
+    results = []
+    for stream in (False, True):
+        controller = StreamREST(
+            "S", period_from=TIMESTAMP, period_to=period_to, stream=stream
+        )
+        controller.firestore.set(LAST_DOCUMENT, {"open": {"index": 16}, "ok": True})
+        controller.main()
+        assert controller.pagination_ids == [16, 13, 10, 7, 4]
+        results.append(controller)
+    controller, stream_controller = results
+    assert stream_controller.firestore.documents == controller.firestore.documents
+    assert stream_controller.firestore.written == controller.firestore.written
+    for document, df in controller.rows.items():
+        stream_df = stream_controller.rows[document]
+        assert len(stream_df) == 3
+        for column in ("uid", "price", "volume", "notional", "tickRule", "index"):
+            assert list(stream_df[column]) == list(df[column])
+        assert list(stream_df["timestamp"]) == list(df["timestamp"])
+
+
+class BitfinexREST(BitfinexMixin, IntegerREST):
+    pass
+
+
+def test_stream_sorted_pages(tmp_path):
+    controller = BitfinexREST("tBTCUSD", period_from=TIMESTAMP, period_to=TIMESTAMP)
+    next(controller.iter_partition())
+    stream = stream_module.TradeStream(controller, directory=tmp_path)
+    mts = int(TIMESTAMP.timestamp() * 1000)
+    # Unsorted within a millisecond, so 9 is before the last trade of the first page
+    pages = [
+        ([[10, mts + 2000, "0.1", 100], [8, mts + 1000, "-0.1", 100]], False, 1),
+        ([[7, mts + 1000, "0.1", 100], [9, mts + 1000, "0.1", 100]], True, 0),
+    ]
+    assert stream.consume(pages, controller.parse_data)
+    stream.buffer.close()
+    df = stream.buffer.read()
+    assert sorted(df["index"]) == [7, 8, 9, 10]
+    assert stream.summary[None]["ticks"] == 4
+    stream.buffer.remove()
+
+
+def test_rest_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv(CHECKPOINT_DIR, str(tmp_path))
+    # Exceeded at the third page, which is the first page of the second partition
+    clock = itertools.chain([0, 0], itertools.repeat(float("inf")))
+    monkeypatch.setattr(
+        stream_module, "time", SimpleNamespace(time=lambda: next(clock))
+    )
+    kwargs = {"period_from": TIMESTAMP, "period_to": TIMESTAMP + HOURS}
+    controller = StreamREST("S", deadline=time.time() + 60, **kwargs)
+    controller.firestore.set(LAST_DOCUMENT, {"open": {"index": 16}, "ok": True})
+    with pytest.raises(DeadlineExceeded):
+        controller.main()
+    assert controller.firestore.written[1:] == ["2021-01-01T04"]
+    cursor = controller.cursors.get("2021-01-01T03")
+    assert cursor["paginationId"] == 11
+    assert cursor["rows"] == 3
+    assert len(list(tmp_path.iterdir())) == 1
+    # Resumed from the checkpoint
+    resumed = StreamREST("S", deadline=time.time() + 60, **kwargs)
+    resumed.firestore = controller.firestore
+    resumed.cursors = controller.cursors
+    monkeypatch.setattr(stream_module, "time", time)
+    resumed.main()
+    assert resumed.pagination_ids == [11, 10, 7, 4]
+    assert not resumed.cursors.documents
+    assert not list(tmp_path.iterdir())
+    # Same as if not interrupted
+    expected = StreamREST("S", **kwargs)
+    expected.firestore.set(LAST_DOCUMENT, {"open": {"index": 16}, "ok": True})
+    expected.main()
+    assert resumed.firestore.documents == expected.firestore.documents
+    assert list(resumed.rows["2021-01-01T03"]["index"]) == [10, 11, 12]
+
+
+class Bucket:
+    """GCS, as a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def blob(self, name):
+        return Blob(self.directory / name)
+
+
+class Blob:
+    def __init__(self, path):
+        self.path = path
+
+    def upload_from_filename(self, path):
+        self.path.write_bytes(open(path, "rb").read())
+
+    def download_to_filename(self, path):
+        if not self.path.exists():
+            raise stream_module.NotFound("Not found")
+        open(path, "wb").write(self.path.read_bytes())
+
+    def delete(self):
+        self.path.unlink()
+
+
+def test_rest_checkpoint_bucket(tmp_path, monkeypatch):
+    bucket = tmp_path / "bucket"
+    bucket.mkdir()
+    monkeypatch.setenv(CHECKPOINT_DIR, str(tmp_path / "instance"))
+    monkeypatch.setenv(CHECKPOINT_BUCKET, "bucket")
+    monkeypatch.setattr(stream_module, "get_storage_bucket", lambda _: Bucket(bucket))
+    clock = itertools.chain([0, 0], itertools.repeat(float("inf")))
+    monkeypatch.setattr(
+        stream_module, "time", SimpleNamespace(time=lambda: next(clock))
+    )
+    kwargs = {"period_from": TIMESTAMP, "period_to": TIMESTAMP + HOURS}
+    controller = StreamREST("S", deadline=time.time() + 60, **kwargs)
+    controller.firestore.set(LAST_DOCUMENT, {"open": {"index": 16}, "ok": True})
+    with pytest.raises(DeadlineExceeded):
+        controller.main()
+    cursor = controller.cursors.get("2021-01-01T03")
+    assert cursor["path"].startswith("gs://bucket/")
+    assert len(list(bucket.iterdir())) == 1
+    # Resumed by another instance, without the spill
+    monkeypatch.setenv(CHECKPOINT_DIR, str(tmp_path / "other"))
+    resumed = StreamREST("S", deadline=time.time() + 60, **kwargs)
+    resumed.firestore = controller.firestore
+    resumed.cursors = controller.cursors
+    monkeypatch.setattr(stream_module, "time", time)
+    resumed.main()
+    assert resumed.pagination_ids == [11, 10, 7, 4]
+    assert not list(bucket.iterdir())
+    assert not list((tmp_path / "other").iterdir())
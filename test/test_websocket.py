@@ -0,0 +1,153 @@
+import datetime
+import json
+import threading
+
+import pandas as pd
+import pytest
+from fintick.controllers import FinTickHourlyMixin, FinTickREST
+from fintick.controllers import websocket as websocket_controller
+from fintick.providers.bitfinex.perpetual import BitfinexPerpetualWebsocket
+from fintick.providers.bitmex.base import BitmexWebsocketMixin
+
+from .test_pipeline import TIMESTAMP, Firestore
+
+serve = pytest.importorskip("websockets.sync.server").serve
+
+
+def get_timestamp(minute):
+    return TIMESTAMP + datetime.timedelta(minutes=minute)
+
+
+def get_trade(minute):
+    """BitMEX, one trade per minute"""
+    return {
+        "trdMatchID": str(minute),
+        "timestamp": get_timestamp(minute).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "price": "1",
+        "foreignNotional": "1",
+        "side": "Buy",
+    }
+
+
+def get_message(minutes):
+    return {
+        "table": "trade",
+        "action": "insert",
+        "data": [get_trade(m) for m in minutes],
+    }
+
+
+class WebsocketREST(FinTickHourlyMixin, BitmexWebsocketMixin, FinTickREST):
+    def __init__(self, url, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url = url
+        self.firestore = Firestore()
+        self.now = TIMESTAMP
+        self.connections = 0
+        self.repaired = []
+        self.data_frames = []
+
+    @property
+    def websocket_url(self):
+        return self.url
+
+    @property
+    def firestore_cache(self):
+        return self.firestore
+
+    def get_now(self):
+        return self.now
+
+    def receive(self):
+        # Reconnected, 2 minutes later
+        if self.connections:
+            self.now += datetime.timedelta(minutes=2)
+        self.connections += 1
+        super().receive()
+
+    def parse_message(self, message):
+        # Exchange time, is local time
+        trades = super().parse_message(message)
+        if trades:
+            self.now = pd.Timestamp(trades[-1]["timestamp"]).to_pydatetime()
+        return trades
+
+    def iter_api(self, symbol, pagination_id, log_prefix, stream=False):
+        timestamp_to = pd.Timestamp(pagination_id, tz=datetime.timezone.utc)
+        self.repaired.append((self.timestamp_from, timestamp_to))
+        minutes = [
+            m
+            for m in range(61)
+            if self.timestamp_from <= get_timestamp(m) <= timestamp_to
+        ]
+        return [get_trade(m) for m in reversed(minutes)], True
+
+    def write(self, data_frame, is_complete=False, data=None):
+        self.data_frames.append(data_frame)
+        self.set_firebase(data_frame, is_complete=is_complete, reverse=True)
+
+
+@pytest.fixture
+def websocket_server():
+    """Local websocket server, which sends messages per connection, in order."""
+    connections = []
+
+    def handler(websocket):
+        websocket.recv()  # Subscribe
+        messages, close = connections.pop(0)
+        for message in messages:
+            websocket.send(json.dumps(message))
+        if not close:
+            for _ in websocket:  # Until closed by client
+                pass
+
+    server = serve(handler, "localhost", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.socket.getsockname()[1]
+    yield f"ws://localhost:{port}", connections
+    server.shutdown()
+    thread.join()
+
+
+def test_websocket(websocket_server, monkeypatch):
+    monkeypatch.setattr(websocket_controller, "WEBSOCKET_RECONNECT_DELAY", 0)
+    url, connections = websocket_server
+    # Disconnected from 00:29 to 00:31
+    connections.append(([get_message(range(1, 15)), get_message(range(15, 30))], True))
+    connections.append(
+        ([get_message(range(31, 50)), get_message(range(50, 62))], False)
+    )
+    controller = WebsocketREST(url, "XBTUSD", max_partitions=1)
+    controller.main()
+    # Before the first connection, and while disconnected
+    margin = datetime.timedelta(seconds=websocket_controller.WEBSOCKET_GAP_MARGIN)
+    assert controller.repaired == [
+        (TIMESTAMP, TIMESTAMP + margin),
+        (get_timestamp(29) - margin, get_timestamp(31) + margin),
+    ]
+    # Complete, without duplicates
+    data = controller.firestore.documents["2021-01-01T00"]
+    assert data["ok"] is True
+    assert data["ticks"] == 60
+    data_frame = controller.data_frames[0]
+    assert data_frame["uid"].tolist() == [str(m) for m in range(59, -1, -1)]
+    assert data_frame["index"].tolist() == list(range(59, -1, -1))
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ({"event": "subscribed", "chanId": 1}, []),
+        ([1, "hb"], []),
+        (
+            [1, [[2, 1, "1", "1"], [1, 0, "-1", "1"]]],
+            [[2, 1, "1", "1"], [1, 0, "-1", "1"]],
+        ),
+        ([1, "te", [3, 2, "1", "1"]], [[3, 2, "1", "1"]]),
+        ([1, "tu", [3, 2, "1", "1"]], []),
+    ],
+)
+def test_bitfinex_websocket_message(message, expected):
+    controller = BitfinexPerpetualWebsocket("tBTCUSD")
+    assert controller.parse_message(message) == expected
@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+from fintick.controllers import FinTickTimePaginationMixin
+from fintick.utils import get_window_count, iter_api_windows
+
+from .test_pipeline import TIMESTAMP, IntegerREST
+
+TIMESTAMP_TO = TIMESTAMP + datetime.timedelta(hours=1, microseconds=-1)
+
+
+class API:
+    """Paginated by timestamp, inclusive, like BitMEX endTime"""
+
+    def __init__(self, timestamps, max_results=10):
+        self.trades = [
+            {"id": index, "time": timestamp}
+            for index, timestamp in enumerate(sorted(timestamps))
+        ]
+        self.max_results = max_results
+
+    def get_api_response(self, url, pagination_id=None):
+        trades = [t for t in self.trades if t["time"] <= pagination_id]
+        return trades[-self.max_results :][::-1]
+
+    def fetch(self, windows, stream=False):
+        return iter_api_windows(
+            "url",
+            lambda trade: trade["id"],
+            lambda timestamp, last_data=[], data=[]: timestamp,
+            lambda trade: trade["time"],
+            self.get_api_response,
+            lambda timestamp: timestamp,
+            self.max_results,
+            TIMESTAMP,
+            TIMESTAMP_TO,
+            windows,
+            max_workers=4,
+            stream=stream,
+        )
+
+
+def get_timestamps():
+    timestamps = [TIMESTAMP + datetime.timedelta(seconds=i * 7) for i in range(514)]
+    # Bursts, at the seams of windows
+    for minutes in (15, 30, 45):
+        timestamps += [TIMESTAMP + datetime.timedelta(minutes=minutes)] * 5
+    # Before, and after, the partition
+    timestamps += [TIMESTAMP - datetime.timedelta(seconds=i) for i in range(1, 21)]
+    timestamps.append(TIMESTAMP_TO + datetime.timedelta(seconds=1))
+    return timestamps
+
+
+@pytest.mark.parametrize("windows", [1, 4, 7])
+def test_iter_api_windows(windows):
+    api = API(get_timestamps())
+    data, is_last_iteration = api.fetch(windows)
+    ids = [trade["id"] for trade in data]
+    # Once each, in descending order
+    expected = [
+        trade["id"]
+        for trade in api.trades[::-1]
+        if TIMESTAMP <= trade["time"] <= TIMESTAMP_TO
+    ]
+    assert ids == expected
+    assert not is_last_iteration
+
+
+def test_iter_api_windows_last_iteration():
+    timestamps = [TIMESTAMP_TO - datetime.timedelta(minutes=i) for i in range(5)]
+    api = API(timestamps)
+    pages = list(api.fetch(4, stream=True))
+    # Earlier windows are not paginated
+    assert len(pages) == 1
+    data, is_last_iteration, _ = pages[0]
+    assert len(data) == 5
+    assert is_last_iteration
+
+
+def test_iter_api_windows_overflow():
+    # More trades at the same timestamp than a page
+    timestamps = [TIMESTAMP + datetime.timedelta(minutes=10)] * 11
+    timestamps.append(TIMESTAMP + datetime.timedelta(minutes=5))
+    api = API(timestamps)
+    with pytest.raises(AssertionError):
+        api.fetch(2)
+
+
+def test_get_window_count():
+    assert get_window_count(0, 1000) == 1
+    assert get_window_count(4999, 1000) == 1
+    assert get_window_count(20001, 1000) == 5
+    assert get_window_count(10**9, 1000) == 32
+
+
+class WindowREST(FinTickTimePaginationMixin, IntegerREST):
+    def get_pagination_id(self, data=None):
+        return self.timestamp_to
+
+    def iter_api_windows(self, symbol, ticks, log_prefix, stream=False):
+        self.ticks = ticks
+        return [], True
+
+
+def test_fetch_api():
+    controller = WindowREST("S", period_from=TIMESTAMP, period_to=TIMESTAMP)
+    next(controller.iter_partition())
+    # Last partition, was summarized
+    controller.firestore.set("2021-01-01T01", {"ticks": 12345, "ok": True})
+    assert controller.fetch_api(controller.get_pagination_id()) == ([], True)
+    assert controller.ticks == 12345